@@ -0,0 +1,276 @@
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Union
+import json
+
+from asf_search.ASFProduct import ASFProduct
+from asf_search.ASFSearchResults import ASFSearchResults
+
+# numpy is imported on first use through _numpy() rather than here, as asf_search itself is imported by every script using it
+if TYPE_CHECKING:
+    import numpy as np
+
+_np = None
+
+
+def _numpy():
+    global _np
+    if _np is None:
+        import numpy
+        _np = numpy
+    return _np
+
+
+class ASFColumnarResults:
+    """
+    Compact, column-oriented alternative to ASFSearchResults for large result sets.
+    Numeric and time properties are held in numpy arrays, repeated categorical properties as integer codes into a shared list of values,
+    and each product as a compact JSON blob, which is only turned back into an ASFProduct when accessed.
+    Products returned by indexing or iterating are fresh copies, so changes made to them are not kept.
+    """
+    numeric_fields = [
+        'bytes',
+        'centerLat',
+        'centerLon',
+        'doppler',
+        'faradayRotation',
+        'offNadirAngle',
+        'pathNumber',
+        'frameNumber',
+        'absoluteOrbit',
+        'temporalBaseline',
+        'perpendicularBaseline'
+    ]
+    time_fields = [
+        'startTime',
+        'stopTime',
+        'processingDate'
+    ]
+    categorical_fields = [
+        'platform',
+        'sensor',
+        'beamMode',
+        'beamModeType',
+        'polarization',
+        'processingLevel',
+        'flightDirection',
+        'lookDirection'
+    ]
+
+    def __init__(self, products: Iterable[Union[ASFProduct, dict]] = None):
+        """
+        :param products: ASFProducts or GeoJSON features to store, such as an ASFSearchResults or the output of iter_features()
+        """
+        np = _numpy()
+        from asf_search.dates import to_datetime64
+
+        numeric = dict((field, []) for field in self.numeric_fields)
+        times = dict((field, []) for field in self.time_fields)
+        categories = dict((field, {}) for field in self.categorical_fields)
+        codes = dict((field, []) for field in self.categorical_fields)
+        blobs = []
+
+        for product in products if products is not None else []:
+            feature = product.geojson() if isinstance(product, ASFProduct) else product
+            properties = feature['properties']
+
+            for field, values in numeric.items():
+                values.append(_to_float(properties.get(field)))
+            for field, values in times.items():
+                values.append(properties.get(field))
+            for field, values in codes.items():
+                values.append(categories[field].setdefault(properties.get(field), len(categories[field])))
+
+            blobs.append(json.dumps(feature, separators=(',', ':')).encode('utf-8'))
+
+        self._numeric = dict((field, np.array(values, dtype=np.float64)) for field, values in numeric.items())
+        self._times = dict((field, to_datetime64(values)) for field, values in times.items())
+        self._categories = dict((field, list(values.keys())) for field, values in categories.items())
+        self._codes = dict((field, np.array(values, dtype=np.int32)) for field, values in codes.items())
+        self._blobs = np.empty(len(blobs), dtype=object)
+        self._blobs[:] = blobs
+
+    def __len__(self):
+        return len(self._blobs)
+
+    def __iter__(self) -> Iterator[ASFProduct]:
+        for blob in self._blobs:
+            yield ASFProduct(json.loads(blob))
+
+    def __getitem__(self, key):
+        """
+        :param key: An integer position to get a single ASFProduct, or a slice, array of positions, or boolean mask to get a new ASFColumnarResults
+        """
+        np = _numpy()
+
+        if isinstance(key, (int, np.integer)):
+            return ASFProduct(json.loads(self._blobs[key]))
+
+        return self._take(np.arange(len(self))[key])
+
+    def __repr__(self):
+        return f'ASFColumnarResults({len(self)} products)'
+
+    def column(self, field: str) -> 'np.ndarray':
+        """
+        Gets the values of a product property across every product
+
+        :param field: Name of the property, such as "platform" or "startTime"
+
+        :return: numpy array of float64 for numeric properties, datetime64[ms] for time properties, and objects for any other property
+        """
+        np = _numpy()
+
+        if field in self._numeric:
+            return self._numeric[field]
+        if field in self._times:
+            return self._times[field]
+        if field in self._codes:
+            categories = np.empty(len(self._categories[field]), dtype=object)
+            categories[:] = self._categories[field]
+            return categories[self._codes[field]]
+
+        values = np.empty(len(self), dtype=object)
+        values[:] = [json.loads(blob)['properties'].get(field) for blob in self._blobs]
+        return values
+
+    def filter(self, mask: 'np.ndarray' = None, **values) -> 'ASFColumnarResults':
+        """
+        Selects products matching a boolean mask and/or property values, for example filter(results.column('centerLat') > 60, platform='ALOS')
+
+        :param mask: Optional boolean array with one entry per product
+        :param values: Property names mapped to the value, or list of values, to keep
+
+        :return: ASFColumnarResults of the matching products
+        """
+        np = _numpy()
+        from asf_search.dates import to_datetime64
+
+        selected = np.ones(len(self), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+
+        for field, value in values.items():
+            accepted = value if isinstance(value, (list, tuple, set)) else [value]
+            if field in self._codes:
+                accepted_codes = [code for code, category in enumerate(self._categories[field]) if category in accepted]
+                selected &= np.isin(self._codes[field], accepted_codes)
+            elif field in self._times:
+                selected &= np.isin(self._times[field], to_datetime64(list(accepted)))
+            elif field in self._numeric:
+                selected &= np.isin(self._numeric[field], [_to_float(item) for item in accepted])
+            else:
+                selected &= np.array([item in accepted for item in self.column(field)], dtype=bool)
+
+        return self._take(np.flatnonzero(selected))
+
+    def sort(self, field: str, reverse: bool = False) -> 'ASFColumnarResults':
+        """
+        Orders products by a property. Products missing the property are placed last, or first when reversed.
+
+        :param field: Name of the property to sort by
+        :param reverse: Whether to sort in descending order
+
+        :return: ASFColumnarResults of the sorted products
+        """
+        np = _numpy()
+
+        keys = self._sort_keys(field)
+        if reverse:
+            # sort the reversed keys so that products with equal keys keep their original order
+            order = len(keys) - 1 - np.argsort(keys[::-1], kind='stable')[::-1]
+        else:
+            order = np.argsort(keys, kind='stable')
+
+        return self._take(order)
+
+    def groupby(self, field: str) -> Dict[object, 'ASFColumnarResults']:
+        """
+        Splits products into groups sharing a property value
+
+        :param field: Name of the property to group by
+
+        :return: Dictionary of each distinct value mapped to an ASFColumnarResults of its products, ordered by value
+        """
+        if field in self._codes:
+            categories = self._categories[field]
+            keys = self._sort_keys(field)
+            return dict(
+                (categories[self._codes[field][indices[0]]], self._take(indices))
+                for indices in _group_indices(keys))
+
+        values = self.column(field)
+        keys = self._sort_keys(field)
+        return dict((_scalar(values[indices[0]]), self._take(indices)) for indices in _group_indices(keys))
+
+    def to_results(self) -> ASFSearchResults:
+        """
+        :return: ASFSearchResults holding an ASFProduct for every product
+        """
+        return ASFSearchResults(self)
+
+    def geojson(self) -> dict:
+        return {
+            'type': 'FeatureCollection',
+            'features': [json.loads(blob) for blob in self._blobs]
+        }
+
+    def _sort_keys(self, field: str) -> 'np.ndarray':
+        np = _numpy()
+
+        if field in self._codes:
+            categories = self._categories[field]
+            ranked = sorted(range(len(categories)), key=lambda code: (categories[code] is None, str(categories[code])))
+            ranks = np.empty(len(categories), dtype=np.int32)
+            ranks[ranked] = np.arange(len(categories), dtype=np.int32)
+            return ranks[self._codes[field]]
+
+        values = self.column(field)
+        if values.dtype != object:
+            return values
+
+        ranked = sorted(set(values), key=lambda value: (value is None, str(value)))
+        rank_of = dict((value, rank) for rank, value in enumerate(ranked))
+        return np.array([rank_of[value] for value in values], dtype=np.int64)
+
+    def _take(self, indices: 'np.ndarray') -> 'ASFColumnarResults':
+        subset = ASFColumnarResults.__new__(ASFColumnarResults)
+        subset._numeric = dict((field, values[indices]) for field, values in self._numeric.items())
+        subset._times = dict((field, values[indices]) for field, values in self._times.items())
+        subset._categories = self._categories
+        subset._codes = dict((field, values[indices]) for field, values in self._codes.items())
+        subset._blobs = self._blobs[indices]
+        return subset
+
+
+def _group_indices(keys: 'np.ndarray') -> List['np.ndarray']:
+    np = _numpy()
+
+    if len(keys) == 0:
+        return []
+
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    if sorted_keys.dtype.kind in 'fM':
+        # NaN and NaT never compare equal, so group missing values together explicitly
+        missing = np.isnan(sorted_keys)
+        boundaries = np.flatnonzero((sorted_keys[1:] != sorted_keys[:-1]) & ~(missing[1:] & missing[:-1])) + 1
+    else:
+        boundaries = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+
+    return np.split(order, boundaries)
+
+
+def _scalar(value):
+    np = _numpy()
+
+    if isinstance(value, np.generic):
+        if isinstance(value, np.floating) and np.isnan(value):
+            return None
+        if isinstance(value, np.datetime64) and np.isnat(value):
+            return None
+        return value.item() if not isinstance(value, np.datetime64) else value
+    return value
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
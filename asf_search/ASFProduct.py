@@ -1,4 +1,5 @@
-from shapely.geometry import shape, Point
+from typing import TYPE_CHECKING
+import datetime
 import json
 from collections import UserList
 import requests
@@ -6,11 +7,22 @@ import requests
 from asf_search.download import download_url
 from asf_search import ASFSession
 
+# shapely and dateutil are imported on first use, so that importing asf_search stays fast
+if TYPE_CHECKING:
+    from shapely.geometry import Point
+    from shapely.geometry.base import BaseGeometry
+
 
 class ASFProduct:
+    __slots__ = ('properties', 'geometry', '_shape', '_shape_source', '_centroid', '_times')
+
     def __init__(self, args: dict):
         self.properties = args['properties']
         self.geometry = args['geometry']
+        self._shape = None
+        self._shape_source = None
+        self._centroid = None
+        self._times = None
 
     def __str__(self):
         return json.dumps(self.geojson(), indent=2, sort_keys=True)
@@ -22,33 +34,111 @@ class ASFProduct:
             'properties': self.properties
         }
 
-    def download(self, path: str, filename: str = None, session: ASFSession = None) -> None:
+    def download(self, path: str, filename: str = None, session: ASFSession = None, chunks: int = 1, buffer_size: int = None, verify_checksum: bool = True) -> None:
         """
         Downloads this product to the specified path and optional filename.
 
         :param path: The directory into which this product should be downloaded.
         :param filename: Optional filename to use instead of the original filename of this product.
         :param session: The session to use, in most cases should be authenticated beforehand
+        :param chunks: Number of byte ranges to split the file into and download in parallel, if the server supports range requests. Defaults to 1 (i.e. sequential download)
+        :param buffer_size: Number of bytes to read from the connection and write to disk at a time, defaults to the session's download_buffer_size
+        :param verify_checksum: Whether to verify the downloaded file against this product's "md5sum" property, when it has one
 
         :return: None
         """
         if filename is None:
             filename = self.properties['fileName']
 
-        download_url(url=self.properties['url'], path=path, filename=filename, session=session)
+        md5sum = self.properties.get('md5sum') if verify_checksum else None
+
+        download_url(
+            url=self.properties['url'],
+            path=path,
+            filename=filename,
+            session=session,
+            expected_bytes=self.expected_bytes(),
+            chunks=chunks,
+            buffer_size=buffer_size,
+            md5sum=md5sum)
+
+    def expected_bytes(self) -> int:
+        """
+        The size of this product's file according to its "bytes" property, used to verify downloads
+
+        :return: Size in bytes, or None if the product does not report a valid size
+        """
+        try:
+            return int(self.properties['bytes'])
+        except (KeyError, TypeError, ValueError):
+            return None
 
-    def stack(self) -> UserList:
+    def stack(self, session: ASFSession = None) -> UserList:
         """
         Builds a baseline stack from this product.
 
+        :param session: The session to use for the stack search, defaults to a shared session with pooled keep-alive connections
+
         :return: ASFSearchResults(list) of the stack, with the addition of baseline values (temporal, perpendicular) attached to each ASFProduct.
         """
         from .search.baseline_search import stack_from_product
 
-        return stack_from_product(self)
+        return stack_from_product(self, session=session)
+
+    def shape(self) -> 'BaseGeometry':
+        """
+        The product's geometry as a shapely geometry, parsed on first use and reused until the geometry is replaced.
+        Replacing self.geometry, or its "type" or "coordinates", is detected; coordinate lists edited in place are not.
+        """
+        source = (self.geometry, self.geometry.get('type'), self.geometry.get('coordinates'))
+        if self._shape_source is None or any(cached is not current for cached, current in zip(self._shape_source, source)):
+            from shapely.geometry import shape
+
+            self._shape = shape(self.geometry)
+            self._shape_source = source
+            self._centroid = None
 
-    def centroid(self) -> Point:
+        return self._shape
+
+    def centroid(self) -> 'Point':
         """
         Finds the centroid of a product
         """
-        return shape(self.geometry).centroid
+        geometry = self.shape()
+        if self._centroid is None:
+            self._centroid = geometry.centroid
+
+        return self._centroid
+
+    def start_time(self) -> datetime.datetime:
+        """
+        The product's "startTime" property as a timezone-aware datetime, parsed on first use and reused until the property changes
+        """
+        return self._parse_time('startTime')
+
+    def stop_time(self) -> datetime.datetime:
+        """
+        The product's "stopTime" property as a timezone-aware datetime, parsed on first use and reused until the property changes
+        """
+        return self._parse_time('stopTime')
+
+    def _parse_time(self, field: str) -> datetime.datetime:
+        value = self.properties.get(field)
+        # created on first use, most products never have their times parsed
+        if self._times is None:
+            self._times = {}
+        cached = self._times.get(field)
+        if cached is not None and cached[0] == value:
+            return cached[1]
+
+        parsed = None
+        if value is not None:
+            from dateutil.parser import parse
+            import pytz
+
+            parsed = parse(value)
+            if parsed.tzinfo is None:
+                parsed = pytz.utc.localize(parsed)
+
+        self._times[field] = (value, parsed)
+        return parsed
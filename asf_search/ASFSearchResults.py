@@ -1,7 +1,16 @@
 from collections import UserList
-from multiprocessing import Pool
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, List, Union
 import json
+
 from asf_search import ASFSession
+from asf_search.download.download import download_files
+from asf_search.download.report import DownloadReport
+
+# shapely is only imported once a spatial query is made
+if TYPE_CHECKING:
+    from shapely.geometry.base import BaseGeometry
+    from shapely.strtree import STRtree
 
 
 class ASFSearchResults(UserList):
@@ -14,30 +23,145 @@ class ASFSearchResults(UserList):
     def __str__(self):
         return json.dumps(self.geojson(), indent=2, sort_keys=True)
 
-    def download(self, path: str, session: ASFSession = None, processes=1) -> None:
+    def intersects(self, geometries: Union[str, 'BaseGeometry', Iterable[Union[str, 'BaseGeometry']]], per_geometry: bool = False):
+        """
+        Finds the products whose footprints intersect any of the given geometries, using a spatial index over the footprints
+
+        :param geometries: A WKT string or shapely geometry, or a list of them
+        :param per_geometry: Whether to return the matches of each geometry separately
+
+        :return: ASFSearchResults of the matching products in their original order, or a list with one per geometry if per_geometry is set
+        """
+        return self._query(geometries, 'intersects', per_geometry)
+
+    def contains(self, geometries: Union[str, 'BaseGeometry', Iterable[Union[str, 'BaseGeometry']]], per_geometry: bool = False):
+        """
+        Finds the products whose footprints fully contain any of the given geometries, using a spatial index over the footprints
+
+        :param geometries: A WKT string or shapely geometry, or a list of them
+        :param per_geometry: Whether to return the matches of each geometry separately
+
+        :return: ASFSearchResults of the matching products in their original order, or a list with one per geometry if per_geometry is set
+        """
+        # STRtree predicates are evaluated as predicate(geometry, footprint), so a footprint containing the geometry is "within"
+        return self._query(geometries, 'within', per_geometry)
+
+    def nearest(self, geometries: Union[str, 'BaseGeometry', Iterable[Union[str, 'BaseGeometry']]]):
+        """
+        Finds the product whose footprint is nearest to each of the given geometries, using a spatial index over the footprints
+
+        :param geometries: A WKT string or shapely geometry, or a list of them
+
+        :return: ASFSearchResults with the nearest product to each geometry, in the same order as the geometries
+        """
+        tree = self._spatial_index()
+        geometries = _parse_geometries(geometries)
+        if len(self) == 0 or len(geometries) == 0:
+            return ASFSearchResults()
+
+        return ASFSearchResults(self.data[idx] for idx in tree.nearest(geometries).tolist())
+
+    def _query(self, geometries, predicate: str, per_geometry: bool):
+        tree = self._spatial_index()
+        geometries = _parse_geometries(geometries)
+        if len(self) == 0 or len(geometries) == 0:
+            return [ASFSearchResults() for _ in geometries] if per_geometry else ASFSearchResults()
+
+        geometry_indices, product_indices = tree.query(geometries, predicate=predicate)
+
+        if per_geometry:
+            matches = [[] for _ in geometries]
+            for geometry_idx, product_idx in zip(geometry_indices.tolist(), product_indices.tolist()):
+                matches[geometry_idx].append(product_idx)
+            return [ASFSearchResults(self.data[idx] for idx in sorted(indices)) for indices in matches]
+
+        return ASFSearchResults(self.data[idx] for idx in sorted(set(product_indices.tolist())))
+
+    def _spatial_index(self) -> 'STRtree':
+        """
+        Builds an STRtree over the products' footprints on first use, and reuses it until products are added, removed or reordered
+        """
+        source = getattr(self, '_spatial_index_source', None)
+        if source is None or source != self.data:
+            from shapely.strtree import STRtree
+
+            footprints = []
+            for product in self.data:
+                try:
+                    footprints.append(product.shape())
+                except Exception:
+                    footprints.append(None)
+
+            self._spatial_index_tree = STRtree(footprints)
+            self._spatial_index_source = list(self.data)
+
+        return self._spatial_index_tree
+
+    def columnar(self):
+        """
+        Converts these results to an ASFColumnarResults, which holds large result sets in far less memory
+        and supports vectorized filter, sort and groupby operations
+
+        :return: ASFColumnarResults of these products
+        """
+        from asf_search.ASFColumnarResults import ASFColumnarResults
+
+        return ASFColumnarResults(self)
+
+    def download(
+            self,
+            path: str,
+            session: ASFSession = None,
+            processes=1,
+            max_per_host: int = None,
+            bandwidth_limit: float = None,
+            verify_checksum: bool = True,
+            raise_on_error: bool = True) -> DownloadReport:
         """
         Iterates over each ASFProduct and downloads them to the specified path.
 
         :param path: The directory into which the products should be downloaded.
         :param session: The session to use, in most cases should be authenticated beforehand
-        :param processes: Number of download processes to use. Defaults to 1 (i.e. sequential download)
+        :param processes: Number of concurrent downloads to run, each in its own thread. Defaults to 1 (i.e. sequential download)
+        :param max_per_host: Optional limit on the number of concurrent downloads from any single host
+        :param bandwidth_limit: Optional cap on the combined transfer rate of all downloads, in bytes per second
+        :param verify_checksum: Whether to verify each downloaded file against its product's "md5sum" property, when it has one
+        :param raise_on_error: Whether to raise once every download has finished if any of them failed. Otherwise failures are only recorded in the report.
 
-        :return: None
+        :return: DownloadReport(list) with the outcome of each product's download
+
+        :raises ASFDownloadBatchError: if any download failed and raise_on_error is set, with the report of every download as its report attribute
         """
-        if session is None:
-            session = ASFSession()
+        files = [
+            {
+                'url': product.properties['url'],
+                'filename': product.properties['fileName'],
+                'expected_bytes': product.expected_bytes(),
+                'md5sum': product.properties.get('md5sum') if verify_checksum else None
+            }
+            for product in self]
+
+        return download_files(
+            files,
+            path=path,
+            session=session,
+            processes=processes,
+            max_per_host=max_per_host,
+            bandwidth_limit=bandwidth_limit,
+            raise_on_error=raise_on_error)
+
+
+def _parse_geometries(geometries: Union[str, 'BaseGeometry', Iterable[Union[str, 'BaseGeometry']]]) -> List['BaseGeometry']:
+    from shapely.geometry.base import BaseGeometry
+
+    if isinstance(geometries, (str, BaseGeometry)):
+        geometries = [geometries]
+
+    return [_parse_wkt(geometry) if isinstance(geometry, str) else geometry for geometry in geometries]
 
-        if processes == 1:
-            for product in self:
-                product.download(path=path, session=session)
-        else:
-            pool = Pool(processes=processes)
-            args = [(product, path, session) for product in self]
-            pool.map(_download_product, args)
-            pool.close()
-            pool.join()
 
+@lru_cache(maxsize=1024)
+def _parse_wkt(geometry: str) -> 'BaseGeometry':
+    from shapely import wkt
 
-def _download_product(args):
-    product, path, session = args
-    product.download(path=path, session=session)
+    return wkt.loads(geometry)
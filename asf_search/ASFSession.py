@@ -1,15 +1,31 @@
 import requests
+from requests.adapters import HTTPAdapter
 import http.cookiejar
+import http.cookies
+import threading
 from asf_search import __version__
-from asf_search.constants import EDL_CLIENT_ID, EDL_HOST, ASF_AUTH_HOST
+from asf_search.constants import EDL_CLIENT_ID, EDL_HOST, ASF_AUTH_HOST, POOL_CONNECTIONS, POOL_MAXSIZE, DOWNLOAD_BUFFER_SIZE
 from asf_search.exceptions import ASFAuthenticationError
 
 
 class ASFSession(requests.Session):
-    def __init__(self):
+    def __init__(self, pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE, download_buffer_size: int = DOWNLOAD_BUFFER_SIZE):
+        """
+        A requests.Session whose connections are pooled and kept alive between requests
+
+        :param pool_connections: Number of hosts to keep connection pools for
+        :param pool_maxsize: Maximum number of connections kept alive per host, should be at least the number of threads sharing this session
+        :param download_buffer_size: Number of bytes read from the connection and written to disk at a time by downloads using this session
+        """
         super().__init__()
         self.headers.update({'User-Agent': f'{__name__}.{__version__}'})
 
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+        self.download_buffer_size = download_buffer_size
+
     def auth_with_creds(self, username: str, password: str):
         """
         Authenticates the session using EDL username/password credentials
@@ -52,3 +68,58 @@ class ASFSession(requests.Session):
         self.cookies = cookies
 
         return self
+
+    def async_client(self, limit: int = POOL_MAXSIZE):
+        """
+        Creates an aiohttp.ClientSession for use with the async_* functions,
+        sharing this session's headers, EDL credentials and cookies, and pooling up to `limit` keep-alive connections.
+        The caller is responsible for closing the returned client, ideally by using it as an async context manager.
+        Requires aiohttp, available via `python3 -m pip install asf_search[async]`
+
+        :param limit: Maximum number of simultaneous connections held by the client
+
+        :return aiohttp.ClientSession: the new client
+        """
+        try:
+            import aiohttp
+        except ImportError as e:
+            raise ImportError('aiohttp is required for async support, install it with: python3 -m pip install asf_search[async]') from e
+
+        cookie_jar = aiohttp.CookieJar()
+        for cookie in self.cookies:
+            morsel = http.cookies.Morsel()
+            morsel.set(cookie.name, cookie.value, cookie.value)
+            morsel['domain'] = cookie.domain
+            morsel['path'] = cookie.path
+            cookie_jar.update_cookies([(cookie.name, morsel)])
+
+        auth = None
+        if isinstance(self.auth, tuple):
+            auth = aiohttp.BasicAuth(*self.auth)
+
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=limit),
+            headers=dict(self.headers),
+            cookie_jar=cookie_jar,
+            auth=auth)
+
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session() -> ASFSession:
+    """
+    Returns the unauthenticated ASFSession used by search, CMR, and health requests when no session is provided,
+    so that repeated calls reuse pooled keep-alive connections instead of opening a new connection each time.
+
+    :return: The shared ASFSession, created on first use
+    """
+    global _shared_session
+
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                _shared_session = ASFSession()
+
+    return _shared_session
@@ -1,20 +1,23 @@
 from typing import Dict, List
 from asf_search.exceptions import CMRError
 from asf_search.constants.INTERNAL import CMR_HOST, CMR_COLLECTIONS
+from asf_search.ASFSession import ASFSession, get_shared_session
 
-import requests
 
-
-def get_campaigns(data) -> Dict:
+def get_campaigns(data, session: ASFSession = None) -> Dict:
     """Queries CMR Collections endpoint for 
     collections associated with the given platform
 
     :param data: a dictionary with required keys:
     'include_facets', 'provider', 'platform[]' and optional key: 'instrument[]'
+    :param session: The session to use for the request, defaults to a shared session with pooled keep-alive connections
 
     :return: Dictionary containing CMR umm_json response
     """
-    response = requests.post('https://' + CMR_HOST + CMR_COLLECTIONS,
+    if session is None:
+        session = get_shared_session()
+
+    response = session.post('https://' + CMR_HOST + CMR_COLLECTIONS,
                       data=data)
     if response.status_code != 200:
         raise CMRError(f'CMR_ERROR {response.status_code}: {response.text}')
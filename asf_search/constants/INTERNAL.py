@@ -11,3 +11,30 @@ CMR_HOST = 'cmr.earthdata.nasa.gov'
 CMR_COLLECTIONS = '/search/collections.umm_json_v1_4'
 EDL_HOST = 'urs.earthdata.nasa.gov'
 EDL_CLIENT_ID = 'BO_n7nTIlMljdvU6kRRB3g'
+
+SEARCH_PAGE_SIZE = 500
+SEARCH_BATCH_SIZE = 500
+SEARCH_MAX_WORKERS = 4
+TILE_MAX_VERTICES = 500
+
+SEARCH_WINDOW_RESULTS = 5000
+SEARCH_WINDOW_MIN_DURATION = 60 * 60
+# launch of SEASAT, the earliest data ASF holds, used as the start of windowed searches without one
+SEARCH_WINDOW_EPOCH = '1978-06-27T00:00:00Z'
+
+SEARCH_PLAN_SAMPLE_SIZE = 250
+
+SEARCH_CACHE_TTL = 24 * 60 * 60
+SEARCH_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+PRODUCT_CACHE_MAXSIZE = 4096
+PRODUCT_CACHE_TTL = 60 * 60
+
+INCREMENTAL_SEARCH_LAG = 60 * 60
+INCREMENTAL_SEARCH_MAX_SEEN = 100000
+
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 32
+
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_BUFFER_SIZE = 1024 * 1024
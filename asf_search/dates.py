@@ -0,0 +1,55 @@
+from typing import List
+
+import numpy as np
+from dateutil.parser import parse
+import pytz
+
+
+def to_datetime64(values: List[str], unit: str = 'ms') -> np.ndarray:
+    """
+    Parses date strings into a numpy datetime64 array in UTC.
+    ISO-8601 values, such as SearchAPI's "2021-01-01T00:00:00Z", are parsed by numpy in a single vectorized call,
+    while values with UTC offsets or in any other format fall back to dateutil one at a time.
+
+    :param values: Date strings to parse, None for missing values
+    :param unit: Resolution of the returned array, such as 'ms' or 'us'
+
+    :return: numpy datetime64 array with one entry per value, NaT for missing values
+    """
+    normalized = []
+    fallback = []
+    for idx, value in enumerate(values):
+        if value is None:
+            normalized.append('NaT')
+            continue
+
+        if value.endswith('Z'):
+            value = value[:-1]
+        time_start = max(value.find('T'), value.find(' '))
+        if time_start >= 0 and ('+' in value[time_start:] or '-' in value[time_start:]):
+            normalized.append('NaT')
+            fallback.append(idx)
+        else:
+            normalized.append(value)
+
+    try:
+        parsed = np.array(normalized, dtype=f'datetime64[{unit}]')
+    except ValueError:
+        parsed = np.empty(len(normalized), dtype=f'datetime64[{unit}]')
+        for idx, value in enumerate(normalized):
+            try:
+                parsed[idx] = np.datetime64(value, unit)
+            except ValueError:
+                fallback.append(idx)
+
+    for idx in fallback:
+        parsed[idx] = _parse_datetime64(values[idx], unit)
+
+    return parsed
+
+
+def _parse_datetime64(value: str, unit: str) -> np.datetime64:
+    parsed = parse(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(pytz.utc).replace(tzinfo=None)
+    return np.datetime64(parsed, unit)
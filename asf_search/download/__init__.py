@@ -1 +1,3 @@
 from .download import download_urls, download_url
+from .report import DownloadReport, DownloadResult
+from .async_download import async_download_urls, async_download_url
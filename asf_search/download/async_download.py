@@ -0,0 +1,259 @@
+from typing import Iterable
+import os.path
+import time
+import urllib.parse
+import warnings
+
+from asf_search.exceptions import ASFDownloadError, ASFDownloadChecksumError, ASFDownloadBatchError
+from asf_search.constants import POOL_MAXSIZE, DOWNLOAD_RETRIES, DOWNLOAD_BUFFER_SIZE
+from asf_search import ASFSession
+from asf_search.download.download import _RunningChecksum, _IncompleteDownloadError, _content_range_start, _content_range_total
+from asf_search.download.report import DownloadResult, DownloadReport
+
+
+async def async_download_urls(
+        urls: Iterable[str],
+        path: str,
+        client = None,
+        max_concurrency: int = POOL_MAXSIZE,
+        raise_on_error: bool = True) -> DownloadReport:
+    """
+    Downloads all products from the specified URLs to the specified location, concurrently on the running event loop.
+
+    :param urls: List of URLs from which to download
+    :param path: Local path in which to save the product
+    :param client: The aiohttp.ClientSession to use, see ASFSession.async_client(). In most cases should be created from an authenticated ASFSession
+    :param max_concurrency: Maximum number of downloads to run at once
+    :param raise_on_error: Whether to raise once every download has finished if any of them failed. Otherwise failures are only recorded in the report.
+    :return: DownloadReport(list) with the outcome of each download
+
+    :raises ASFDownloadBatchError: if any download failed and raise_on_error is set, with the report of every download as its report attribute
+    """
+    if client is None:
+        async with ASFSession().async_client(limit=max_concurrency) as client:
+            return await async_download_urls(urls, path, client=client, max_concurrency=max_concurrency, raise_on_error=raise_on_error)
+
+    import asyncio
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def download(url: str) -> DownloadResult:
+        async with semaphore:
+            return await _async_download_file(url=url, path=path, client=client)
+
+    start = time.monotonic()
+    results = await asyncio.gather(*[download(url) for url in urls])
+
+    report = DownloadReport(results, elapsed=time.monotonic() - start)
+    if raise_on_error and len(report.failed) > 0:
+        raise ASFDownloadBatchError(
+            f'{len(report.failed)} of {len(report)} downloads failed: ' + '; '.join(f'{result.url}: {result.error}' for result in report.failed),
+            report=report)
+
+    return report
+
+
+async def async_download_url(
+        url: str,
+        path: str,
+        filename: str = None,
+        client = None,
+        expected_bytes: int = None,
+        retries: int = DOWNLOAD_RETRIES,
+        buffer_size: int = DOWNLOAD_BUFFER_SIZE,
+        md5sum: str = None) -> None:
+    """
+    Downloads a product from the specified URL to the specified location and (optional) filename, without blocking the event loop.
+    As with download_url(), the download is written to a ".partial" file which is resumed, using HTTP Range requests, if the transfer is interrupted
+    or if a previous download was left incomplete, and is only renamed to the final filename once complete.
+    Writing, hashing and renaming files is run in the loop's default executor.
+
+    :param url: URL from which to download
+    :param path: Local path in which to save the product
+    :param filename: Optional filename to be used, extracted from the URL by default
+    :param client: The aiohttp.ClientSession to use, see ASFSession.async_client(). In most cases should be created from an authenticated ASFSession. Defaults to a temporary client opened and closed by this call, so share one client between calls to pool their connections.
+    :param expected_bytes: Optional expected size of the file, such as the product's "bytes" property. Defaults to the size reported by the server
+    :param retries: Number of times to resume an interrupted or incomplete transfer before giving up
+    :param buffer_size: Maximum number of bytes to write to disk at a time
+    :param md5sum: Optional expected MD5 checksum of the file, such as the product's "md5sum" property, computed as the file is received and verified once it is complete
+    :return:
+    """
+    await _async_download_url(
+        url=url, path=path, filename=filename, client=client, expected_bytes=expected_bytes, retries=retries, buffer_size=buffer_size, md5sum=md5sum)
+
+
+async def _async_download_file(url: str, path: str, filename: str = None, client = None, **kwargs) -> DownloadResult:
+    """
+    Runs a single download for async_download_urls(), capturing its outcome instead of raising, see _download_file()
+    """
+    if filename is None:
+        filename = os.path.split(urllib.parse.urlparse(url).path)[1]
+
+    start = time.monotonic()
+    try:
+        transferred = await _async_download_url(url=url, path=path, filename=filename, client=client, **kwargs)
+    except Exception as e:
+        return DownloadResult(url, os.path.join(path, filename), success=False, elapsed=time.monotonic() - start, error=e)
+
+    return DownloadResult(
+        url,
+        os.path.join(path, filename),
+        success=True,
+        bytes=transferred or 0,
+        elapsed=time.monotonic() - start,
+        skipped=transferred is None)
+
+
+async def _async_download_url(
+        url: str,
+        path: str,
+        filename: str = None,
+        client = None,
+        expected_bytes: int = None,
+        retries: int = DOWNLOAD_RETRIES,
+        buffer_size: int = DOWNLOAD_BUFFER_SIZE,
+        md5sum: str = None) -> int:
+    """
+    Performs the download for async_download_url(), returning the number of bytes transferred or None if the file already existed
+    """
+    if filename is None:
+        filename = os.path.split(urllib.parse.urlparse(url).path)[1]
+
+    if not os.path.isdir(path):
+        raise ASFDownloadError(f'Error downloading {url}: directory not found: {path}')
+
+    file_path = os.path.join(path, filename)
+    if os.path.isfile(file_path):
+        warnings.warn(f'File already exists, skipping download: {file_path}')
+        return None
+
+    if client is None:
+        async with ASFSession().async_client() as client:
+            return await _async_download_url(
+                url, path, filename=filename, client=client, expected_bytes=expected_bytes, retries=retries, buffer_size=buffer_size, md5sum=md5sum)
+
+    import asyncio
+    import aiohttp
+
+    loop = asyncio.get_running_loop()
+    partial_path = f'{file_path}.partial'
+    initial_size = os.path.getsize(partial_path) if os.path.isfile(partial_path) else 0
+    checksum = _RunningChecksum(md5sum) if md5sum else None
+
+    # on a checksum mismatch the file is downloaded once more from scratch, in case a resumed partial file was corrupt
+    for fresh_attempt in range(2):
+        for attempt in range(retries + 1):
+            try:
+                await _async_transfer(url, partial_path, client, buffer_size, expected_bytes, checksum)
+                break
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError, _IncompleteDownloadError) as e:
+                if attempt == retries:
+                    raise ASFDownloadError(f'Error downloading {url}: transfer incomplete after {retries + 1} attempts: {e}') from e
+                initial_size = min(initial_size, os.path.getsize(partial_path) if os.path.isfile(partial_path) else 0)
+
+        if checksum is None or checksum.matches():
+            break
+
+        mismatch = f'Error downloading {url}: MD5 checksum {checksum.hexdigest()} does not match expected {md5sum}'
+        await loop.run_in_executor(None, os.remove, partial_path)
+        checksum.reset()
+        initial_size = 0
+    else:
+        raise ASFDownloadChecksumError(mismatch)
+
+    await loop.run_in_executor(None, os.replace, partial_path, file_path)
+
+    return os.path.getsize(file_path) - initial_size
+
+
+async def _async_transfer(url: str, partial_path: str, client, buffer_size: int, expected_bytes: int = None, checksum=None) -> None:
+    """
+    Downloads url into partial_path like _transfer(), resuming from the end of partial_path if it already has content
+
+    :raises _IncompleteDownloadError: if the connection ended before the whole file was received
+    :raises ASFDownloadError: if the server returns an error, or the received file is larger than expected
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+
+    offset = os.path.getsize(partial_path) if os.path.isfile(partial_path) else 0
+    if expected_bytes is not None and offset == expected_bytes:
+        if checksum is not None:
+            await loop.run_in_executor(None, checksum.catch_up, partial_path, offset, bytearray(buffer_size))
+        return
+    if expected_bytes is not None and offset > expected_bytes:
+        await loop.run_in_executor(None, os.remove, partial_path)
+        offset = 0
+
+    # aiohttp drops the Authorization header when redirected to another origin, such as a pre-signed S3 URL
+    headers = {'Range': f'bytes={offset}-'} if offset > 0 else {}
+    total = None
+    async with client.get(url, headers=headers) as response:
+        if response.status == 416 and offset > 0:
+            total = _content_range_total(response)
+        elif response.status != 206 or _content_range_start(response) == offset:
+            return await _async_receive(url, response, partial_path, offset, buffer_size, expected_bytes, checksum)
+
+    # the server has nothing past our offset, the partial file is either complete or unusable
+    if total == offset and expected_bytes in [None, offset]:
+        if checksum is not None:
+            await loop.run_in_executor(None, checksum.catch_up, partial_path, offset, bytearray(buffer_size))
+        return
+
+    # the partial file is unusable, or the server resumed from somewhere other than its end, so the download starts over
+    if os.path.isfile(partial_path):
+        await loop.run_in_executor(None, os.remove, partial_path)
+    async with client.get(url) as response:
+        await _async_receive(url, response, partial_path, 0, buffer_size, expected_bytes, checksum)
+
+
+async def _async_receive(url: str, response, partial_path: str, offset: int, buffer_size: int, expected_bytes: int = None, checksum=None) -> None:
+    """
+    Writes the body of a response to a request for url from offset onwards into partial_path, appending if the server honoured the range
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+
+    if response.status >= 400:
+        raise ASFDownloadError(f'Error downloading {url}: HTTP {response.status}')
+
+    if response.status == 206:
+        if _content_range_start(response) != offset:
+            raise ASFDownloadError(f'Error downloading {url}: server returned a range starting at byte {_content_range_start(response)}, expected {offset}')
+        mode = 'ab'
+        total = _content_range_total(response)
+    else:
+        mode = 'wb'
+        offset = 0
+        total = None
+        if 'Content-Length' in response.headers and 'Content-Encoding' not in response.headers:
+            total = int(response.headers['Content-Length'])
+
+    expected = expected_bytes if expected_bytes is not None else total
+
+    if checksum is not None:
+        if mode == 'wb':
+            checksum.reset()
+        else:
+            await loop.run_in_executor(None, checksum.catch_up, partial_path, offset, bytearray(buffer_size))
+
+    def write(f, chunk: bytes) -> None:
+        f.write(chunk)
+        if checksum is not None:
+            checksum.update(chunk)
+
+    f = await loop.run_in_executor(None, open, partial_path, mode)
+    try:
+        async for chunk in response.content.iter_chunked(buffer_size):
+            await loop.run_in_executor(None, write, f, chunk)
+    finally:
+        await loop.run_in_executor(None, f.close)
+
+    size = os.path.getsize(partial_path)
+    if expected is not None and size < expected:
+        raise _IncompleteDownloadError(f'received {size} of {expected} bytes')
+    if expected is not None and size > expected:
+        await loop.run_in_executor(None, os.remove, partial_path)
+        raise ASFDownloadError(f'Error downloading {url}: received {size} bytes, expected {expected}')
@@ -1,55 +1,173 @@
-from typing import Iterable
-from multiprocessing import Pool
+from typing import Iterable, Iterator, List
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import os.path
+import threading
+import time
 import urllib.parse
 import warnings
 
-from asf_search.exceptions import ASFDownloadError
-from asf_search import ASFSession
-
+import requests
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
 
-def _download_url(arg):
-    url, path, session = arg
-    download_url(
-        url=url,
-        path=path,
-        session=session)
+from asf_search.exceptions import ASFDownloadError, ASFDownloadChecksumError, ASFDownloadBatchError
+from asf_search.constants import POOL_MAXSIZE, DOWNLOAD_RETRIES, DOWNLOAD_BUFFER_SIZE
+from asf_search import ASFSession
+from asf_search.download.report import DownloadResult, DownloadReport
 
 
-def download_urls(urls: Iterable[str], path: str, session: ASFSession = None, processes: int = 1):
+def download_urls(
+        urls: Iterable[str],
+        path: str,
+        session: ASFSession = None,
+        processes: int = 1,
+        max_per_host: int = None,
+        bandwidth_limit: float = None,
+        raise_on_error: bool = True) -> DownloadReport:
     """
     Downloads all products from the specified URLs to the specified location.
 
     :param urls: List of URLs from which to download
     :param path: Local path in which to save the product
     :param session: The session to use, in most cases should be authenticated beforehand
-    :param processes: Number of download processes to use. Defaults to 1 (i.e. sequential download)
-    :return:
+    :param processes: Number of concurrent downloads to run, each in its own thread. Defaults to 1 (i.e. sequential download)
+    :param max_per_host: Optional limit on the number of concurrent downloads from any single host
+    :param bandwidth_limit: Optional cap on the combined transfer rate of all downloads, in bytes per second
+    :param raise_on_error: Whether to raise once every download has finished if any of them failed. Otherwise failures are only recorded in the report.
+    :return: DownloadReport(list) with the outcome of each download
+
+    :raises ASFDownloadBatchError: if any download failed and raise_on_error is set, with the report of every download as its report attribute
+    """
+    return download_files(
+        [{'url': url} for url in urls],
+        path=path,
+        session=session,
+        processes=processes,
+        max_per_host=max_per_host,
+        bandwidth_limit=bandwidth_limit,
+        raise_on_error=raise_on_error)
+
+
+def download_files(
+        files: List[dict],
+        path: str,
+        session: ASFSession = None,
+        processes: int = 1,
+        max_per_host: int = None,
+        bandwidth_limit: float = None,
+        raise_on_error: bool = True) -> DownloadReport:
+    """
+    Downloads several files over a shared session using a pool of threads, as used by download_urls() and ASFSearchResults.download()
+
+    :param files: List of dictionaries of download_url() arguments, each with at least a "url" key
+    :param path: Local path in which to save the files
+    :param session: The session to use, in most cases should be authenticated beforehand
+    :param processes: Number of concurrent downloads to run, each in its own thread. Defaults to 1 (i.e. sequential download)
+    :param max_per_host: Optional limit on the number of concurrent downloads from any single host
+    :param bandwidth_limit: Optional cap on the combined transfer rate of all downloads, in bytes per second
+    :param raise_on_error: Whether to raise once every download has finished if any of them failed. Otherwise failures are only recorded in the report.
+    :return: DownloadReport(list) with the outcome of each download
+
+    :raises ASFDownloadBatchError: if any download failed and raise_on_error is set, with the report of every download as its report attribute
     """
     if session is None:
-        session = ASFSession()
+        session = ASFSession(pool_maxsize=max(POOL_MAXSIZE, processes))
+
+    limiter = _BandwidthLimiter(bandwidth_limit) if bandwidth_limit is not None else None
+    host_slots = {}
+    host_slots_lock = threading.Lock()
+
+    def download(file: dict) -> DownloadResult:
+        if max_per_host is None:
+            return _download_file(path=path, session=session, limiter=limiter, **file)
+
+        host = urllib.parse.urlparse(file['url']).netloc
+        with host_slots_lock:
+            slots = host_slots.setdefault(host, threading.Semaphore(max_per_host))
+        with slots:
+            return _download_file(path=path, session=session, limiter=limiter, **file)
 
+    start = time.monotonic()
     if processes <= 1:
-        for url in urls:
-            download_url(url=url, path=path, session=session)
+        results = [download(file) for file in files]
     else:
-        pool = Pool(processes=processes)
-        args = [(url, path, session) for url in urls]
-        pool.map(_download_url, args)
-        pool.close()
-        pool.join()
+        with ThreadPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(download, files))
 
+    report = DownloadReport(results, elapsed=time.monotonic() - start)
+    if raise_on_error and len(report.failed) > 0:
+        raise ASFDownloadBatchError(
+            f'{len(report.failed)} of {len(report)} downloads failed: ' + '; '.join(f'{result.url}: {result.error}' for result in report.failed),
+            report=report)
 
-def download_url(url: str, path: str, filename: str = None, session: ASFSession = None) -> None:
+    return report
+
+
+def download_url(
+        url: str,
+        path: str,
+        filename: str = None,
+        session: ASFSession = None,
+        expected_bytes: int = None,
+        retries: int = DOWNLOAD_RETRIES,
+        chunks: int = 1,
+        buffer_size: int = None,
+        md5sum: str = None) -> None:
     """
     Downloads a product from the specified URL to the specified location and (optional) filename.
+    The download is written to a ".partial" file which is resumed, using HTTP Range requests, if the transfer is interrupted
+    or if a previous download was left incomplete, and is only renamed to the final filename once complete.
 
     :param url: URL from which to download
     :param path: Local path in which to save the product
     :param filename: Optional filename to be used, extracted from the URL by default
     :param session: The session to use, in most cases should be authenticated beforehand
+    :param expected_bytes: Optional expected size of the file, such as the product's "bytes" property. Defaults to the size reported by the server
+    :param retries: Number of times to resume an interrupted or incomplete transfer before giving up
+    :param chunks: Number of byte ranges to split the file into and download in parallel, if the server supports range requests. Defaults to 1 (i.e. sequential download)
+    :param buffer_size: Number of bytes to read from the connection and write to disk at a time, defaults to the session's download_buffer_size
+    :param md5sum: Optional expected MD5 checksum of the file, such as the product's "md5sum" property, computed as the file is received and verified once it is complete
     :return:
     """
+    _download_url(url=url, path=path, filename=filename, session=session, expected_bytes=expected_bytes, retries=retries, chunks=chunks, buffer_size=buffer_size, md5sum=md5sum)
+
+
+def _download_file(url: str, path: str, filename: str = None, session: ASFSession = None, limiter=None, **kwargs) -> DownloadResult:
+    """
+    Runs a single download for download_files(), capturing its outcome instead of raising
+    """
+    if filename is None:
+        filename = os.path.split(urllib.parse.urlparse(url).path)[1]
+
+    start = time.monotonic()
+    try:
+        transferred = _download_url(url=url, path=path, filename=filename, session=session, limiter=limiter, **kwargs)
+    except Exception as e:
+        return DownloadResult(url, os.path.join(path, filename), success=False, elapsed=time.monotonic() - start, error=e)
+
+    return DownloadResult(
+        url,
+        os.path.join(path, filename),
+        success=True,
+        bytes=transferred or 0,
+        elapsed=time.monotonic() - start,
+        skipped=transferred is None)
+
+
+def _download_url(
+        url: str,
+        path: str,
+        filename: str = None,
+        session: ASFSession = None,
+        limiter=None,
+        expected_bytes: int = None,
+        retries: int = DOWNLOAD_RETRIES,
+        chunks: int = 1,
+        buffer_size: int = None,
+        md5sum: str = None) -> int:
+    """
+    Performs the download for download_url(), returning the number of bytes transferred or None if the file already existed
+    """
 
     if filename is None:
         filename = os.path.split(urllib.parse.urlparse(url).path)[1]
@@ -57,23 +175,341 @@ def download_url(url: str, path: str, filename: str = None, session: ASFSession
     if not os.path.isdir(path):
         raise ASFDownloadError(f'Error downloading {url}: directory not found: {path}')
 
-    if os.path.isfile(os.path.join(path, filename)):
-        warnings.warn(f'File already exists, skipping download: {os.path.join(path, filename)}')
-        return
+    file_path = os.path.join(path, filename)
+    if os.path.isfile(file_path):
+        warnings.warn(f'File already exists, skipping download: {file_path}')
+        return None
 
     if session is None:
         session = ASFSession()
 
+    if buffer_size is None:
+        buffer_size = getattr(session, 'download_buffer_size', DOWNLOAD_BUFFER_SIZE)
+
+    partial_path = f'{file_path}.partial'
+    initial_size = os.path.getsize(partial_path) if os.path.isfile(partial_path) else 0
+    checksum = _RunningChecksum(md5sum) if md5sum else None
+
+    # a ranged download can't tell which ranges of an existing partial file are complete, so only start one from scratch
+    if chunks > 1 and initial_size == 0:
+        if _transfer_ranges(url, partial_path, session, limiter, expected_bytes, chunks, retries, buffer_size):
+            if checksum is not None:
+                # ranges arrive out of order, so they can only be hashed in a separate pass once the file is complete
+                checksum.catch_up(partial_path, os.path.getsize(partial_path), bytearray(buffer_size))
+                if not checksum.matches():
+                    os.remove(partial_path)
+                    raise ASFDownloadChecksumError(f'Error downloading {url}: MD5 checksum {checksum.hexdigest()} does not match expected {md5sum}')
+            os.replace(partial_path, file_path)
+            return os.path.getsize(file_path)
+
+    buffer = bytearray(buffer_size)
+    # on a checksum mismatch the file is downloaded once more from scratch, in case a resumed partial file was corrupt
+    for fresh_attempt in range(2):
+        for attempt in range(retries + 1):
+            try:
+                _transfer(url, partial_path, session, limiter, buffer, expected_bytes, checksum)
+                break
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError, requests.exceptions.Timeout, _IncompleteDownloadError) as e:
+                if attempt == retries:
+                    raise ASFDownloadError(f'Error downloading {url}: transfer incomplete after {retries + 1} attempts: {e}') from e
+                initial_size = min(initial_size, os.path.getsize(partial_path) if os.path.isfile(partial_path) else 0)
+
+        if checksum is None or checksum.matches():
+            break
+
+        mismatch = f'Error downloading {url}: MD5 checksum {checksum.hexdigest()} does not match expected {md5sum}'
+        os.remove(partial_path)
+        checksum.reset()
+        initial_size = 0
+    else:
+        raise ASFDownloadChecksumError(mismatch)
+
+    os.replace(partial_path, file_path)
+
+    return os.path.getsize(file_path) - initial_size
+
 
-    def strip_auth_if_aws(r, *args, **kwargs):
-        if 300 <= r.status_code <= 399 and 'amazonaws.com' in urllib.parse.urlparse(r.headers['location']).netloc:
-            location = r.headers['location']
-            r.headers.clear()
-            r.headers['location'] = location
+def _transfer(url: str, partial_path: str, session: ASFSession, limiter, buffer: bytearray, expected_bytes: int = None, checksum=None) -> None:
+    """
+    Downloads url into partial_path, resuming from the end of partial_path if it already has content,
+    reading the response through buffer and writing it through a file buffer of the same size.
+    If given, checksum is updated with every chunk written, and caught up from disk with any content it has not seen yet.
+
+    :raises _IncompleteDownloadError: if the connection ended before the whole file was received
+    :raises ASFDownloadError: if the received file is larger than expected
+    """
+    offset = os.path.getsize(partial_path) if os.path.isfile(partial_path) else 0
+    if expected_bytes is not None and offset == expected_bytes:
+        if checksum is not None:
+            checksum.catch_up(partial_path, offset, buffer)
+        return
+    if expected_bytes is not None and offset > expected_bytes:
+        os.remove(partial_path)
+        offset = 0
 
-    response = session.get(url, stream=True, hooks={'response': strip_auth_if_aws})
+    headers = {'Range': f'bytes={offset}-'} if offset > 0 else {}
+    response = session.get(url, stream=True, headers=headers, hooks={'response': _strip_auth_if_aws})
+
+    if response.status_code == 416 and offset > 0:
+        # the server has nothing past our offset, the partial file is either complete or unusable
+        total = _content_range_total(response)
+        response.close()
+        if total == offset and expected_bytes in [None, offset]:
+            if checksum is not None:
+                checksum.catch_up(partial_path, offset, buffer)
+            return
+        os.remove(partial_path)
+        offset = 0
+        response = session.get(url, stream=True, hooks={'response': _strip_auth_if_aws})
+    elif response.status_code == 206 and _content_range_start(response) != offset:
+        # the server resumed from somewhere other than the end of the partial file, so the download starts over
+        response.close()
+        if os.path.isfile(partial_path):
+            os.remove(partial_path)
+        offset = 0
+        response = session.get(url, stream=True, hooks={'response': _strip_auth_if_aws})
 
     response.raise_for_status()
-    with open(os.path.join(path, filename), 'wb') as f:
-        for chunk in response.iter_content(chunk_size=8192):
+
+    if response.status_code == 206:
+        if _content_range_start(response) != offset:
+            response.close()
+            raise ASFDownloadError(f'Error downloading {url}: server returned a range starting at byte {_content_range_start(response)}, expected {offset}')
+        mode = 'ab'
+        total = _content_range_total(response)
+    else:
+        mode = 'wb'
+        offset = 0
+        total = None
+        if 'Content-Length' in response.headers and 'Content-Encoding' not in response.headers:
+            total = int(response.headers['Content-Length'])
+
+    expected = expected_bytes if expected_bytes is not None else total
+
+    if checksum is not None:
+        if mode == 'wb':
+            checksum.reset()
+        else:
+            checksum.catch_up(partial_path, offset, buffer)
+
+    with open(partial_path, mode, buffering=len(buffer)) as f:
+        for chunk in _read_chunks(response, buffer):
+            if limiter is not None:
+                limiter.consume(len(chunk))
             f.write(chunk)
+            if checksum is not None:
+                checksum.update(chunk)
+
+    size = os.path.getsize(partial_path)
+    if expected is not None and size < expected:
+        raise _IncompleteDownloadError(f'received {size} of {expected} bytes')
+    if expected is not None and size > expected:
+        os.remove(partial_path)
+        raise ASFDownloadError(f'Error downloading {url}: received {size} bytes, expected {expected}')
+
+
+def _transfer_ranges(url: str, partial_path: str, session: ASFSession, limiter, expected_bytes: int, chunks: int, retries: int, buffer_size: int) -> bool:
+    """
+    Downloads url into partial_path as `chunks` byte ranges fetched in parallel, each written in place into a preallocated file
+
+    :return: False, without downloading anything, if the server does not support range requests for this file
+
+    :raises ASFDownloadError: if any range can not be downloaded, in which case partial_path is removed
+    """
+    probe = session.get(url, stream=True, headers={'Range': 'bytes=0-0'}, hooks={'response': _strip_auth_if_aws})
+    probe.close()
+    probe.raise_for_status()
+
+    total = _content_range_total(probe) if probe.status_code == 206 else None
+    if total is None and probe.headers.get('Accept-Ranges') == 'bytes' and 'Content-Encoding' not in probe.headers:
+        total = int(probe.headers['Content-Length']) if 'Content-Length' in probe.headers else None
+    if total is None or total < chunks:
+        return False
+
+    if expected_bytes is not None and total != expected_bytes:
+        raise ASFDownloadError(f'Error downloading {url}: server reports {total} bytes, expected {expected_bytes}')
+
+    # after a redirect away from the original host, such as to a pre-signed S3 URL, the session's credentials must not be sent
+    final_url = probe.url
+    request_kwargs = {}
+    if urllib.parse.urlparse(final_url).netloc != urllib.parse.urlparse(url).netloc:
+        request_kwargs = {'auth': _no_auth, 'headers': {'Authorization': None}}
+
+    chunk_size = -(-total // chunks)
+    ranges = [(start, min(start + chunk_size, total) - 1) for start in range(0, total, chunk_size)]
+
+    with open(partial_path, 'wb') as f:
+        f.truncate(total)
+
+    try:
+        with open(partial_path, 'r+b') as f:
+            write_lock = threading.Lock()
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                futures = [
+                    executor.submit(_transfer_range, final_url, f, write_lock, start, end, session, limiter, retries, buffer_size, request_kwargs)
+                    for start, end in ranges]
+                for future in futures:
+                    future.result()
+    except BaseException:
+        os.remove(partial_path)
+        raise
+
+    return True
+
+
+def _transfer_range(url: str, f, write_lock: threading.Lock, start: int, end: int, session: ASFSession, limiter, retries: int, buffer_size: int, request_kwargs: dict) -> None:
+    """
+    Downloads bytes start-end (inclusive) of url into the same positions of the open file f, resuming the range after connection errors
+    """
+    buffer = bytearray(min(buffer_size, end - start + 1))
+    position = start
+    for attempt in range(retries + 1):
+        headers = dict(request_kwargs.get('headers', {}))
+        headers['Range'] = f'bytes={position}-{end}'
+        try:
+            response = session.get(url, stream=True, **dict(request_kwargs, headers=headers))
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise ASFDownloadError(f'Error downloading {url}: server ignored range request for bytes {position}-{end}')
+
+            for chunk in _read_chunks(response, buffer):
+                if limiter is not None:
+                    limiter.consume(len(chunk))
+                _write_at(f, write_lock, chunk, position)
+                position += len(chunk)
+
+            if position <= end:
+                raise _IncompleteDownloadError(f'received {position - start} of {end - start + 1} bytes of range {start}-{end}')
+            return
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError, requests.exceptions.Timeout, _IncompleteDownloadError) as e:
+            if attempt == retries:
+                raise ASFDownloadError(f'Error downloading {url}: range {start}-{end} incomplete after {retries + 1} attempts: {e}') from e
+
+
+def _read_chunks(response: requests.Response, buffer: bytearray) -> Iterator[memoryview]:
+    """
+    Reads the response body directly into buffer, yielding a view of the filled part of buffer each time.
+    Each view is only valid until the next one is requested, as the same buffer is reused for every read.
+    """
+    response.raw.decode_content = True
+    view = memoryview(buffer)
+    while True:
+        try:
+            size = response.raw.readinto(view)
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        except ReadTimeoutError as e:
+            raise requests.exceptions.ConnectionError(e)
+        if not size:
+            return
+        yield view[:size]
+
+
+def _write_at(f, write_lock: threading.Lock, data: bytes, position: int) -> None:
+    """
+    Writes data at a fixed position of f, safe to call from several threads sharing f
+    """
+    if hasattr(os, 'pwrite'):
+        os.pwrite(f.fileno(), data, position)
+    else:
+        with write_lock:
+            f.seek(position)
+            f.write(data)
+
+
+def _no_auth(r):
+    """Auth handler that leaves requests untouched, overriding any session-level auth"""
+    return r
+
+
+def _strip_auth_if_aws(r, *args, **kwargs):
+    if 300 <= r.status_code <= 399 and 'amazonaws.com' in urllib.parse.urlparse(r.headers['location']).netloc:
+        location = r.headers['location']
+        r.headers.clear()
+        r.headers['location'] = location
+
+
+def _content_range_start(response: requests.Response) -> int:
+    """
+    Extracts the first byte position from a response's Content-Range header ("bytes 100-199/1000"), if present
+    """
+    content_range = response.headers.get('Content-Range', '')
+    start = content_range.partition(' ')[2].partition('-')[0]
+    return int(start) if start.isdigit() else None
+
+
+def _content_range_total(response: requests.Response) -> int:
+    """
+    Extracts the total file size from a response's Content-Range header ("bytes 100-199/1000" or "bytes */1000"), if known
+    """
+    content_range = response.headers.get('Content-Range', '')
+    total = content_range.rpartition('/')[2]
+    return int(total) if total.isdigit() else None
+
+
+class _RunningChecksum:
+    """
+    MD5 checksum of a file, updated with each chunk as it is written so that verifying a download needs no extra pass over the file.
+    Content written before the checksum was created, such as a partial file being resumed, is read back from disk once with catch_up().
+    """
+    def __init__(self, expected: str):
+        self.expected = expected.lower()
+        self.reset()
+
+    def reset(self) -> None:
+        self._hash = hashlib.md5()
+        self.size = 0
+
+    def update(self, data) -> None:
+        self._hash.update(data)
+        self.size += len(data)
+
+    def catch_up(self, path: str, size: int, buffer: bytearray) -> None:
+        """
+        Hashes the bytes of path between what has already been hashed and size
+        """
+        if self.size > size:
+            self.reset()
+
+        view = memoryview(buffer)
+        with open(path, 'rb') as f:
+            f.seek(self.size)
+            while self.size < size:
+                read = f.readinto(view[:min(len(view), size - self.size)])
+                if not read:
+                    break
+                self.update(view[:read])
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+    def matches(self) -> bool:
+        return self.hexdigest() == self.expected
+
+
+class _IncompleteDownloadError(ASFDownloadError):
+    """Raised internally when a transfer ends early, so that it is resumed"""
+
+
+class _BandwidthLimiter:
+    """
+    Thread-safe limiter shared by concurrent downloads, keeping their combined transfer rate under a fixed number of bytes per second
+    """
+    def __init__(self, bytes_per_second: float):
+        if bytes_per_second <= 0:
+            raise ValueError(f'Expected a positive bandwidth limit, got {bytes_per_second}')
+        self._rate = float(bytes_per_second)
+        self._next_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, size: int) -> None:
+        """
+        Reserves the next slot of the shared transfer budget for `size` bytes, sleeping until that slot begins
+        """
+        with self._lock:
+            now = time.monotonic()
+            start = max(self._next_time, now)
+            self._next_time = start + size / self._rate
+
+        if start > now:
+            time.sleep(start - now)
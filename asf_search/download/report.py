@@ -0,0 +1,51 @@
+from collections import UserList
+
+
+class DownloadResult:
+    def __init__(self, url: str, path: str, success: bool, bytes: int = 0, elapsed: float = 0.0, skipped: bool = False, error: Exception = None):
+        """
+        The outcome of downloading a single file
+
+        :param url: URL the file was downloaded from
+        :param path: Local path of the downloaded file
+        :param success: Whether the file is now present at path
+        :param bytes: Number of bytes transferred
+        :param elapsed: Time spent on the download, in seconds
+        :param skipped: Whether the download was skipped because the file already existed
+        :param error: The exception that caused the download to fail, if any
+        """
+        self.url = url
+        self.path = path
+        self.success = success
+        self.bytes = bytes
+        self.elapsed = elapsed
+        self.skipped = skipped
+        self.error = error
+
+    def __repr__(self):
+        status = 'skipped' if self.skipped else ('ok' if self.success else f'failed: {self.error}')
+        return f'DownloadResult({self.path}, {self.bytes} bytes in {self.elapsed:.2f}s, {status})'
+
+
+class DownloadReport(UserList):
+    """
+    List of DownloadResult, one per requested file, in the order the files were requested
+    """
+    def __init__(self, results=None, elapsed: float = 0.0):
+        super().__init__(results if results is not None else [])
+        self.elapsed = elapsed
+
+    @property
+    def succeeded(self) -> list:
+        return [result for result in self if result.success]
+
+    @property
+    def failed(self) -> list:
+        return [result for result in self if not result.success]
+
+    @property
+    def bytes(self) -> int:
+        return sum(result.bytes for result in self)
+
+    def __repr__(self):
+        return f'DownloadReport({len(self.succeeded)} succeeded, {len(self.failed)} failed, {self.bytes} bytes in {self.elapsed:.2f}s)'
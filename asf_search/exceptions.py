@@ -13,12 +13,28 @@ class ASFSearch5xxError(ASFSearchError):
 class ASFServerError(ASFSearchError):
     """Raise when SearchAPI returns an unknown error"""
 
+class ASFSearchBatchError(ASFSearchError):
+    """Raise when one or more batches of a batched search fail"""
+    def __init__(self, message: str, errors: list = None, results=None):
+        super().__init__(message)
+        self.errors = errors if errors is not None else []
+        self.results = results
+
 class ASFBaselineError(ASFSearchError):
     """Raise when baseline related errors occur"""
 
 class ASFDownloadError(ASFError):
     """Base download-related Exception"""
 
+class ASFDownloadChecksumError(ASFDownloadError):
+    """Raise when a downloaded file does not match its expected checksum"""
+
+class ASFDownloadBatchError(ASFDownloadError):
+    """Raise when one or more downloads of a batch fail"""
+    def __init__(self, message: str, report=None):
+        super().__init__(message)
+        self.report = report
+
 class ASFAuthenticationError(ASFError):
     """Base download-related Exception"""
 
@@ -1,16 +1,19 @@
-import requests
 import json
 
 import asf_search.constants
+from asf_search.ASFSession import ASFSession, get_shared_session
 
-def health(host: str = None) -> dict:
+def health(host: str = None, session: ASFSession = None) -> dict:
     """
     Checks basic connectivity to and health of the ASF SearchAPI.
 
     :param host: SearchAPI host, defaults to Production SearchAPI. This option is intended for dev/test purposes.
+    :param session: The session to use for the request, defaults to a shared session with pooled keep-alive connections
     :return: Current configuration and status of subsystems
     """
 
     if host is None:
         host = asf_search.INTERNAL.SEARCH_API_HOST
-    return json.loads(requests.get(f'https://{host}{asf_search.INTERNAL.HEALTH_PATH}').text)
\ No newline at end of file
+    if session is None:
+        session = get_shared_session()
+    return json.loads(session.get(f'https://{host}{asf_search.INTERNAL.HEALTH_PATH}').text)
\ No newline at end of file
@@ -1,6 +1,17 @@
 from .search import search
+from .search_query import SearchQuery
+from .windowed_search import windowed_search_generator
+from .search_plan import plan_search, SearchPlan
+from .cache import SearchCache
+from .coalesce import SearchCoalescer, get_shared_coalescer
+from .product_cache import ProductCache
+from .tiling import tile_geometry
+from .search_generator import search_generator
 from .granule_search import granule_search
 from .product_search import product_search
 from .geo_search import geo_search
-from .baseline_search import stack_from_id
+from .incremental_search import incremental_search, SearchDelta, WatermarkStore
+from .baseline_search import stack_from_id, stacks_from_ids
 from .campaigns import campaigns
+from .async_search import async_search
+from .async_baseline_search import async_stack_from_id, async_stack_from_product
@@ -0,0 +1,70 @@
+from asf_search.search.async_search import async_search
+from asf_search.search.baseline_search import get_stack_params, calc_stack_baselines
+from asf_search.ASFSearchResults import ASFSearchResults
+from asf_search.ASFProduct import ASFProduct
+from asf_search.ASFSession import get_shared_session
+from asf_search.constants import INTERNAL
+from asf_search.exceptions import ASFSearchError
+
+
+async def async_stack_from_product(
+        reference: ASFProduct,
+        strategy = None,
+        host: str = INTERNAL.SEARCH_API_HOST,
+        cmr_token: str = None,
+        cmr_provider: str = None,
+        client = None) -> ASFSearchResults:
+    """
+    Finds a baseline stack from a reference ASFProduct without blocking the event loop, see stack_from_product()
+
+    :param reference: Reference scene to base the stack from, and from which to calculate perpendicular/temporal baselines
+    :param strategy: If the requested reference can not be used to calculate perpendicular baselines, this sort function will be used to pick an alternative reference from the stack. 'None' implies that no attempt will be made to find an alternative reference.
+    :param host: SearchAPI host, defaults to Production SearchAPI. This option is intended for dev/test purposes.
+    :param cmr_token: EDL Auth Token for authenticated searches, see https://urs.earthdata.nasa.gov/user_tokens
+    :param cmr_provider: Custom provider name to constrain CMR results to, for more info on how this is used, see https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html#c-provider
+    :param client: The aiohttp.ClientSession to use, see ASFSession.async_client(). Defaults to a temporary unauthenticated client opened and closed by this call, so no connections are reused between calls. Share one client between calls to pool their connections.
+
+    :return: ASFSearchResults(list) of search results
+    """
+    stack_params = get_stack_params(reference)
+    stack = await async_search(**stack_params, host=host, cmr_token=cmr_token, cmr_provider=cmr_provider, client=client)
+    calc_stack_baselines(reference, stack, strategy=strategy)
+
+    return stack
+
+
+async def async_stack_from_id(
+        reference_id: str,
+        strategy = None,
+        host: str = INTERNAL.SEARCH_API_HOST,
+        cmr_token: str = None,
+        cmr_provider: str = None,
+        client = None) -> ASFSearchResults:
+    """
+    Finds a baseline stack from a reference product ID without blocking the event loop, see stack_from_id()
+
+    :param reference_id: Reference product to base the stack from, and from which to calculate perpendicular/temporal baselines
+    :param strategy: If the requested reference can not be used to calculate perpendicular baselines, this sort function will be used to pick an alternative reference from the stack. 'None' implies that no attempt will be made to find an alternative reference.
+    :param host: SearchAPI host, defaults to Production SearchAPI. This option is intended for dev/test purposes.
+    :param cmr_token: EDL Auth Token for authenticated searches, see https://urs.earthdata.nasa.gov/user_tokens
+    :param cmr_provider: Custom provider name to constrain CMR results to, for more info on how this is used, see https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html#c-provider
+    :param client: The aiohttp.ClientSession to use, see ASFSession.async_client(). Defaults to a temporary unauthenticated client opened and closed by this call, so no connections are reused between calls. Share one client between calls to pool their connections.
+
+    :return: ASFSearchResults(list) of search results
+    """
+    if client is None:
+        async with get_shared_session().async_client() as client:
+            return await async_stack_from_id(reference_id, strategy=strategy, host=host, cmr_token=cmr_token, cmr_provider=cmr_provider, client=client)
+
+    reference_results = await async_search(
+        product_list=[reference_id],
+        host=host,
+        cmr_token=cmr_token,
+        cmr_provider=cmr_provider,
+        client=client)
+
+    if len(reference_results) <= 0:
+        raise ASFSearchError(f'Reference product not found: {reference_id}')
+    reference = reference_results[0]
+
+    return await async_stack_from_product(reference, strategy=strategy, host=host, cmr_token=cmr_token, cmr_provider=cmr_provider, client=client)
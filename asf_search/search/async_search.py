@@ -0,0 +1,140 @@
+from typing import Union, Iterable, Tuple
+import datetime
+import json
+
+from asf_search import __version__
+from asf_search.ASFSearchResults import ASFSearchResults
+from asf_search.ASFProduct import ASFProduct
+from asf_search.ASFSession import get_shared_session
+from asf_search.exceptions import ASFServerError
+from asf_search.constants import INTERNAL
+from asf_search.search.search import build_search_data, search_http_error
+from asf_search.search.feature_stream import _FeatureStream
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+async def async_search(
+        absoluteOrbit: Union[int, Tuple[int, int], Iterable[Union[int, Tuple[int, int]]]] = None,
+        asfFrame: Union[int, Tuple[int, int], Iterable[Union[int, Tuple[int, int]]]] = None,
+        beamMode: Union[str, Iterable[str]] = None,
+        collectionName: Union[str, Iterable[str]] = None,
+        campaign: Union[str, Iterable[str]] = None,
+        maxDoppler: float = None,
+        minDoppler: float = None,
+        end: Union[datetime.datetime, str] = None,
+        maxFaradayRotation: float = None,
+        minFaradayRotation: float = None,
+        flightDirection: str = None,
+        flightLine: str = None,
+        frame: Union[int, Tuple[int, int], Iterable[Union[int, Tuple[int, int]]]] = None,
+        granule_list: Union[str, Iterable[str]] = None,
+        groupID: Union[str, Iterable[str]] = None,
+        insarStackId: str = None,
+        instrument: Union[str, Iterable[str]] = None,
+        intersectsWith: str = None,
+        lookDirection: Union[str, Iterable[str]] = None,
+        offNadirAngle: Union[float, Tuple[float, float], Iterable[Union[float, Tuple[float, float]]]] = None,
+        platform: Union[str, Iterable[str]] = None,
+        polarization: Union[str, Iterable[str]] = None,
+        processingDate: Union[datetime.datetime, str] = None,
+        processingLevel: Union[str, Iterable[str]] = None,
+        product_list: Union[str, Iterable[str]] = None,
+        relativeOrbit: Union[int, Tuple[int, int], Iterable[Union[int, Tuple[int, int]]]] = None,
+        season: Tuple[int, int] = None,
+        start: Union[datetime.datetime, str] = None,
+        maxResults: int = None,
+        host: str = INTERNAL.SEARCH_API_HOST,
+        cmr_token: str = None,
+        cmr_provider: str = None,
+        client = None
+) -> ASFSearchResults:
+    """
+    Performs a generic search using the ASF SearchAPI without blocking the event loop.
+    Accepts the same search parameters as search(), see search() for details on each.
+
+    :param absoluteOrbit: For ALOS, ERS-1, ERS-2, JERS-1, and RADARSAT-1, Sentinel-1A, Sentinel-1B this value corresponds to the orbit count within the orbit cycle. For UAVSAR it is the Flight ID.
+    :param asfFrame: This is primarily an ASF / JAXA frame reference. However, some platforms use other conventions. See ‘frame’ for ESA-centric frame searches.
+    :param beamMode: The beam mode used to acquire the data.
+    :param campaign: For UAVSAR and AIRSAR data collections only. Search by general location, site description, or data grouping as supplied by flight agency or project.
+    :param maxDoppler: Doppler provides an indication of how much the look direction deviates from the ideal perpendicular flight direction acquisition.
+    :param minDoppler: Doppler provides an indication of how much the look direction deviates from the ideal perpendicular flight direction acquisition.
+    :param end: End date of data acquisition. Supports timestamps as well as natural language such as "3 weeks ago"
+    :param maxFaradayRotation: Rotation of the polarization plane of the radar signal impacts imagery, as HH and HV signals become mixed.
+    :param minFaradayRotation: Rotation of the polarization plane of the radar signal impacts imagery, as HH and HV signals become mixed.
+    :param flightDirection: Satellite orbit direction during data acquisition
+    :param flightLine: Specify a flightline for UAVSAR or AIRSAR.
+    :param frame: ESA-referenced frames are offered to give users a universal framing convention. Each ESA frame has a corresponding ASF frame assigned. See also: asfframe
+    :param granule_list: List of specific granules. Search results may include several products per granule name.
+    :param groupID: Identifier used to find products considered to be of the same scene but having different granule names
+    :param insarStackId: Identifier used to find products of the same InSAR stack
+    :param instrument: The instrument used to acquire the data. See also: platform
+    :param intersectsWith: Search by polygon, linestring, or point defined in 2D Well-Known Text (WKT)
+    :param lookDirection: Left or right look direction during data acquisition
+    :param offNadirAngle: Off-nadir angles for ALOS PALSAR
+    :param platform: Remote sensing platform that acquired the data. Platforms that work together, such as Sentinel-1A/1B and ERS-1/2 have multi-platform aliases available. See also: instrument
+    :param polarization: A property of SAR electromagnetic waves that can be used to extract meaningful information about surface properties of the earth.
+    :param processingDate: Used to find data that has been processed at ASF since a given time and date. Supports timestamps as well as natural language such as "3 weeks ago"
+    :param processingLevel: Level to which the data has been processed
+    :param product_list: List of specific products. Guaranteed to be at most one product per product name.
+    :param relativeOrbit: Path or track of satellite during data acquisition. For UAVSAR it is the Line ID.
+    :param season: Start and end day of year for desired seasonal range. This option is used in conjunction with start/end to specify a seasonal range within an overall date range.
+    :param start: Start date of data acquisition. Supports timestamps as well as natural language such as "3 weeks ago"
+    :param maxResults: The maximum number of results to be returned by the search
+    :param host: SearchAPI host, defaults to Production SearchAPI. This option is intended for dev/test purposes.
+    :param cmr_token: EDL authentication token for authenticated searches, see https://urs.earthdata.nasa.gov/user_tokens
+    :param cmr_provider: Custom provider name to constrain CMR results to, for more info on how this is used, see https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html#c-provider
+    :param client: The aiohttp.ClientSession to use, see ASFSession.async_client(). Defaults to a temporary unauthenticated client opened and closed by this call, so no connections are reused between calls. Share one client between calls to pool their connections.
+
+    :return: ASFSearchResults(list) of search results
+    """
+    kwargs = locals()
+    data = dict((k,v) for k,v in kwargs.items() if v is not None and v != '')
+    host = data.pop('host')
+    client = data.pop('client', None)
+
+    data = build_search_data(data)
+
+    if client is None:
+        async with get_shared_session().async_client() as client:
+            return await send_async_search_request(client, host, data)
+
+    return await send_async_search_request(client, host, data)
+
+
+async def send_async_search_request(client, host: str, data: dict) -> ASFSearchResults:
+    """
+    Sends prepared form data to SearchAPI using an aiohttp client, parsing features as they are streamed
+
+    :param client: The aiohttp.ClientSession to send the request with
+    :param host: SearchAPI host to send the request to
+    :param data: Form data, as prepared by build_search_data()
+
+    :return: ASFSearchResults(list) of search results
+
+    :raises ASFSearch4xxError: if SearchAPI returns a 4xx error
+    :raises ASFSearch5xxError: if SearchAPI returns a 5xx error
+    :raises ASFServerError: if SearchAPI returns any other error
+    """
+    headers = {'User-Agent': f'{__name__}.{__version__}'}
+    form = dict((key, str(value)) for key, value in data.items())
+
+    async with client.post(f'https://{host}{INTERNAL.SEARCH_PATH}', data=form, headers=headers) as response:
+        if response.status >= 400:
+            body = await response.read()
+            raise search_http_error(response.status, json.loads(body)['error']['report'])
+
+        if ijson is not None:
+            try:
+                return ASFSearchResults([ASFProduct(f) async for f in ijson.items(response.content, 'features.item', use_float=True)])
+            except ijson.JSONError as e:
+                raise ASFServerError(f'Error parsing GeoJSON from SearchAPI: {e}') from e
+
+        body = await response.read()
+        try:
+            return ASFSearchResults(ASFProduct(f) for f in _FeatureStream([body]).features())
+        except ValueError as e:
+            raise ASFServerError(f'Error parsing GeoJSON from SearchAPI: {e}') from e
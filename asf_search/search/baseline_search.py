@@ -1,12 +1,16 @@
-from dateutil.parser import parse
-import pytz
+from typing import Dict, Iterable
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import json
 
 from asf_search.search import search
 from asf_search.ASFSearchResults import ASFSearchResults
 from asf_search.ASFProduct import ASFProduct
+from asf_search.ASFSession import ASFSession
 from asf_search.search.product_search import product_search
+from asf_search.search.product_cache import ProductCache
 from asf_search.constants import INTERNAL, PLATFORM
-from asf_search.exceptions import ASFSearchError, ASFBaselineError
+from asf_search.exceptions import ASFSearchError, ASFBaselineError, ASFSearchBatchError
 
 
 precalc_platforms = [
@@ -22,23 +26,28 @@ def stack_from_product(
         strategy = None,
         host: str = INTERNAL.SEARCH_API_HOST,
         cmr_token: str = None,
-        cmr_provider: str = None) -> ASFSearchResults:
+        cmr_provider: str = None,
+        session: ASFSession = None,
+        product_cache: ProductCache = None) -> ASFSearchResults:
     """
     Finds a baseline stack from a reference ASFProduct
 
     :param reference: Reference scene to base the stack from, and from which to calculate perpendicular/temporal baselines
-    :param strategy: If the requested reference can not be used to calculate perpendicular baselines, this sort function will be used to pick an alternative reference from the stack. 'None' implies that no attempt will be made to find an alternative reference.
+    :param strategy: If the requested reference can not be used to calculate perpendicular baselines, this sort function will be used to pick an alternative reference from the stack: the stack products that can be used are sorted with it as the key, and the first is used. 'None' implies that no attempt will be made to find an alternative reference.
     :param host: SearchAPI host, defaults to Production SearchAPI. This option is intended for dev/test purposes.
     :param cmr_token: EDL Auth Token for authenticated searches, see https://urs.earthdata.nasa.gov/user_tokens
     :param cmr_provider: Custom provider name to constrain CMR results to, for more info on how this is used, see https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html#c-provider
+    :param session: The session to use for the requests, defaults to a shared session with pooled keep-alive connections
+    :param product_cache: ProductCache to store the products of the stack in, so later lookups of them by ID need no request
 
     :return: ASFSearchResults(dict) of search results
     """
 
     stack_params = get_stack_params(reference)
-    stack = search(**stack_params, host=host, cmr_token=cmr_token, cmr_provider=cmr_provider)
-    calc_temporal_baselines(reference, stack)
-    stack.sort(key=lambda product: product.properties['temporalBaseline'])
+    stack = search(**stack_params, host=host, cmr_token=cmr_token, cmr_provider=cmr_provider, session=session)
+    if product_cache is not None:
+        product_cache.put('fileID', stack, host=host, cmr_provider=cmr_provider)
+    calc_stack_baselines(reference, stack, strategy=strategy)
 
     return stack
 
@@ -47,15 +56,19 @@ def stack_from_id(
         strategy = None,
         host: str = INTERNAL.SEARCH_API_HOST,
         cmr_token: str = None,
-        cmr_provider: str = None) -> ASFSearchResults:
+        cmr_provider: str = None,
+        session: ASFSession = None,
+        product_cache: ProductCache = None) -> ASFSearchResults:
     """
     Finds a baseline stack from a reference product ID
 
     :param reference_id: Reference product to base the stack from, and from which to calculate perpendicular/temporal baselines
-    :param strategy: If the requested reference can not be used to calculate perpendicular baselines, this sort function will be used to pick an alternative reference from the stack. 'None' implies that no attempt will be made to find an alternative reference.
+    :param strategy: If the requested reference can not be used to calculate perpendicular baselines, this sort function will be used to pick an alternative reference from the stack: the stack products that can be used are sorted with it as the key, and the first is used. 'None' implies that no attempt will be made to find an alternative reference.
     :param host: SearchAPI host, defaults to Production SearchAPI. This option is intended for dev/test purposes.
     :param cmr_token: EDL Auth Token for authenticated searches, see https://urs.earthdata.nasa.gov/user_tokens
     :param cmr_provider: Custom provider name to constrain CMR results to, for more info on how this is used, see https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html#c-provider
+    :param session: The session to use for the requests, defaults to a shared session with pooled keep-alive connections
+    :param product_cache: ProductCache to look the reference product up in before searching for it, and to store the products of the stack in
 
     :return: ASFSearchResults(list) of search results
     """
@@ -63,13 +76,125 @@ def stack_from_id(
         [reference_id],
         host=host,
         cmr_token=cmr_token,
-        cmr_provider=cmr_provider)
+        cmr_provider=cmr_provider,
+        session=session,
+        product_cache=product_cache)
 
     if len(reference_results) <= 0:
         raise ASFSearchError(f'Reference product not found: {reference_id}')
     reference = reference_results[0]
 
-    return stack_from_product(reference, host=host, cmr_token=cmr_token, cmr_provider=cmr_provider)
+    return stack_from_product(reference, strategy=strategy, host=host, cmr_token=cmr_token, cmr_provider=cmr_provider, session=session, product_cache=product_cache)
+
+
+def stacks_from_ids(
+        reference_ids: Iterable[str],
+        strategy = None,
+        host: str = INTERNAL.SEARCH_API_HOST,
+        cmr_token: str = None,
+        cmr_provider: str = None,
+        session: ASFSession = None,
+        product_cache: ProductCache = None,
+        max_workers: int = INTERNAL.SEARCH_MAX_WORKERS) -> Dict[str, ASFSearchResults]:
+    """
+    Finds baseline stacks for many reference product IDs at once.
+    References are looked up in a single batched product search, then grouped by their stack search parameters,
+    so references sharing an insarStackId or identical Sentinel-1 stack parameters are searched for only once.
+    Sentinel-1 stacks are searched by the reference's centroid, so references that differ only in their centroid share a search of all of them,
+    and each reference keeps the products whose footprints intersect its own centroid, as stack_from_id() would return.
+    Each reference gets its own copy of the shared stack, with baselines calculated against that reference.
+
+    :param reference_ids: Reference products to base the stacks from, and from which to calculate perpendicular/temporal baselines
+    :param strategy: If a requested reference can not be used to calculate perpendicular baselines, this sort function will be used to pick an alternative reference from its stack, see calc_stack_baselines(). 'None' implies that no attempt will be made to find an alternative reference.
+    :param host: SearchAPI host, defaults to Production SearchAPI. This option is intended for dev/test purposes.
+    :param cmr_token: EDL Auth Token for authenticated searches, see https://urs.earthdata.nasa.gov/user_tokens
+    :param cmr_provider: Custom provider name to constrain CMR results to, for more info on how this is used, see https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html#c-provider
+    :param session: The session to use for the requests, defaults to a shared session with pooled keep-alive connections
+    :param product_cache: ProductCache to look the reference products up in before searching for them, and to store the products of each stack in
+    :param max_workers: The maximum number of distinct stacks to search for concurrently
+
+    :return: Dictionary of each reference ID mapped to its ASFSearchResults(list) stack, in the same order as reference_ids
+
+    :raises ASFSearchBatchError: if any reference is not found, can not be used to build a stack, or its stack search fails, after all other stacks are built. Its results hold the stacks that were built.
+    """
+    if isinstance(reference_ids, str):
+        reference_ids = [reference_ids]
+    reference_ids = list(dict.fromkeys(reference_ids))
+
+    references = product_search(
+        reference_ids,
+        host=host,
+        cmr_token=cmr_token,
+        cmr_provider=cmr_provider,
+        session=session,
+        product_cache=product_cache)
+    references = dict((reference.properties['fileID'], reference) for reference in references)
+
+    errors = []
+    queries = {}
+    reference_queries = {}
+    for reference_id in reference_ids:
+        if reference_id not in references:
+            errors.append((reference_id, ASFSearchError(f'Reference product not found: {reference_id}')))
+            continue
+
+        try:
+            stack_params = get_stack_params(references[reference_id])
+        except ASFBaselineError as e:
+            errors.append((reference_id, e))
+            continue
+
+        centroid = stack_params.pop('intersectsWith', None)
+        query_key = json.dumps(sorted(stack_params.items()), default=str)
+        _, centroids = queries.setdefault(query_key, (stack_params, []))
+        if centroid is not None and centroid not in centroids:
+            centroids.append(centroid)
+        reference_queries[reference_id] = (query_key, centroid)
+
+    def search_stack(stack_params: dict, centroids: list) -> ASFSearchResults:
+        if len(centroids) == 1:
+            stack_params = dict(stack_params, intersectsWith=centroids[0])
+        elif len(centroids) > 1:
+            from shapely import wkt
+            from shapely.geometry import MultiPoint
+
+            stack_params = dict(stack_params, intersectsWith=MultiPoint([wkt.loads(centroid) for centroid in centroids]).wkt)
+
+        stack = search(**stack_params, host=host, cmr_token=cmr_token, cmr_provider=cmr_provider, session=session)
+        if product_cache is not None:
+            product_cache.put('fileID', stack, host=host, cmr_provider=cmr_provider)
+        return stack
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries)))) as executor:
+        futures = dict((query_key, executor.submit(search_stack, stack_params, centroids)) for query_key, (stack_params, centroids) in queries.items())
+
+    stacks = {}
+    for reference_id, (query_key, centroid) in reference_queries.items():
+        try:
+            shared_stack = futures[query_key].result()
+        except Exception as e:
+            errors.append((reference_id, e))
+            continue
+
+        if centroid is not None:
+            shared_stack = shared_stack.intersects(centroid)
+
+        # baselines are written into each product's properties, so every reference gets its own properties
+        stack = ASFSearchResults(
+            ASFProduct({'properties': copy.copy(product.properties), 'geometry': product.geometry})
+            for product in shared_stack)
+        calc_stack_baselines(references[reference_id], stack, strategy=strategy)
+        stacks[reference_id] = stack
+
+    stacks = dict((reference_id, stacks[reference_id]) for reference_id in reference_ids if reference_id in stacks)
+
+    if len(errors) > 0:
+        raise ASFSearchBatchError(
+            f'{len(errors)} of {len(reference_ids)} stacks failed: ' + '; '.join(f'{reference_id}: {e}' for reference_id, e in errors),
+            errors=errors,
+            results=stacks)
+
+    return stacks
 
 
 def get_stack_params(reference: ASFProduct) -> dict:
@@ -103,6 +228,31 @@ def get_stack_params(reference: ASFProduct) -> dict:
     raise ASFBaselineError(f'Reference product is not a pre-calculated baseline dataset, and not a known ephemeris-based dataset: {reference.properties["fileID"]}')
 
 
+def calc_stack_baselines(reference: ASFProduct, stack: ASFSearchResults, strategy = None) -> ASFProduct:
+    """
+    Calculates temporal and perpendicular baselines for a stack, and sorts the stack by temporal baseline.
+    Needs no requests, so can be used on stacks that were searched for or saved earlier.
+
+    :param reference: The product from which to calculate baselines
+    :param stack: The stack to operate on, in place
+    :param strategy: If the reference can not be used to calculate perpendicular baselines, the stack products that can are sorted with this key function and the first is used as the reference instead. 'None' implies that no attempt will be made to find an alternative reference.
+
+    :return: The reference the baselines were calculated from
+    """
+    from asf_search.search.perpendicular_baseline import calc_perpendicular_baselines, has_baseline_data
+
+    if strategy is not None and not has_baseline_data(reference):
+        candidates = [product for product in stack if has_baseline_data(product)]
+        if len(candidates) > 0:
+            reference = sorted(candidates, key=strategy)[0]
+
+    calc_temporal_baselines(reference, stack)
+    calc_perpendicular_baselines(reference, stack)
+    stack.sort(key=lambda product: product.properties['temporalBaseline'])
+
+    return reference
+
+
 def calc_temporal_baselines(reference: ASFProduct, stack: ASFSearchResults) -> None:
     """
     Calculates temporal baselines for a stack of products based on a reference scene and injects those values into the stack.
@@ -111,12 +261,17 @@ def calc_temporal_baselines(reference: ASFProduct, stack: ASFSearchResults) -> N
     :param stack: The stack to operate on.
     :return: None, as the operation occurs in-place on the stack provided.
     """
-    reference_time = parse(reference.properties['startTime'])
-    if reference_time.tzinfo is None:
-        reference_time = pytz.utc.localize(reference_time)
-
-    for secondary in stack:
-        secondary_time = parse(secondary.properties['startTime'])
-        if secondary_time.tzinfo is None:
-            secondary_time = pytz.utc.localize(secondary_time)
-        secondary.properties['temporalBaseline'] = (secondary_time - reference_time).days
+    if len(stack) == 0:
+        return
+
+    import numpy as np
+    from asf_search.dates import to_datetime64
+
+    reference_time = to_datetime64([reference.properties['startTime']], unit='us')[0]
+    secondary_times = to_datetime64([secondary.properties['startTime'] for secondary in stack], unit='us')
+
+    # floor division matches timedelta.days, rounding partial days towards negative infinity
+    baselines = (secondary_times - reference_time) // np.timedelta64(1, 'D')
+
+    for secondary, baseline in zip(stack, baselines.tolist()):
+        secondary.properties['temporalBaseline'] = baseline
@@ -0,0 +1,92 @@
+from typing import Iterable, List
+from concurrent.futures import ThreadPoolExecutor
+
+from asf_search.search import search
+from asf_search.ASFSearchResults import ASFSearchResults
+from asf_search.exceptions import ASFSearchBatchError
+from asf_search.search.product_cache import ProductCache
+
+
+def batch_search(
+        list_field: str,
+        key_field: str,
+        items: Iterable[str],
+        data: dict,
+        batch_size: int,
+        max_workers: int,
+        product_cache: ProductCache = None
+) -> ASFSearchResults:
+    """
+    Splits a list search (granule_list, product_list) into batches, runs the batches concurrently,
+    and merges their results into a single deduplicated ASFSearchResults ordered to match the input list.
+
+    :param list_field: The search parameter holding the list, such as "granule_list" or "product_list"
+    :param key_field: The product property matching entries of the list, used to order the merged results
+    :param items: The full list of granule names or product IDs to search for
+    :param data: Any other search parameters, passed to each batch as-is
+    :param batch_size: The maximum number of list entries to send in a single search
+    :param max_workers: The maximum number of batches to search concurrently
+    :param product_cache: ProductCache to look the list up in first, only list entries missing from it are searched for
+
+    :return: ASFSearchResults(list) of search results
+
+    :raises ASFSearchBatchError: if one or more batches fail, after all other batches have finished
+    """
+    if isinstance(items, str):
+        items = [items]
+    items = list(items)
+
+    if batch_size is None or batch_size < 1:
+        raise ValueError(f'Expected a positive batch_size, got {batch_size}')
+
+    products = []
+    missing = items
+    if product_cache is not None:
+        cached = product_cache.get(key_field, items, host=data.get('host'), cmr_provider=data.get('cmr_provider'))
+        for cached_products in cached.values():
+            products.extend(cached_products)
+        missing = [item for item in items if item not in cached]
+
+    batches = [missing[idx:idx + batch_size] for idx in range(0, len(missing), batch_size)]
+    if len(items) == 0:
+        batches = [items]
+
+    def search_batch(batch: List[str]) -> ASFSearchResults:
+        batch_results = search(**{list_field: batch}, **data)
+        if product_cache is not None:
+            product_cache.put(key_field, batch_results, host=data.get('host'), cmr_provider=data.get('cmr_provider'))
+        return batch_results
+
+    errors = []
+    if len(batches) == 1:
+        products.extend(search_batch(batches[0]))
+    elif len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+            futures = [executor.submit(search_batch, batch) for batch in batches]
+
+        for batch, future in zip(batches, futures):
+            try:
+                products.extend(future.result())
+            except Exception as e:
+                errors.append((batch, e))
+
+    order = {}
+    for idx, item in enumerate(items):
+        order.setdefault(item, idx)
+
+    seen = set()
+    results = ASFSearchResults()
+    for product in sorted(products, key=lambda product: order.get(product.properties.get(key_field), len(items))):
+        if product.properties['fileID'] in seen:
+            continue
+        seen.add(product.properties['fileID'])
+        results.append(product)
+
+    if len(errors) > 0:
+        raise ASFSearchBatchError(
+            f'{len(errors)} of {len(batches)} search batches failed: ' + '; '.join(str(e) for _, e in errors),
+            errors=errors,
+            results=results)
+
+    return results
+
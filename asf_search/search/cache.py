@@ -0,0 +1,157 @@
+from collections import OrderedDict
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from asf_search.constants import SEARCH_CACHE_TTL, SEARCH_CACHE_MAX_BYTES
+
+
+class SearchCache:
+    def __init__(self, path: str = None, ttl: float = SEARCH_CACHE_TTL, max_bytes: int = SEARCH_CACHE_MAX_BYTES):
+        """
+        Persistent, size-bounded cache of search results, opted into by passing it as the `cache` argument of search() or geo_search().
+        Entries are keyed on the normalized form data sent to SearchAPI, so equivalent parameter sets share an entry,
+        and are stored as gzip-compressed GeoJSON features, one file per entry.
+        Note that relative dates such as start="3 weeks ago" are keyed as written, so their entries are only refreshed by the ttl.
+
+        :param path: Directory to store cached results in, defaults to asf_search/search under the user's cache directory
+        :param ttl: Number of seconds a cached result remains valid
+        :param max_bytes: Maximum total size of the cache on disk, least recently used entries are evicted beyond this
+        """
+        if path is None:
+            cache_home = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+            path = os.path.join(cache_home, 'asf_search', 'search')
+
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+
+        os.makedirs(self.path, exist_ok=True)
+        existing = []
+        for name in os.listdir(self.path):
+            if name.endswith('.json.gz'):
+                stat = os.stat(os.path.join(self.path, name))
+                existing.append((stat.st_mtime, name[:-len('.json.gz')], stat.st_size))
+        for _, key, size in sorted(existing):
+            self._entries[key] = size
+            self._size += size
+
+    def get(self, host: str, data: dict) -> list:
+        """
+        Looks up cached results for a search
+
+        :param host: SearchAPI host the search would be sent to
+        :param data: Form data of the search, as prepared by build_search_data()
+
+        :return: List of GeoJSON features, or None if there is no valid entry for this search
+        """
+        key = self.key(host, data)
+        file_path = self._file_path(key)
+
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+
+            try:
+                expired = time.time() - os.stat(file_path).st_mtime > self.ttl
+            except FileNotFoundError:
+                expired = True
+            if expired:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+
+        try:
+            with gzip.open(file_path, 'rt', encoding='utf-8') as f:
+                features = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                if key in self._entries:
+                    self._remove(key)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return features
+
+    def put(self, host: str, data: dict, features: list) -> None:
+        """
+        Stores the results of a search, evicting least recently used entries if the cache grows beyond max_bytes
+
+        :param host: SearchAPI host the search was sent to
+        :param data: Form data of the search, as prepared by build_search_data()
+        :param features: List of GeoJSON features returned by the search
+        """
+        key = self.key(host, data)
+
+        handle, temp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        with os.fdopen(handle, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) as f:
+            f.write(json.dumps(features).encode('utf-8'))
+        size = os.path.getsize(temp_path)
+
+        with self._lock:
+            os.replace(temp_path, self._file_path(key))
+            if key in self._entries:
+                self._size -= self._entries.pop(key)
+            self._entries[key] = size
+            self._size += size
+
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache
+        """
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+    def stats(self) -> dict:
+        """
+        :return: Dictionary of the cache's hit, miss, and eviction counts, along with its current number of entries and size on disk
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._size
+            }
+
+    @staticmethod
+    def key(host: str, data: dict) -> str:
+        """
+        :return: Cache key for a search, derived from its host and normalized form data
+        """
+        normalized = json.dumps([host, sorted((k, str(v)) for k, v in data.items())])
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.path, f'{key}.json.gz')
+
+    def _remove(self, key: str) -> None:
+        self._size -= self._entries.pop(key)
+        try:
+            os.remove(self._file_path(key))
+        except FileNotFoundError:
+            pass
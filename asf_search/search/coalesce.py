@@ -0,0 +1,113 @@
+from typing import Callable, List
+import copy
+import threading
+
+from asf_search.ASFSession import ASFSession
+from asf_search.search.cache import SearchCache
+
+
+class _Flight:
+    """
+    A request in progress, and the callers waiting for it
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.followers = 0
+        self.features = None
+        self.error = None
+
+
+class SearchCoalescer:
+    def __init__(self):
+        """
+        Shares one SearchAPI request between identical searches made at the same time, such as many threads of a service
+        looking up the same reference scene. The first caller sends the request, and callers with the same host, form data and session
+        that arrive while it is in flight wait for it, then receive their own copies of its products, or the error it raised.
+        Nothing is kept once a request completes, see SearchCache for reusing results over time.
+        Used by every search through the shared instance from get_shared_coalescer(), once turned on by setting its enabled attribute to True.
+        Coalesced searches hold their whole response in memory, plus a copy for each caller that joins it,
+        so searches are otherwise streamed into products one feature at a time.
+        """
+        self.enabled = False
+
+        self.requests = 0
+        self.coalesced = 0
+
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def fetch(self, host: str, data: dict, session: ASFSession, fetch: Callable[[], List[dict]]) -> List[dict]:
+        """
+        Runs fetch, unless an identical search is already in flight, in which case its features are shared instead
+
+        :param host: SearchAPI host the search is sent to
+        :param data: Form data of the search, as prepared by build_search_data()
+        :param session: The session the search is sent with, searches with different sessions are never shared
+        :param fetch: Sends the search, returning its GeoJSON features
+
+        :return: GeoJSON features of the search, owned by the caller
+        """
+        if not self.enabled:
+            return fetch()
+
+        key = (SearchCache.key(host, data), session)
+        with self._lock:
+            flight = self._flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.requests += 1
+            else:
+                flight.followers += 1
+                self.coalesced += 1
+
+        if is_leader:
+            return self._lead(key, flight, fetch)
+
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return copy.deepcopy(flight.features)
+
+    def _lead(self, key, flight: _Flight, fetch: Callable[[], List[dict]]) -> List[dict]:
+        # the flight is always released, even on KeyboardInterrupt or SystemExit, so followers never wait forever
+        try:
+            features = fetch()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                followers = flight.followers
+
+            # followers copy from a snapshot, so changes the leader makes to its own results never reach them
+            if flight.error is None and followers > 0:
+                flight.features = copy.deepcopy(features)
+            flight.done.set()
+
+        return features
+
+    def stats(self) -> dict:
+        """
+        :return: Dictionary of the number of requests sent, searches that shared another's request instead, and requests currently in flight
+        """
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._flights)
+            }
+
+
+_shared_coalescer = SearchCoalescer()
+
+
+def get_shared_coalescer() -> SearchCoalescer:
+    """
+    Returns the SearchCoalescer every search goes through
+
+    :return: The shared SearchCoalescer
+    """
+    return _shared_coalescer
@@ -0,0 +1,220 @@
+from typing import Iterable, Iterator
+import codecs
+import json
+import re
+
+import requests
+
+from asf_search.exceptions import ASFServerError
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+def iter_features(response: requests.Response, chunk_size: int = 65536) -> Iterator[dict]:
+    """
+    Incrementally parses the "features" array of a streamed SearchAPI GeoJSON response,
+    yielding one feature at a time so that the full response body is never held in memory at once.
+    Uses ijson (with its fastest available backend) when installed, otherwise falls back to the standard library json module.
+
+    :param response: A SearchAPI response, requested with stream=True
+    :param chunk_size: The number of bytes to read from the connection at a time
+
+    :return: Iterator of GeoJSON feature dictionaries
+
+    :raises ASFServerError: if the response is not a valid GeoJSON FeatureCollection
+    """
+    try:
+        if ijson is not None:
+            response.raw.decode_content = True
+            try:
+                yield from ijson.items(response.raw, 'features.item', use_float=True)
+            except ijson.JSONError as e:
+                raise ASFServerError(f'Error parsing GeoJSON from SearchAPI: {e}') from e
+        else:
+            try:
+                yield from _FeatureStream(response.iter_content(chunk_size=chunk_size)).features()
+            except ValueError as e:
+                raise ASFServerError(f'Error parsing GeoJSON from SearchAPI: {e}') from e
+    finally:
+        response.close()
+
+
+class _FeatureStream:
+    """
+    Minimal incremental JSON reader, able to walk the top level of a GeoJSON FeatureCollection
+    and decode the members of its "features" array one at a time as their bytes arrive.
+    """
+    _whitespace = ' \t\n\r'
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def features(self) -> Iterator[dict]:
+        self._expect('{')
+        if self._peek() == '}':
+            return
+
+        while True:
+            key = self._decode_value()
+            self._expect(':')
+            if key == 'features':
+                yield from self._array_items()
+            else:
+                self._decode_value()
+
+            separator = self._next_char()
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError(f'Expected "," or "}}" at position {self._pos}, got "{separator}"')
+
+    def _array_items(self) -> Iterator[dict]:
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+
+        while True:
+            yield self._decode_value()
+
+            separator = self._next_char()
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f'Expected "," or "]" at position {self._pos}, got "{separator}"')
+
+    def _read_text(self) -> str:
+        """
+        Decodes the next chunk of the response, or returns None once the response is exhausted
+        """
+        if self._eof:
+            return None
+
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._eof = True
+            return self._text_decoder.decode(b'', final=True)
+
+        return self._text_decoder.decode(chunk)
+
+    def _fill(self) -> bool:
+        text = self._read_text()
+        if text is None:
+            return False
+
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in self._whitespace:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError('Unexpected end of response')
+
+    def _next_char(self) -> str:
+        char = self._peek()
+        self._pos += 1
+        return char
+
+    def _expect(self, char: str) -> None:
+        found = self._next_char()
+        if found != char:
+            raise ValueError(f'Expected "{char}" at position {self._pos - 1}, got "{found}"')
+
+    def _decode_value(self):
+        self._peek()
+        scanner = _ValueScanner(self._buffer[self._pos])
+        if scanner.scan(self._buffer, self._pos) < 0:
+            # the rest of the value is read and scanned one chunk at a time, then joined and decoded once,
+            # so that a very large value, such as a detailed geometry, costs time in proportion to its size
+            parts = [self._buffer[self._pos:]]
+            while True:
+                text = self._read_text()
+                if text is None:
+                    if scanner.scalar:
+                        break
+                    raise ValueError('Unexpected end of response')
+                parts.append(text)
+                if scanner.scan(text) >= 0:
+                    break
+
+            self._buffer = ''.join(parts)
+            self._pos = 0
+
+        value, self._pos = self._decoder.raw_decode(self._buffer, self._pos)
+        return value
+
+
+class _ValueScanner:
+    """
+    Finds where a JSON value ends from its text given one piece at a time, without decoding it,
+    carrying whether it is inside a string and how deeply its arrays and objects are nested from one piece to the next
+    """
+    _structure = re.compile(r'[\[\]{}"]')
+    _string_end = re.compile(r'["\\]')
+    _scalar_end = re.compile(r'[\s,\]}]')
+
+    def __init__(self, first: str):
+        self.scalar = first not in '[{"'
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def scan(self, text: str, start: int = 0) -> int:
+        """
+        :return: The position in text just past the end of the value, or -1 if the value continues beyond text
+        """
+        if self.scalar:
+            match = self._scalar_end.search(text, start)
+            return match.start() if match is not None else -1
+
+        position = start
+        if self.escaped:
+            # the previous piece ended on a backslash, so this piece starts with the character it escapes
+            if position >= len(text):
+                return -1
+            position += 1
+            self.escaped = False
+
+        while True:
+            if self.in_string:
+                match = self._string_end.search(text, position)
+                if match is None:
+                    return -1
+                position = match.end()
+                if match.group() == '\\':
+                    if position >= len(text):
+                        self.escaped = True
+                        return -1
+                    position += 1
+                    continue
+                self.in_string = False
+                if self.depth == 0:
+                    return position
+            else:
+                match = self._structure.search(text, position)
+                if match is None:
+                    return -1
+                position = match.end()
+                char = match.group()
+                if char == '"':
+                    self.in_string = True
+                elif char in '[{':
+                    self.depth += 1
+                else:
+                    self.depth -= 1
+                    if self.depth == 0:
+                        return position
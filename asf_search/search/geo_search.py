@@ -3,7 +3,9 @@ import datetime
 
 from asf_search.search import search
 from asf_search.ASFSearchResults import ASFSearchResults
+from asf_search.ASFSession import ASFSession
 from asf_search.constants import INTERNAL
+from asf_search.search.cache import SearchCache
 
 
 def geo_search(
@@ -28,6 +30,13 @@ def geo_search(
         host: str = INTERNAL.SEARCH_API_HOST,
         cmr_token: str = None,
         cmr_provider: str = None,
+        session: ASFSession = None,
+        cache: SearchCache = None,
+        tile_size: float = None,
+        simplify_tolerance: float = None,
+        exact_intersection: bool = False,
+        window_results: int = None,
+        max_workers: int = INTERNAL.SEARCH_MAX_WORKERS
 ) -> ASFSearchResults:
     """
     Performs a geographic search using the ASF SearchAPI
@@ -52,6 +61,13 @@ def geo_search(
     :param host: SearchAPI host, defaults to Production SearchAPI. This option is intended for dev/test purposes.
     :param cmr_token: EDL Auth Token for authenticated searches, see https://urs.earthdata.nasa.gov/user_tokens
     :param cmr_provider: Custom provider name to constrain CMR results to, for more info on how this is used, see https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html#c-provider
+    :param session: The session to use for the request, defaults to a shared session with pooled keep-alive connections
+    :param cache: SearchCache to serve repeated searches from and store new results in, by default results are not cached
+    :param tile_size: Splits intersectsWith into square tiles of this many degrees, searched concurrently and merged. 'None' searches the whole geometry at once.
+    :param simplify_tolerance: Simplifies intersectsWith before searching, moving its outline by at most this many degrees
+    :param exact_intersection: When intersectsWith is tiled or simplified, drops results whose footprints do not intersect the original geometry
+    :param window_results: Splits the start/end range into time windows of about this many products each, searched concurrently and merged. 'None' searches the whole range at once. Can not be combined with tile_size or simplify_tolerance.
+    :param max_workers: The maximum number of tiles or windows to search concurrently
 
     :return: ASFSearchResults(list) of search results
     """
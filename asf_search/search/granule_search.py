@@ -1,15 +1,21 @@
 from typing import Iterable
 
-from asf_search.search import search
+from asf_search.search.batch_search import batch_search
 from asf_search.ASFSearchResults import ASFSearchResults
+from asf_search.ASFSession import ASFSession
 from asf_search.constants import INTERNAL
+from asf_search.search.product_cache import ProductCache
 
 
 def granule_search(
         granule_list: Iterable[str],
         host: str = INTERNAL.SEARCH_API_HOST,
         cmr_token: str = None,
-        cmr_provider: str = None
+        cmr_provider: str = None,
+        session: ASFSession = None,
+        batch_size: int = INTERNAL.SEARCH_BATCH_SIZE,
+        max_workers: int = INTERNAL.SEARCH_MAX_WORKERS,
+        product_cache: ProductCache = None
 ) -> ASFSearchResults:
     """
     Performs a granule name search using the ASF SearchAPI
@@ -18,10 +24,20 @@ def granule_search(
     :param host: SearchAPI host, defaults to Production SearchAPI. This option is intended for dev/test purposes.
     :param cmr_token: EDL Auth Token for authenticated searches, see https://urs.earthdata.nasa.gov/user_tokens
     :param cmr_provider: Custom provider name to constrain CMR results to, for more info on how this is used, see https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html#c-provider
+    :param session: The session to use for the request, defaults to a shared session with pooled keep-alive connections
+    :param batch_size: The maximum number of granule names to send in a single search, longer lists are split into several concurrent searches
+    :param max_workers: The maximum number of batches to search concurrently
+    :param product_cache: ProductCache to look up granules in before searching, only granules missing from it are searched for
 
-    :return: ASFSearchResults(list) of search results
+    :return: ASFSearchResults(list) of search results, deduplicated and in the same order as the input list
+
+    :raises ASFSearchBatchError: if one or more batches fail, with the results of the successful batches attached
     """
     kwargs = locals()
     data = dict((k,v) for k,v in kwargs.items() if v is not None and v != '')
+    granule_list = data.pop('granule_list')
+    batch_size = data.pop('batch_size')
+    max_workers = data.pop('max_workers')
+    product_cache = data.pop('product_cache', None)
 
-    return search(**data)
+    return batch_search('granule_list', 'sceneName', granule_list, data, batch_size, max_workers, product_cache=product_cache)
@@ -0,0 +1,180 @@
+from typing import Dict
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from asf_search.search import search
+from asf_search.search.search import build_search_data
+from asf_search.ASFSearchResults import ASFSearchResults
+from asf_search.ASFSession import ASFSession
+from asf_search.constants import INTERNAL
+
+
+class SearchDelta:
+    def __init__(self, new: ASFSearchResults, updated: ASFSearchResults, watermark: str):
+        """
+        The products found by one run of incremental_search()
+
+        :param new: Products not returned by any earlier run of the query, or forgotten since, see max_seen in incremental_search()
+        :param updated: Products returned by an earlier run that have since been reprocessed
+        :param watermark: The latest processingDate seen by the query so far, which the next run searches from
+        """
+        self.new = new
+        self.updated = updated
+        self.watermark = watermark
+
+    def __len__(self):
+        return len(self.new) + len(self.updated)
+
+    def __repr__(self):
+        return f'SearchDelta({len(self.new)} new, {len(self.updated)} updated, watermark {self.watermark})'
+
+
+class WatermarkStore:
+    def __init__(self, path: str = None):
+        """
+        JSON file holding the state of each named incremental_search() query:
+        its search parameters, latest processingDate seen, and the processingDate of each product it has returned
+
+        :param path: File to keep the state in, defaults to asf_search/watermarks.json under the user's cache directory
+        """
+        if path is None:
+            cache_home = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+            path = os.path.join(cache_home, 'asf_search', 'watermarks.json')
+
+        self.path = path
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> dict:
+        """
+        :return: The saved state of the named query, or None if it has never run
+        """
+        with self._lock:
+            return self._load().get(name)
+
+    def set(self, name: str, state: dict) -> None:
+        """
+        Saves the state of the named query, leaving other queries untouched
+        """
+        with self._lock:
+            states = self._load()
+            states[name] = state
+            self._save(states)
+
+    def remove(self, name: str) -> None:
+        """
+        Forgets the named query, so that its next run searches from scratch
+        """
+        with self._lock:
+            states = self._load()
+            if states.pop(name, None) is not None:
+                self._save(states)
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save(self, states: Dict[str, dict]) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(handle, 'w') as f:
+            json.dump(states, f)
+        os.replace(temp_path, self.path)
+
+
+def incremental_search(
+        name: str,
+        search_params: dict,
+        store: WatermarkStore = None,
+        lag: float = INTERNAL.INCREMENTAL_SEARCH_LAG,
+        max_seen: int = INTERNAL.INCREMENTAL_SEARCH_MAX_SEEN,
+        host: str = INTERNAL.SEARCH_API_HOST,
+        session: ASFSession = None
+) -> SearchDelta:
+    """
+    Runs a named search, returning only the products processed since its previous run.
+    The latest processingDate seen by the query is kept as a watermark in a WatermarkStore, and each run
+    searches for processingDate from that watermark onwards, so the cost of polling scales with new data rather than with archive size.
+    The first run of a query returns everything matching it, from search_params['processingDate'] if given.
+
+    :param name: Name the query's watermark is saved under
+    :param search_params: Parameters accepted by search(), other than host, session and maxResults. Must be the same on every run of the query.
+    :param store: WatermarkStore to keep the query's state in, defaults to one in the user's cache directory
+    :param lag: Number of seconds before the watermark to search from, to catch products that become searchable after others processed later than them. Products already returned are not returned again.
+    :param max_seen: Number of products whose processingDate is remembered, to tell reprocessed products from new ones. The products returned longest ago are forgotten first, and are reported as new if they are reprocessed. Should exceed the number of products processed within lag.
+    :param host: SearchAPI host, defaults to Production SearchAPI. This option is intended for dev/test purposes.
+    :param session: The session to use for the request, defaults to a shared session with pooled keep-alive connections
+
+    :return: SearchDelta of the new and updated products
+
+    :raises ValueError: if search_params include maxResults, or differ from those the query was first run with
+    """
+    if store is None:
+        store = WatermarkStore()
+
+    data = dict((k, v) for k, v in search_params.items() if v is not None and v != '')
+    if 'maxResults' in data:
+        # the watermark would advance past any products left out, and they would never be returned
+        raise ValueError(f'Incremental search "{name}" can not limit maxResults, as products beyond the limit would be skipped by every later run')
+    query_key = hashlib.sha256(json.dumps([host, sorted((k, str(v)) for k, v in build_search_data(data).items())]).encode('utf-8')).hexdigest()
+
+    state = store.get(name)
+    if state is None:
+        state = {'query': query_key, 'watermark': None, 'seen': {}}
+    elif state['query'] != query_key:
+        raise ValueError(f'Search parameters of incremental search "{name}" differ from those it was first run with, use a new name or remove it from the WatermarkStore')
+
+    if state['watermark'] is not None:
+        since = _parse_date(state['watermark']) - datetime.timedelta(seconds=lag)
+        data['processingDate'] = since.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    results = search(**data, host=host, session=session)
+
+    new = ASFSearchResults()
+    updated = ASFSearchResults()
+    watermark = state['watermark']
+    watermark_date = _parse_date(watermark) if watermark is not None else None
+    seen = state['seen']
+    for product in results:
+        file_id = product.properties['fileID']
+        processing_date = product.properties.get('processingDate')
+
+        if file_id not in seen:
+            new.append(product)
+        elif seen[file_id] != processing_date:
+            updated.append(product)
+        else:
+            continue
+
+        # kept in the order products were last returned, so the longest unchanged are forgotten first
+        seen.pop(file_id, None)
+        seen[file_id] = processing_date
+        if processing_date is not None:
+            processing_time = _parse_date(processing_date)
+            if watermark_date is None or processing_time > watermark_date:
+                watermark, watermark_date = processing_date, processing_time
+
+    if len(seen) > max_seen:
+        state['seen'] = dict(list(seen.items())[len(seen) - max_seen:])
+
+    state['watermark'] = watermark
+    store.set(name, state)
+
+    return SearchDelta(new, updated, watermark)
+
+
+def _parse_date(date: str) -> datetime.datetime:
+    from dateutil.parser import parse
+    import pytz
+
+    parsed = parse(date)
+    if parsed.tzinfo is None:
+        parsed = pytz.utc.localize(parsed)
+    return parsed
@@ -0,0 +1,194 @@
+from typing import Iterable, List
+import numpy as np
+from shapely.errors import ShapelyError
+
+from asf_search.ASFProduct import ASFProduct
+from asf_search.dates import to_datetime64
+
+# WGS84 ellipsoid
+WGS84_SEMI_MAJOR_AXIS = 6378137.0
+WGS84_ECCENTRICITY_SQUARED = 6.69437999014e-3
+
+# Newton iterations used to find each secondary's point of closest approach, each one roughly squares the error
+CLOSEST_APPROACH_ITERATIONS = 5
+
+
+def calc_perpendicular_baselines(reference: ASFProduct, stack: Iterable[ASFProduct]) -> None:
+    """
+    Calculates perpendicular baselines for a stack of products based on a reference scene and injects those values into the stack.
+    Products with a pre-calculated "insarBaseline" use the difference between their value and the reference's.
+    Otherwise baselines are calculated from the products' state vectors: each orbit is interpolated from the
+    state vectors before and after its acquisition, the secondary's position is found where it passes through the reference's
+    zero-Doppler plane, and the separation is projected onto the direction perpendicular to the reference's look vector.
+    Products without the metadata needed are given a perpendicularBaseline of None.
+
+    :param reference: The product from which to calculate perpendicular baselines.
+    :param stack: The stack to operate on.
+    :return: None, as the operation occurs in-place on the stack provided.
+    """
+    stack = list(stack)
+    if len(stack) == 0:
+        return
+
+    if reference.properties.get('insarBaseline') is not None:
+        reference_baseline = float(reference.properties['insarBaseline'])
+        for secondary in stack:
+            baseline = secondary.properties.get('insarBaseline')
+            secondary.properties['perpendicularBaseline'] = None if baseline is None else round(float(baseline) - reference_baseline)
+        return
+
+    if not has_baseline_data(reference):
+        for secondary in stack:
+            secondary.properties['perpendicularBaseline'] = None
+        return
+
+    orbits = _Orbits([reference] + stack)
+
+    reference_time = orbits.center[:1]
+    reference_position, reference_velocity = orbits.interpolate(reference_time, [0])
+    reference_position, reference_velocity = reference_position[0], reference_velocity[0]
+
+    target = _ground_position(reference)
+    look = target - reference_position
+    cross_track = np.cross(look, reference_velocity)
+    cross_track /= np.linalg.norm(cross_track)
+
+    indices = np.arange(1, len(orbits.valid))
+    indices = indices[orbits.valid[1:]]
+
+    # start from the same time since the ascending node as the reference, or the product's own center time if unknown
+    times = orbits.center[indices].copy()
+    has_node = ~np.isnan(orbits.ascending_node[indices]) & ~np.isnan(orbits.ascending_node[0])
+    times[has_node] = orbits.ascending_node[indices][has_node] + (orbits.center[0] - orbits.ascending_node[0])
+
+    for _ in range(CLOSEST_APPROACH_ITERATIONS):
+        positions, velocities = orbits.interpolate(times, indices)
+        along_track = (positions - reference_position) @ reference_velocity
+        rate = velocities @ reference_velocity
+        times = times - along_track / rate
+
+    positions, _ = orbits.interpolate(times, indices)
+    baselines = (positions - reference_position) @ cross_track
+
+    perpendicular = [None] * len(stack)
+    for index, baseline in zip(indices.tolist(), baselines.tolist()):
+        perpendicular[index - 1] = round(baseline)
+
+    for secondary, baseline in zip(stack, perpendicular):
+        secondary.properties['perpendicularBaseline'] = baseline
+
+
+def has_baseline_data(product: ASFProduct) -> bool:
+    """
+    Checks whether perpendicular baselines can be calculated with a product as the reference
+
+    :param product: The candidate reference product
+
+    :return: True if the product has a pre-calculated "insarBaseline", or the state vectors and center location needed to calculate baselines
+    """
+    if product.properties.get('insarBaseline') is not None:
+        return True
+
+    try:
+        _ground_position(product)
+    except (KeyError, TypeError, ValueError, AttributeError, ShapelyError):
+        return False
+
+    return bool(_Orbits([product]).valid[0])
+
+
+class _Orbits:
+    """
+    The state vectors of a list of products as arrays, with times in seconds relative to the first product's center time
+    """
+    def __init__(self, products: List[ASFProduct]):
+        count = len(products)
+        self.positions_pre = np.full((count, 3), np.nan)
+        self.positions_post = np.full((count, 3), np.nan)
+        self.velocities_pre = np.full((count, 3), np.nan)
+        self.velocities_post = np.full((count, 3), np.nan)
+
+        for index, product in enumerate(products):
+            for array, field in [
+                    (self.positions_pre, 'sv_pos_pre'),
+                    (self.positions_post, 'sv_pos_post'),
+                    (self.velocities_pre, 'sv_vel_pre'),
+                    (self.velocities_post, 'sv_vel_post')]:
+                array[index] = _vector(product.properties.get(field))
+
+        start = to_datetime64([product.properties.get('startTime') for product in products], unit='us')
+        stop = to_datetime64([product.properties.get('stopTime') for product in products], unit='us')
+        center = start + (stop - start) / 2
+        epoch = center[0] if not np.isnat(center[0]) else start[0]
+
+        def seconds(times: np.ndarray) -> np.ndarray:
+            return (times - epoch) / np.timedelta64(1, 's')
+
+        self.center = seconds(center)
+        self.time_pre = seconds(to_datetime64([product.properties.get('sv_t_pos_pre') for product in products], unit='us'))
+        self.time_post = seconds(to_datetime64([product.properties.get('sv_t_pos_post') for product in products], unit='us'))
+        self.ascending_node = seconds(to_datetime64([product.properties.get('ascendingNodeTime') for product in products], unit='us'))
+
+        self.valid = (
+            ~np.isnan(self.positions_pre).any(axis=1)
+            & ~np.isnan(self.positions_post).any(axis=1)
+            & ~np.isnan(self.velocities_pre).any(axis=1)
+            & ~np.isnan(self.velocities_post).any(axis=1)
+            & ~np.isnan(self.time_pre)
+            & (self.time_post > self.time_pre)
+            & ~np.isnan(self.center))
+
+    def interpolate(self, times: np.ndarray, indices) -> tuple:
+        """
+        Interpolates positions and velocities with cubic Hermite splines between each product's pre and post state vectors
+
+        :param times: Time of each position to find, in seconds relative to the first product's center time
+        :param indices: The product each time belongs to
+
+        :return: Tuple of (positions, velocities), each an array of shape (len(times), 3)
+        """
+        span = (self.time_post[indices] - self.time_pre[indices])[:, np.newaxis]
+        s = (np.asarray(times)[:, np.newaxis] - self.time_pre[indices][:, np.newaxis]) / span
+        p0, p1 = self.positions_pre[indices], self.positions_post[indices]
+        v0, v1 = self.velocities_pre[indices] * span, self.velocities_post[indices] * span
+
+        positions = (
+            (2 * s**3 - 3 * s**2 + 1) * p0
+            + (s**3 - 2 * s**2 + s) * v0
+            + (-2 * s**3 + 3 * s**2) * p1
+            + (s**3 - s**2) * v1)
+        velocities = (
+            (6 * s**2 - 6 * s) * p0
+            + (3 * s**2 - 4 * s + 1) * v0
+            + (-6 * s**2 + 6 * s) * p1
+            + (3 * s**2 - 2 * s) * v1) / span
+
+        return positions, velocities
+
+
+def _vector(value) -> np.ndarray:
+    if isinstance(value, str):
+        value = value.split(',')
+    try:
+        vector = np.array([float(component) for component in value])
+    except (TypeError, ValueError):
+        return np.full(3, np.nan)
+
+    return vector if vector.shape == (3,) else np.full(3, np.nan)
+
+
+def _ground_position(product: ASFProduct) -> np.ndarray:
+    try:
+        latitude = float(product.properties['centerLat'])
+        longitude = float(product.properties['centerLon'])
+    except (KeyError, TypeError, ValueError):
+        centroid = product.centroid()
+        latitude, longitude = centroid.y, centroid.x
+
+    latitude, longitude = np.radians(latitude), np.radians(longitude)
+    radius = WGS84_SEMI_MAJOR_AXIS / np.sqrt(1 - WGS84_ECCENTRICITY_SQUARED * np.sin(latitude)**2)
+
+    return np.array([
+        radius * np.cos(latitude) * np.cos(longitude),
+        radius * np.cos(latitude) * np.sin(longitude),
+        radius * (1 - WGS84_ECCENTRICITY_SQUARED) * np.sin(latitude)])
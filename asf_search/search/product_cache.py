@@ -0,0 +1,110 @@
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+import copy
+import threading
+import time
+
+from asf_search.ASFProduct import ASFProduct
+from asf_search.constants import INTERNAL
+
+
+class ProductCache:
+    def __init__(self, maxsize: int = INTERNAL.PRODUCT_CACHE_MAXSIZE, ttl: float = INTERNAL.PRODUCT_CACHE_TTL):
+        """
+        In-memory, least recently used cache of products looked up by ID, opted into by passing it as the `product_cache` argument
+        of product_search(), granule_search(), stack_from_id() or stack_from_product().
+        Products are cached under the value searched for, a fileID for product searches and a sceneName for granule searches,
+        and are copied on the way in and out so that changes made to returned products never reach the cache.
+
+        :param maxsize: Maximum number of IDs to keep, least recently used IDs are evicted beyond this
+        :param ttl: Number of seconds a cached product remains valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, field: str, values: Iterable[str], host: str = INTERNAL.SEARCH_API_HOST, cmr_provider: str = None) -> Dict[str, List[ASFProduct]]:
+        """
+        Looks up cached products for a list of IDs
+
+        :param field: The product property the IDs refer to, "fileID" or "sceneName"
+        :param values: The IDs to look up
+        :param host: SearchAPI host the products were found on
+        :param cmr_provider: CMR provider the search was constrained to, if any
+
+        :return: Dictionary of the IDs found in the cache, each mapped to a list of fresh copies of its products
+        """
+        now = time.monotonic()
+        found = {}
+
+        with self._lock:
+            for value in values:
+                if value in found:
+                    continue
+
+                key = (host, cmr_provider, field, value)
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[0] > self.ttl:
+                    del self._entries[key]
+                    entry = None
+
+                if entry is None:
+                    self.misses += 1
+                    continue
+
+                self._entries.move_to_end(key)
+                self.hits += 1
+                found[value] = entry[1]
+
+        return dict((value, [ASFProduct(copy.deepcopy(feature)) for feature in features]) for value, features in found.items())
+
+    def put(self, field: str, products: Iterable[ASFProduct], host: str = INTERNAL.SEARCH_API_HOST, cmr_provider: str = None) -> None:
+        """
+        Stores products under the value of one of their properties, replacing whatever was cached for those values
+
+        :param field: The product property to cache the products under, "fileID" or "sceneName"
+        :param products: The products to cache. Products sharing a value are cached together.
+        :param host: SearchAPI host the products were found on
+        :param cmr_provider: CMR provider the search was constrained to, if any
+        """
+        grouped = OrderedDict()
+        for product in products:
+            value = product.properties.get(field)
+            if value is not None:
+                grouped.setdefault(value, []).append(copy.deepcopy(product.geojson()))
+
+        now = time.monotonic()
+        with self._lock:
+            for value, features in grouped.items():
+                key = (host, cmr_provider, field, value)
+                self._entries.pop(key, None)
+                self._entries[key] = (now, features)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        :return: Dictionary of the cache's hit, miss, and eviction counts, along with its current number of entries
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries)
+            }
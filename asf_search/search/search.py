@@ -6,12 +6,18 @@ import math
 
 import warnings
 import inspect
+from concurrent.futures import ThreadPoolExecutor
 
 from asf_search import __version__
 from asf_search.ASFSearchResults import ASFSearchResults
 from asf_search.ASFProduct import ASFProduct
-from asf_search.exceptions import ASFSearch4xxError, ASFSearch5xxError, ASFServerError
+from asf_search.ASFSession import ASFSession, get_shared_session
+from asf_search.exceptions import ASFSearchError, ASFSearch4xxError, ASFSearch5xxError, ASFServerError, ASFSearchBatchError
 from asf_search.constants import INTERNAL
+from asf_search.search.feature_stream import iter_features
+from asf_search.search.cache import SearchCache
+from asf_search.search.coalesce import get_shared_coalescer
+from asf_search.search.tiling import tile_geometry
 
 
 def search(
@@ -46,7 +52,14 @@ def search(
         maxResults: int = None,
         host: str = INTERNAL.SEARCH_API_HOST,
         cmr_token: str = None,
-        cmr_provider: str = None
+        cmr_provider: str = None,
+        session: ASFSession = None,
+        cache: SearchCache = None,
+        tile_size: float = None,
+        simplify_tolerance: float = None,
+        exact_intersection: bool = False,
+        window_results: int = None,
+        max_workers: int = INTERNAL.SEARCH_MAX_WORKERS
 ) -> ASFSearchResults:
     """
     Performs a generic search using the ASF SearchAPI
@@ -82,17 +95,35 @@ def search(
     :param host: SearchAPI host, defaults to Production SearchAPI. This option is intended for dev/test purposes.
     :param cmr_token: EDL authentication token for authenticated searches, see https://urs.earthdata.nasa.gov/user_tokens
     :param cmr_provider: Custom provider name to constrain CMR results to, for more info on how this is used, see https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html#c-provider
+    :param session: The session to use for the request, defaults to a shared session with pooled keep-alive connections
+    :param cache: SearchCache to serve repeated searches from and store new results in, by default results are not cached
+    :param tile_size: Splits intersectsWith into square tiles of this many degrees, searched concurrently and merged. 'None' searches the whole geometry at once.
+    :param simplify_tolerance: Simplifies intersectsWith before searching, moving its outline by at most this many degrees
+    :param exact_intersection: When intersectsWith is tiled or simplified, drops results whose footprints do not intersect the original geometry
+    :param window_results: Splits the start/end range into time windows of about this many products each, searched concurrently and merged. 'None' searches the whole range at once. Can not be combined with tile_size or simplify_tolerance.
+    :param max_workers: The maximum number of tiles or windows to search concurrently
 
     :return: ASFSearchResults(list) of search results
+
+    :raises ASFSearchBatchError: if any tile or window fails, after all other tiles or windows have finished
+    :raises ValueError: if window_results is given together with tile_size or simplify_tolerance and intersectsWith
     """
     
     kwargs = locals()
     data = dict((k,v) for k,v in kwargs.items() if v is not None and v != '')
     host = data.pop('host')
+    session = data.pop('session', None)
+    cache = data.pop('cache', None)
+    tile_size = data.pop('tile_size', None)
+    simplify_tolerance = data.pop('simplify_tolerance', None)
+    exact_intersection = data.pop('exact_intersection')
+    window_results = data.pop('window_results', None)
+    max_workers = data.pop('max_workers')
 
     if 'collectionName' in data:
+        # only the caller's frame is needed, inspect.stack() would build every frame's source context
         stack_level = 2
-        if inspect.stack()[1].function == 'geo_search':
+        if inspect.currentframe().f_back.f_code.co_name == 'geo_search':
             stack_level = 3
 
         warnings.filterwarnings('once')
@@ -100,77 +131,249 @@ def search(
                       DeprecationWarning, 
                       stacklevel=stack_level)
     
-    rename_fields = [(
-        'campaign', 'collectionName'
-    )]
-    for (key, replacement) in rename_fields:
+    if 'intersectsWith' in data and (tile_size is not None or simplify_tolerance is not None):
+        if window_results is not None:
+            raise ValueError('window_results can not be combined with tile_size or simplify_tolerance, search each tile with its own windowed search instead')
+        return search_tiles(data, host, session, cache, tile_size, simplify_tolerance, exact_intersection, max_workers)
+
+    if window_results is not None:
+        from asf_search.search.windowed_search import search_windowed
+
+        return search_windowed(host, build_search_data(data), session, cache, window_results, max_workers)
+
+    return execute_search(host, build_search_data(data), session=session, cache=cache)
+
+
+def execute_search(host: str, data: dict, session: ASFSession = None, cache: SearchCache = None) -> ASFSearchResults:
+    """
+    Runs a search from form data that has already been prepared, see build_search_data()
+
+    :param host: SearchAPI host to send the request to
+    :param data: Form data, as prepared by build_search_data()
+    :param session: The session to use for the request, defaults to the shared session
+    :param cache: SearchCache to serve the search from and store its results in, if any
+
+    :return: ASFSearchResults(list) of search results, shared with identical searches already in flight if coalescing is enabled, see SearchCoalescer
+    """
+    coalescer = get_shared_coalescer()
+    if cache is None and not coalescer.enabled:
+        # nothing else needs the features, so each product is built as it streams in without holding the decoded response
+        response = send_search_request(host, data, stream=True, session=session)
+        return ASFSearchResults(ASFProduct(f) for f in iter_features(response))
+
+    def fetch() -> list:
+        response = send_search_request(host, data, stream=True, session=session)
+        features = list(iter_features(response))
+        if cache is not None:
+            cache.put(host, data, features)
+        return features
+
+    features = cache.get(host, data) if cache is not None else None
+    if features is None:
+        features = coalescer.fetch(host, data, session, fetch)
+
+    return ASFSearchResults(ASFProduct(f) for f in features)
+
+
+def search_tiles(
+        data: dict,
+        host: str,
+        session: ASFSession,
+        cache: SearchCache,
+        tile_size: float,
+        simplify_tolerance: float,
+        exact_intersection: bool,
+        max_workers: int
+) -> ASFSearchResults:
+    """
+    Searches each tile of a simplified and/or tiled intersectsWith geometry concurrently, see tile_geometry(),
+    and merges the results into a single ASFSearchResults, deduplicated by fileID and ordered by descending startTime
+
+    :param data: Dictionary of search parameters, as accepted by search(), with unset values removed
+
+    :return: ASFSearchResults(list) of search results
+
+    :raises ASFSearchBatchError: if any tile fails, after all other tiles have finished. Its results hold the merged results of the other tiles.
+    """
+    tiles = tile_geometry(data['intersectsWith'], tile_size=tile_size, simplify_tolerance=simplify_tolerance)
+
+    def search_tile(tile: str) -> ASFSearchResults:
+        return search(**dict(data, intersectsWith=tile), host=host, session=session, cache=cache)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tiles)))) as executor:
+        futures = [executor.submit(search_tile, tile) for tile in tiles]
+
+    seen = set()
+    results = ASFSearchResults()
+    errors = []
+    for tile, future in zip(tiles, futures):
+        try:
+            tile_results = future.result()
+        except Exception as e:
+            errors.append((tile, e))
+            continue
+
+        for product in tile_results:
+            if product.properties['fileID'] not in seen:
+                seen.add(product.properties['fileID'])
+                results.append(product)
+
+    results.sort(key=lambda product: product.properties.get('startTime') or '', reverse=True)
+
+    if exact_intersection:
+        results = results.intersects(data['intersectsWith'])
+    if 'maxResults' in data:
+        results = ASFSearchResults(results[:data['maxResults']])
+
+    if len(errors) > 0:
+        raise ASFSearchBatchError(
+            f'{len(errors)} of {len(tiles)} search tiles failed: ' + '; '.join(str(e) for _, e in errors),
+            errors=errors,
+            results=results)
+
+    return results
+
+
+# parameters sent to SearchAPI under a different name
+RENAME_FIELDS = [(
+    'campaign', 'collectionName'
+)]
+
+# parameters that accept a single value or a list
+LISTIFY_FIELDS = [
+    'absoluteOrbit',
+    'asfFrame',
+    'beamMode',
+    'collectionName',
+    'frame',
+    'granule_list',
+    'groupID',
+    'instrument',
+    'lookDirection',
+    'offNadirAngle',
+    'platform',
+    'polarization',
+    'processingLevel',
+    'product_list',
+    'relativeOrbit'
+]
+
+# parameters that accept numbers and/or min/max ranges, see flatten_list()
+FLATTEN_FIELDS = [
+    'absoluteOrbit',
+    'asfFrame',
+    'frame',
+    'offNadirAngle',
+    'relativeOrbit']
+
+# parameters sent to SearchAPI as comma-separated strings
+JOIN_FIELDS = [
+    'beamMode',
+    'collectionName',
+    'flightDirection',
+    'granule_list',
+    'groupID',
+    'instrument',
+    'lookDirection',
+    'platform',
+    'polarization',
+    'processingLevel',
+    'product_list']
+
+
+def build_search_data(data: dict) -> dict:
+    """
+    Normalizes search parameters into the form data expected by SearchAPI,
+    renaming deprecated fields and converting list/range values to their comma-separated string forms.
+
+    :param data: Dictionary of search parameters, as accepted by search(), with unset values removed
+
+    :return: Dictionary of form data ready to be sent to SearchAPI
+    """
+    data = dict(data)
+
+    for (key, replacement) in RENAME_FIELDS:
         if key in data:
             data[replacement] = data[key]
             data.pop(key)
     
-    listify_fields = [
-        'absoluteOrbit',
-        'asfFrame',
-        'beamMode',
-        'collectionName',
-        'frame',
-        'granule_list',
-        'groupID',
-        'instrument',
-        'lookDirection',
-        'offNadirAngle',
-        'platform',
-        'polarization',
-        'processingLevel',
-        'product_list',
-        'relativeOrbit'
-    ]
-    for key in listify_fields:
+    for key in LISTIFY_FIELDS:
         if key in data and not isinstance(data[key], list):
             data[key] = [data[key]]
 
-    flatten_fields = [
-        'absoluteOrbit',
-        'asfFrame',
-        'frame',
-        'offNadirAngle',
-        'relativeOrbit']
-    for key in flatten_fields:
+    for key in FLATTEN_FIELDS:
         if key in data:
             data[key] = flatten_list(data[key])
 
-    join_fields = [
-        'beamMode',
-        'collectionName',
-        'flightDirection',
-        'granule_list',
-        'groupID',
-        'instrument',
-        'lookDirection',
-        'platform',
-        'polarization',
-        'processingLevel',
-        'product_list']
-    for key in join_fields:
+    for key in JOIN_FIELDS:
         if key in data:
             data[key] = ','.join(data[key])
 
     data['output'] = 'geojson'
 
+    return data
+
+
+def search_count(host: str, data: dict, session: ASFSession = None) -> int:
+    """
+    Asks SearchAPI how many products match prepared form data, without fetching them
+
+    :param host: SearchAPI host to send the request to
+    :param data: Form data, as prepared by build_search_data(). Its maxResults is ignored.
+    :param session: The session to use for the request, defaults to the shared session
+
+    :return: The number of matching products
+    """
+    data = dict(data)
+    data.pop('maxResults', None)
+    data['output'] = 'count'
+
+    return int(send_search_request(host, data, session=session).text.strip())
+
+
+def send_search_request(host: str, data: dict, stream: bool = False, session: ASFSession = None) -> requests.Response:
+    """
+    Sends prepared form data to SearchAPI and checks the response for errors
+
+    :param host: SearchAPI host to send the request to
+    :param data: Form data, as prepared by build_search_data()
+    :param stream: Whether to defer reading the response body, for use with iter_features()
+    :param session: The session to use for the request, defaults to the shared session
+
+    :return: The successful SearchAPI response
+
+    :raises ASFSearch4xxError: if SearchAPI returns a 4xx error
+    :raises ASFSearch5xxError: if SearchAPI returns a 5xx error
+    :raises ASFServerError: if SearchAPI returns any other error
+    """
+    if session is None:
+        session = get_shared_session()
+
     headers = {'User-Agent': f'{__name__}.{__version__}'}
-    response = requests.post(f'https://{host}{INTERNAL.SEARCH_PATH}', data=data, headers=headers)
+    response = session.post(f'https://{host}{INTERNAL.SEARCH_PATH}', data=data, headers=headers, stream=stream)
 
     try:
         response.raise_for_status()
     except HTTPError:
-        if 400 <= response.status_code <= 499:
-            raise ASFSearch4xxError(f'HTTP {response.status_code}: {response.json()["error"]["report"]}')
-        if 500 <= response.status_code <= 599:
-            raise ASFSearch5xxError(f'HTTP {response.status_code}: {response.json()["error"]["report"]}')
-        raise ASFServerError(f'HTTP {response.status_code}: {response.json()["error"]["report"]}')
-
-    products = [ASFProduct(f) for f in response.json()['features']]
-    return ASFSearchResults(products)
+        raise search_http_error(response.status_code, response.json()["error"]["report"])
+
+    return response
+
+
+def search_http_error(status_code: int, report: str) -> ASFSearchError:
+    """
+    Builds the exception to raise for an unsuccessful SearchAPI response
+
+    :param status_code: The HTTP status code returned by SearchAPI
+    :param report: The error report returned by SearchAPI
+
+    :return: ASFSearch4xxError, ASFSearch5xxError, or ASFServerError, depending on the status code
+    """
+    if 400 <= status_code <= 499:
+        return ASFSearch4xxError(f'HTTP {status_code}: {report}')
+    if 500 <= status_code <= 599:
+        return ASFSearch5xxError(f'HTTP {status_code}: {report}')
+    return ASFServerError(f'HTTP {status_code}: {report}')
 
 
 def flatten_list(items: Iterable[Union[float, Tuple[float, float]]]) -> str:
@@ -0,0 +1,166 @@
+from typing import Union, Iterable, Tuple, Generator
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+
+from asf_search.search.search import build_search_data, send_search_request
+from asf_search.search.feature_stream import iter_features
+from asf_search.ASFSearchResults import ASFSearchResults
+from asf_search.ASFProduct import ASFProduct
+from asf_search.ASFSession import ASFSession
+from asf_search.constants import INTERNAL
+
+
+def search_generator(
+        absoluteOrbit: Union[int, Tuple[int, int], Iterable[Union[int, Tuple[int, int]]]] = None,
+        asfFrame: Union[int, Tuple[int, int], Iterable[Union[int, Tuple[int, int]]]] = None,
+        beamMode: Union[str, Iterable[str]] = None,
+        collectionName: Union[str, Iterable[str]] = None,
+        campaign: Union[str, Iterable[str]] = None,
+        maxDoppler: float = None,
+        minDoppler: float = None,
+        end: Union[datetime.datetime, str] = None,
+        maxFaradayRotation: float = None,
+        minFaradayRotation: float = None,
+        flightDirection: str = None,
+        flightLine: str = None,
+        frame: Union[int, Tuple[int, int], Iterable[Union[int, Tuple[int, int]]]] = None,
+        granule_list: Union[str, Iterable[str]] = None,
+        groupID: Union[str, Iterable[str]] = None,
+        insarStackId: str = None,
+        instrument: Union[str, Iterable[str]] = None,
+        intersectsWith: str = None,
+        lookDirection: Union[str, Iterable[str]] = None,
+        offNadirAngle: Union[float, Tuple[float, float], Iterable[Union[float, Tuple[float, float]]]] = None,
+        platform: Union[str, Iterable[str]] = None,
+        polarization: Union[str, Iterable[str]] = None,
+        processingDate: Union[datetime.datetime, str] = None,
+        processingLevel: Union[str, Iterable[str]] = None,
+        product_list: Union[str, Iterable[str]] = None,
+        relativeOrbit: Union[int, Tuple[int, int], Iterable[Union[int, Tuple[int, int]]]] = None,
+        season: Tuple[int, int] = None,
+        start: Union[datetime.datetime, str] = None,
+        maxResults: int = None,
+        host: str = INTERNAL.SEARCH_API_HOST,
+        cmr_token: str = None,
+        cmr_provider: str = None,
+        session: ASFSession = None,
+        page_size: int = INTERNAL.SEARCH_PAGE_SIZE
+) -> Generator[ASFSearchResults, None, None]:
+    """
+    Performs a generic search using the ASF SearchAPI, fetching results one page at a time.
+    Each page is yielded as soon as it arrives, while the next page is requested in the background,
+    so only a couple of pages are held in memory at any time regardless of the overall result size.
+
+    Pages are requested by walking backwards through acquisition time: SearchAPI returns results
+    ordered by descending startTime, and each page narrows "end" to the oldest startTime seen so far.
+
+    :param absoluteOrbit: For ALOS, ERS-1, ERS-2, JERS-1, and RADARSAT-1, Sentinel-1A, Sentinel-1B this value corresponds to the orbit count within the orbit cycle. For UAVSAR it is the Flight ID.
+    :param asfFrame: This is primarily an ASF / JAXA frame reference. However, some platforms use other conventions. See ‘frame’ for ESA-centric frame searches.
+    :param beamMode: The beam mode used to acquire the data.
+    :param campaign: For UAVSAR and AIRSAR data collections only. Search by general location, site description, or data grouping as supplied by flight agency or project.
+    :param maxDoppler: Doppler provides an indication of how much the look direction deviates from the ideal perpendicular flight direction acquisition.
+    :param minDoppler: Doppler provides an indication of how much the look direction deviates from the ideal perpendicular flight direction acquisition.
+    :param end: End date of data acquisition. Supports timestamps as well as natural language such as "3 weeks ago"
+    :param maxFaradayRotation: Rotation of the polarization plane of the radar signal impacts imagery, as HH and HV signals become mixed.
+    :param minFaradayRotation: Rotation of the polarization plane of the radar signal impacts imagery, as HH and HV signals become mixed.
+    :param flightDirection: Satellite orbit direction during data acquisition
+    :param flightLine: Specify a flightline for UAVSAR or AIRSAR.
+    :param frame: ESA-referenced frames are offered to give users a universal framing convention. Each ESA frame has a corresponding ASF frame assigned. See also: asfframe
+    :param granule_list: List of specific granules. Search results may include several products per granule name.
+    :param groupID: Identifier used to find products considered to be of the same scene but having different granule names
+    :param insarStackId: Identifier used to find products of the same InSAR stack
+    :param instrument: The instrument used to acquire the data. See also: platform
+    :param intersectsWith: Search by polygon, linestring, or point defined in 2D Well-Known Text (WKT)
+    :param lookDirection: Left or right look direction during data acquisition
+    :param offNadirAngle: Off-nadir angles for ALOS PALSAR
+    :param platform: Remote sensing platform that acquired the data. Platforms that work together, such as Sentinel-1A/1B and ERS-1/2 have multi-platform aliases available. See also: instrument
+    :param polarization: A property of SAR electromagnetic waves that can be used to extract meaningful information about surface properties of the earth.
+    :param processingDate: Used to find data that has been processed at ASF since a given time and date. Supports timestamps as well as natural language such as "3 weeks ago"
+    :param processingLevel: Level to which the data has been processed
+    :param product_list: List of specific products. Guaranteed to be at most one product per product name.
+    :param relativeOrbit: Path or track of satellite during data acquisition. For UAVSAR it is the Line ID.
+    :param season: Start and end day of year for desired seasonal range. This option is used in conjunction with start/end to specify a seasonal range within an overall date range.
+    :param start: Start date of data acquisition. Supports timestamps as well as natural language such as "3 weeks ago"
+    :param maxResults: The maximum number of results to be returned by the search
+    :param host: SearchAPI host, defaults to Production SearchAPI. This option is intended for dev/test purposes.
+    :param cmr_token: EDL authentication token for authenticated searches, see https://urs.earthdata.nasa.gov/user_tokens
+    :param cmr_provider: Custom provider name to constrain CMR results to, for more info on how this is used, see https://cmr.earthdata.nasa.gov/search/site/docs/search/api.html#c-provider
+    :param session: The session to use for the request, defaults to a shared session with pooled keep-alive connections
+    :param page_size: The number of products to request from SearchAPI per page
+
+    :return: Generator of ASFSearchResults(list), one per page of search results
+    """
+    kwargs = locals()
+    data = dict((k,v) for k,v in kwargs.items() if v is not None and v != '')
+    host = data.pop('host')
+    session = data.pop('session', None)
+    page_size = data.pop('page_size')
+    max_results = data.pop('maxResults', None)
+
+    data = build_search_data(data)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        request_size = page_size if max_results is None else min(page_size, max_results)
+        pending = executor.submit(_fetch_page, host, data, request_size, session)
+        boundary_time = None
+        boundary_ids = set()
+        count = 0
+
+        while pending is not None:
+            features = pending.result()
+            pending = None
+
+            page = []
+            for feature in features:
+                properties = feature['properties']
+                if properties['startTime'] == boundary_time and properties['fileID'] in boundary_ids:
+                    continue
+                page.append(ASFProduct(feature))
+
+            if max_results is not None:
+                page = page[:max_results - count]
+            count += len(page)
+
+            is_last_page = len(features) < request_size or (max_results is not None and count >= max_results)
+
+            if not is_last_page:
+                if len(page) == 0:
+                    # every product on this page shares the boundary startTime, widen the page to get past it
+                    request_size *= 2
+                else:
+                    oldest_time = page[-1].properties['startTime']
+                    if oldest_time != boundary_time:
+                        boundary_time = oldest_time
+                        boundary_ids = set()
+                    boundary_ids.update(
+                        product.properties['fileID'] for product in page
+                        if product.properties['startTime'] == boundary_time)
+                    request_size = page_size + len(boundary_ids)
+                    if max_results is not None:
+                        request_size = min(request_size, max_results - count + len(boundary_ids))
+
+                page_data = dict(data)
+                page_data['end'] = boundary_time if boundary_time.endswith('Z') else f'{boundary_time}Z'
+                pending = executor.submit(_fetch_page, host, page_data, request_size, session)
+
+            if len(page) > 0:
+                yield ASFSearchResults(page)
+
+
+def _fetch_page(host: str, data: dict, page_size: int, session: ASFSession = None) -> list:
+    """
+    Requests a single page of results from SearchAPI
+
+    :param host: SearchAPI host to send the request to
+    :param data: Form data, as prepared by build_search_data()
+    :param page_size: The maximum number of products to request
+    :param session: The session to use for the request, defaults to the shared session
+
+    :return: List of GeoJSON features returned by SearchAPI
+    """
+    data = dict(data)
+    data['maxResults'] = page_size
+
+    response = send_search_request(host, data, stream=True, session=session)
+
+    return list(iter_features(response))
@@ -0,0 +1,122 @@
+from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import math
+
+from asf_search.constants import INTERNAL
+from asf_search.search.search import execute_search, search_count
+from asf_search.search.search_query import SearchQuery
+from asf_search.search.tiling import tile_geometry
+from asf_search.search.windowed_search import plan_windows, _window_data
+
+
+class SearchPlan:
+    def __init__(
+            self,
+            count: int,
+            page_size: int,
+            windows: List[Tuple[str, str, int]],
+            tiles: List[Tuple[str, int]],
+            bytes: int,
+            sample_size: int):
+        """
+        The expected size of a search, as returned by plan_search()
+
+        :param count: Number of products the search returns, at most its maxResults
+        :param page_size: Number of products per page that pages is counted with
+        :param windows: Start, end and product count of each window a windowed search would use, see windowed_search_generator(). Empty unless window_results was given.
+        :param tiles: WKT and product count of each tile a tiled search would use, see tile_geometry(). Empty unless tile_size or simplify_tolerance was given. Products overlapping several tiles are counted by each of them.
+        :param bytes: Total size of the products' files, from their "bytes" property
+        :param sample_size: Number of products the size was measured from. When fewer than count, bytes is extrapolated from their mean size.
+        """
+        self.count = count
+        self.page_size = page_size
+        self.windows = windows
+        self.tiles = tiles
+        self.bytes = bytes
+        self.sample_size = sample_size
+
+    @property
+    def pages(self) -> int:
+        """
+        Number of pages search_generator() would request with page_size products each
+        """
+        return math.ceil(self.count / self.page_size)
+
+    @property
+    def bytes_estimated(self) -> bool:
+        """
+        Whether bytes was extrapolated from a sample rather than summed over every product
+        """
+        return self.sample_size < self.count
+
+    def __repr__(self):
+        size = f'{"~" if self.bytes_estimated else ""}{self.bytes} bytes'
+        return f'SearchPlan({self.count} products, {self.pages} pages, {len(self.windows)} windows, {len(self.tiles)} tiles, {size})'
+
+
+def plan_search(
+        query: SearchQuery,
+        page_size: int = INTERNAL.SEARCH_PAGE_SIZE,
+        window_results: int = None,
+        tile_size: float = None,
+        simplify_tolerance: float = None,
+        sample_size: int = INTERNAL.SEARCH_PLAN_SAMPLE_SIZE,
+        max_workers: int = INTERNAL.SEARCH_MAX_WORKERS
+) -> SearchPlan:
+    """
+    Measures a search before running it, using count-only SearchAPI requests and a small sample of its products,
+    so that a large search or download can be split up and given workers ahead of time.
+
+    :param query: The SearchQuery to plan
+    :param page_size: The number of products per page to count pages with
+    :param window_results: Plans the time windows search(window_results=...) would split the query into. 'None' skips windows.
+    :param tile_size: Plans the tiles search(tile_size=...) would split the query's intersectsWith into
+    :param simplify_tolerance: Simplifies intersectsWith before planning its tiles, as search(simplify_tolerance=...) would
+    :param sample_size: The number of products to fetch to estimate the total download size. The newest products are sampled. 0 skips the estimate.
+    :param max_workers: The maximum number of requests to run at once
+
+    :return: SearchPlan of the search
+    """
+    host, data, session = query.host, query.data, query.session
+    max_results = data.get('maxResults')
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        count = executor.submit(query.count)
+
+        sample = None
+        if sample_size > 0:
+            sample_data = dict(data, maxResults=sample_size if max_results is None else min(sample_size, max_results))
+            sample = executor.submit(execute_search, host, sample_data, session)
+
+        windows = []
+        if window_results is not None:
+            for window, window_count in plan_windows(host, data, session, window_results, executor):
+                window_data = _window_data(data, window)
+                windows.append((window_data['start'], window_data['end'], window_count))
+            windows.sort()
+
+        tiles = []
+        if 'intersectsWith' in data and (tile_size is not None or simplify_tolerance is not None):
+            geometries = tile_geometry(data['intersectsWith'], tile_size=tile_size, simplify_tolerance=simplify_tolerance)
+            tile_counts = executor.map(lambda tile: search_count(host, dict(data, intersectsWith=tile), session=session), geometries)
+            tiles = list(zip(geometries, tile_counts))
+
+        count = count.result()
+        if max_results is not None:
+            count = min(count, max_results)
+
+        sample = sample.result() if sample is not None else []
+
+    sizes = [float(product.properties['bytes']) for product in sample if product.properties.get('bytes') is not None]
+    if len(sample) >= count:
+        total_bytes = sum(sizes)
+    else:
+        total_bytes = count * sum(sizes) / len(sizes) if len(sizes) > 0 else 0
+
+    return SearchPlan(
+        count=count,
+        page_size=page_size,
+        windows=windows,
+        tiles=tiles,
+        bytes=int(round(total_bytes)),
+        sample_size=min(len(sample), count))
@@ -0,0 +1,134 @@
+import inspect
+import warnings
+
+from asf_search.ASFSearchResults import ASFSearchResults
+from asf_search.ASFSession import ASFSession
+from asf_search.constants import INTERNAL
+from asf_search.search.search import search, build_search_data, execute_search, search_count, RENAME_FIELDS, LISTIFY_FIELDS, FLATTEN_FIELDS, JOIN_FIELDS
+from asf_search.search.cache import SearchCache
+
+# search() arguments that control how a search is run rather than what it searches for
+_RUN_PARAMETERS = ['host', 'session', 'cache', 'tile_size', 'simplify_tolerance', 'exact_intersection', 'window_results', 'max_workers']
+
+SEARCH_PARAMETERS = frozenset(name for name in inspect.signature(search).parameters if name not in _RUN_PARAMETERS)
+
+# search parameters that build_search_data() renames or converts, any other parameter is sent to SearchAPI as given
+_FORM_FIELDS = dict(RENAME_FIELDS)
+_NORMALIZED_FIELDS = frozenset(list(_FORM_FIELDS) + LISTIFY_FIELDS + FLATTEN_FIELDS + JOIN_FIELDS)
+
+# search parameters sent as the same form field, such as campaign and its deprecated alias collectionName, so that replacing one replaces both
+_ALIASES = dict(RENAME_FIELDS + [(form_field, name) for name, form_field in RENAME_FIELDS])
+
+
+class SearchQuery:
+    def __init__(
+            self,
+            host: str = INTERNAL.SEARCH_API_HOST,
+            session: ASFSession = None,
+            cache: SearchCache = None,
+            **params):
+        """
+        Search parameters that are validated and converted to SearchAPI form data once, and can then be run any number of times.
+        Use replace() to derive queries that change a few parameters, such as sweeping the same filters over many AOIs or dates,
+        without normalizing the unchanged parameters again.
+
+        :param host: SearchAPI host, defaults to Production SearchAPI. This option is intended for dev/test purposes.
+        :param session: The session to use for the requests, defaults to a shared session with pooled keep-alive connections
+        :param cache: SearchCache to serve repeated searches from and store new results in, by default results are not cached
+        :param params: Any of the search parameters accepted by search(), such as platform, start, end or intersectsWith
+
+        :raises TypeError: if a parameter is not accepted by search()
+        :raises ValueError: if a parameter can not be converted to form data, such as a descending min/max range
+        """
+        self.host = host
+        self.session = session
+        self.cache = cache
+        self._params = _validate_params(params)
+        self._data = build_search_data(self._params)
+
+    @property
+    def params(self) -> dict:
+        """
+        The query's search parameters, as they were given, with unset values removed
+        """
+        return dict(self._params)
+
+    @property
+    def data(self) -> dict:
+        """
+        The form data the query sends to SearchAPI
+        """
+        return dict(self._data)
+
+    def replace(self, **params) -> 'SearchQuery':
+        """
+        Creates a copy of the query with some parameters changed, normalizing only those parameters.
+        The copy shares the query's host, session and cache unless they are given.
+
+        :param params: Search parameters to change, or to remove when given as None. May also include host, session or cache.
+
+        :return: The new SearchQuery, leaving this one unchanged
+        """
+        query = SearchQuery.__new__(SearchQuery)
+        query.host = params.pop('host', self.host)
+        query.session = params.pop('session', self.session)
+        query.cache = params.pop('cache', self.cache)
+        query._params = dict(self._params)
+        query._data = dict(self._data)
+
+        normalized = {}
+        for name, value in params.items():
+            if name not in SEARCH_PARAMETERS:
+                raise TypeError(f'Unexpected search parameter: {name}')
+
+            query._params.pop(name, None)
+            query._params.pop(_ALIASES.get(name), None)
+            query._data.pop(_FORM_FIELDS.get(name, name), None)
+            if value is None or value == '':
+                continue
+
+            query._params[name] = value
+            if name in _NORMALIZED_FIELDS:
+                normalized[name] = value
+            else:
+                query._data[name] = value
+
+        if len(normalized) > 0:
+            _validate_params(normalized)
+            query._data.update(build_search_data(normalized))
+
+        return query
+
+    def run(self) -> ASFSearchResults:
+        """
+        Sends the query to SearchAPI
+
+        :return: ASFSearchResults(list) of search results
+        """
+        return execute_search(self.host, self._data, session=self.session, cache=self.cache)
+
+    def count(self) -> int:
+        """
+        Asks SearchAPI how many products match the query, without fetching them. The query's maxResults is ignored.
+
+        :return: The number of matching products
+        """
+        return search_count(self.host, self._data, session=self.session)
+
+    def __repr__(self):
+        return f'SearchQuery({", ".join(f"{name}={value!r}" for name, value in self._params.items())})'
+
+
+def _validate_params(params: dict) -> dict:
+    unknown = [name for name in params if name not in SEARCH_PARAMETERS]
+    if len(unknown) > 0:
+        raise TypeError(f'Unexpected search parameter: {", ".join(unknown)}')
+
+    params = dict((name, value) for name, value in params.items() if value is not None and value != '')
+    if 'collectionName' in params:
+        warnings.filterwarnings('once')
+        warnings.warn("search parameter \"collectionName\" is deprecated and will be removed in a future release. Use \"campaign\" instead.",
+                      DeprecationWarning,
+                      stacklevel=3)
+
+    return params
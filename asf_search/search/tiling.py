@@ -0,0 +1,58 @@
+from typing import List
+import math
+
+from asf_search.constants import INTERNAL
+
+
+def tile_geometry(
+        geometry: str,
+        tile_size: float = None,
+        simplify_tolerance: float = None,
+        max_vertices: int = INTERNAL.TILE_MAX_VERTICES
+) -> List[str]:
+    """
+    Prepares a large or complex intersectsWith geometry to be searched as several smaller requests.
+    The geometry is first simplified within simplify_tolerance, then clipped to a grid of square tiles.
+    Pieces with more than max_vertices vertices, or that mix geometry types, are replaced by their convex hull,
+    which may cover slightly more area than the original geometry.
+
+    :param geometry: The intersectsWith geometry, as Well-Known Text
+    :param tile_size: Width and height of each tile, in degrees. 'None' keeps the geometry in one piece.
+    :param simplify_tolerance: Maximum distance, in degrees, that simplification may move the geometry's outline. 'None' skips simplification.
+    :param max_vertices: Maximum number of vertices to send in a single piece
+
+    :return: List of WKT geometries, one per non-empty tile
+    """
+    import numpy as np
+    import shapely
+    from shapely import wkt
+
+    aoi = wkt.loads(geometry)
+    if simplify_tolerance is not None:
+        aoi = aoi.simplify(simplify_tolerance, preserve_topology=True)
+
+    if tile_size is None:
+        pieces = np.array([aoi], dtype=object)
+    else:
+        if tile_size <= 0:
+            raise ValueError(f'Expected a positive tile_size, got {tile_size}')
+
+        min_x, min_y, max_x, max_y = aoi.bounds
+        # lower left corners of every tile overlapping the geometry's bounds, at least one in each direction for points and lines
+        xs = np.arange(math.floor(min_x / tile_size) * tile_size, max(max_x, min_x + tile_size / 2), tile_size)
+        ys = np.arange(math.floor(min_y / tile_size) * tile_size, max(max_y, min_y + tile_size / 2), tile_size)
+        xs, ys = np.meshgrid(xs, ys)
+        tiles = shapely.box(xs.ravel(), ys.ravel(), xs.ravel() + tile_size, ys.ravel() + tile_size)
+
+        shapely.prepare(aoi)
+        tiles = tiles[shapely.intersects(tiles, aoi)]
+        pieces = shapely.intersection(tiles, aoi)
+
+        # drop slivers where the geometry only touches a tile's edge
+        pieces = pieces[~shapely.is_empty(pieces) & (shapely.get_dimensions(pieces) == shapely.get_dimensions(aoi))]
+
+    collections = shapely.get_type_id(pieces) == shapely.GeometryType.GEOMETRYCOLLECTION
+    oversized = shapely.get_num_coordinates(pieces) > max_vertices
+    pieces[collections | oversized] = shapely.convex_hull(pieces[collections | oversized])
+
+    return shapely.to_wkt(pieces, trim=True, rounding_precision=-1).tolist()
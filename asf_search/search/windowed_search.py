@@ -0,0 +1,265 @@
+from typing import Generator, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import datetime
+import math
+
+from asf_search.ASFSearchResults import ASFSearchResults
+from asf_search.ASFSession import ASFSession, get_shared_session
+from asf_search.constants import INTERNAL
+from asf_search.exceptions import ASFSearchBatchError
+from asf_search.search.search import execute_search, search_count, search_http_error
+from asf_search.search.search_query import SearchQuery
+from asf_search.search.cache import SearchCache
+
+Period = Tuple[datetime.datetime, datetime.datetime]
+
+
+def windowed_search_generator(
+        query: SearchQuery,
+        window_results: int = INTERNAL.SEARCH_WINDOW_RESULTS,
+        max_workers: int = INTERNAL.SEARCH_MAX_WORKERS
+) -> Generator[ASFSearchResults, None, None]:
+    """
+    Splits a query's start/end range into time windows expected to hold about window_results products each, and searches them concurrently.
+    Windows are sized from SearchAPI result counts: the whole range is counted, then any window holding more than window_results
+    products is split into equal parts and counted again, so busy periods get shorter windows than quiet ones. Windows without products are never searched.
+    With a season, only the days of each year inside it are split, so every window covers a similar share of the data.
+
+    :param query: The SearchQuery to split. A missing start searches from the earliest data ASF holds, a missing end up to now, and natural language dates are resolved by SearchAPI first.
+    :param window_results: The number of products to aim for in each window
+    :param max_workers: The maximum number of count or search requests to run at once
+
+    :return: Generator of ASFSearchResults(list), one per window in the order they finish, with products already yielded by an earlier window removed
+
+    :raises ASFSearchBatchError: if any window fails, after every other window has been yielded
+    """
+    return search_windows(query.host, query.data, query.session, query.cache, window_results, max_workers)
+
+
+def search_windows(
+        host: str,
+        data: dict,
+        session: ASFSession,
+        cache: SearchCache,
+        window_results: int,
+        max_workers: int,
+        truncate: bool = True
+) -> Generator[ASFSearchResults, None, None]:
+    """
+    Windowed search over prepared form data, see windowed_search_generator()
+
+    :param data: Form data, as prepared by build_search_data()
+    :param truncate: Whether to stop once maxResults products have been yielded. Otherwise every window is yielded in full, each holding at most maxResults products.
+    """
+    max_results = data.get('maxResults') if truncate else None
+
+    def search(window: List[Period]) -> ASFSearchResults:
+        return execute_search(host, _window_data(data, window), session=session, cache=cache)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        searches = []
+        try:
+            for window, _ in plan_windows(host, data, session, window_results, executor):
+                searches.append((window, executor.submit(search, window)))
+
+            seen = set()
+            yielded = 0
+            errors = []
+            merged = ASFSearchResults()
+            windows = dict((future, window) for window, future in searches)
+            for future in as_completed(windows):
+                window = windows[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    errors.append(((_format_date(window[0][0]), _format_date(window[-1][1])), e))
+                    continue
+
+                page = ASFSearchResults()
+                for product in results:
+                    if product.properties['fileID'] not in seen:
+                        seen.add(product.properties['fileID'])
+                        page.append(product)
+
+                if max_results is not None:
+                    page = ASFSearchResults(page[:max_results - yielded])
+                yielded += len(page)
+                merged.extend(page)
+
+                if len(page) > 0:
+                    yield page
+                if max_results is not None and yielded >= max_results:
+                    break
+
+            if len(errors) > 0:
+                raise ASFSearchBatchError(
+                    f'{len(errors)} of {len(searches)} search windows failed: ' + '; '.join(str(e) for _, e in errors),
+                    errors=errors,
+                    results=merged)
+        finally:
+            for _, future in searches:
+                future.cancel()
+
+
+def plan_windows(
+        host: str,
+        data: dict,
+        session: ASFSession,
+        window_results: int,
+        executor: ThreadPoolExecutor
+) -> Generator[Tuple[List[Period], int], None, None]:
+    """
+    Splits the start/end range of prepared form data into windows of at most window_results products, see windowed_search_generator()
+
+    :param data: Form data, as prepared by build_search_data()
+    :param executor: Thread pool to run the count requests in
+
+    :return: Generator of each non-empty window and its product count, yielded as soon as the window is no longer split
+    """
+    if window_results < 1:
+        raise ValueError(f'Expected a positive window_results, got {window_results}')
+
+    start = _resolve_date(data.get('start', INTERNAL.SEARCH_WINDOW_EPOCH), host, session)
+    end = _resolve_date(data['end'], host, session) if 'end' in data else datetime.datetime.now(datetime.timezone.utc)
+    periods = _active_periods(start, end, data.get('season'))
+
+    def count(window: List[Period]) -> int:
+        return search_count(host, _window_data(data, window), session=session)
+
+    level = [(periods, executor.submit(count, periods))] if len(periods) > 0 else []
+    while len(level) > 0:
+        next_level = []
+        for window, window_count in level:
+            window_count = window_count.result()
+            if window_count == 0:
+                continue
+
+            duration = sum((period_end - period_start for period_start, period_end in window), datetime.timedelta())
+            parts = min(
+                math.ceil(window_count / window_results),
+                math.floor(duration.total_seconds() / INTERNAL.SEARCH_WINDOW_MIN_DURATION))
+            if parts <= 1:
+                yield window, window_count
+                continue
+
+            for part in _split_periods(window, parts):
+                next_level.append((part, executor.submit(count, part)))
+        level = next_level
+
+
+def search_windowed(
+        host: str,
+        data: dict,
+        session: ASFSession,
+        cache: SearchCache,
+        window_results: int,
+        max_workers: int
+) -> ASFSearchResults:
+    """
+    Collects every window of a windowed search, see windowed_search_generator(), into a single ASFSearchResults ordered by descending startTime,
+    keeping the newest maxResults products if set
+
+    :param data: Form data, as prepared by build_search_data()
+
+    :raises ASFSearchBatchError: if any window fails, after all other windows have finished. Its results hold the merged results of the other windows.
+    """
+    results = ASFSearchResults()
+    try:
+        for page in search_windows(host, data, session, cache, window_results, max_workers, truncate=False):
+            results.extend(page)
+    except ASFSearchBatchError as e:
+        e.results = _newest(e.results, data.get('maxResults'))
+        raise
+
+    return _newest(results, data.get('maxResults'))
+
+
+def _newest(results: ASFSearchResults, max_results: int = None) -> ASFSearchResults:
+    # every window holds its own newest maxResults products, so the newest maxResults overall are among them
+    results = ASFSearchResults(sorted(results, key=lambda product: product.properties.get('startTime') or '', reverse=True))
+    return results if max_results is None else ASFSearchResults(results[:max_results])
+
+
+def _resolve_date(value, host: str, session: ASFSession) -> datetime.datetime:
+    """
+    Converts a start/end search parameter to a timezone-aware datetime, asking SearchAPI to parse natural language dates such as "3 weeks ago"
+    """
+    if isinstance(value, datetime.datetime):
+        return value if value.tzinfo is not None else value.replace(tzinfo=datetime.timezone.utc)
+
+    from dateutil.parser import isoparse
+
+    try:
+        parsed = isoparse(value)
+    except ValueError:
+        if session is None:
+            session = get_shared_session()
+
+        response = session.get(f'https://{host}{INTERNAL.DATE_PATH}', params={'date': value})
+        if response.status_code != 200:
+            raise search_http_error(response.status_code, response.text)
+        parsed = isoparse(response.json()['date']['parsed'])
+
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=datetime.timezone.utc)
+
+
+def _active_periods(start: datetime.datetime, end: datetime.datetime, season) -> List[Period]:
+    """
+    The periods between start and end that a search can return products from: the whole range, or the days of each year inside the season
+    """
+    if season is None:
+        return [(start, end)] if start < end else []
+
+    if isinstance(season, str):
+        season = season.split(',')
+    first_day, last_day = int(season[0]), int(season[1])
+    # a season such as (330, 30) wraps around the end of the year
+    day_ranges = [(first_day, last_day)] if first_day <= last_day else [(1, last_day), (first_day, 366)]
+
+    periods = []
+    for year in range(start.year, end.year + 1):
+        new_year = datetime.datetime(year, 1, 1, tzinfo=datetime.timezone.utc)
+        next_year = datetime.datetime(year + 1, 1, 1, tzinfo=datetime.timezone.utc)
+        for range_first, range_last in day_ranges:
+            period_start = max(start, new_year + datetime.timedelta(days=range_first - 1))
+            period_end = min(end, next_year, new_year + datetime.timedelta(days=range_last))
+            if period_start < period_end:
+                periods.append((period_start, period_end))
+
+    return periods
+
+
+def _split_periods(periods: List[Period], parts: int) -> List[List[Period]]:
+    """
+    Splits periods into consecutive windows covering equal amounts of time
+    """
+    size = sum((period_end - period_start for period_start, period_end in periods), datetime.timedelta()) / parts
+    windows = [[]]
+    remaining = size
+    for period_start, period_end in periods:
+        while period_start < period_end:
+            if remaining <= datetime.timedelta() and len(windows) < parts:
+                windows.append([])
+                remaining = size
+
+            piece_end = period_end if len(windows) == parts else min(period_end, period_start + remaining)
+            windows[-1].append((period_start, piece_end))
+            remaining -= piece_end - period_start
+            period_start = piece_end
+
+    return [window for window in windows if len(window) > 0]
+
+
+def _window_data(data: dict, window: List[Period]) -> dict:
+    window_data = dict(data)
+    # rounded outwards to whole seconds, products on a shared boundary are found by both windows and deduplicated
+    window_data['start'] = _format_date(window[0][0].replace(microsecond=0))
+    window_end = window[-1][1]
+    if window_end.microsecond > 0:
+        window_end = window_end.replace(microsecond=0) + datetime.timedelta(seconds=1)
+    window_data['end'] = _format_date(window_end)
+    return window_data
+
+
+def _format_date(date: datetime.datetime) -> str:
+    return date.astimezone(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
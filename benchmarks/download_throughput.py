@@ -0,0 +1,69 @@
+"""
+Measures download_url() throughput against a local HTTP server, comparing the original
+8 KiB iter_content() loop with the buffered readinto() path at several buffer sizes.
+
+Usage:
+    python benchmarks/download_throughput.py [size_in_MiB]
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import asf_search
+from asf_search.download import download_url
+
+
+PAYLOAD_MIB = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+PAYLOAD = os.urandom(1024 * 1024)
+
+
+class PayloadHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(PAYLOAD) * PAYLOAD_MIB))
+        self.end_headers()
+        for _ in range(PAYLOAD_MIB):
+            self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args):
+        pass
+
+
+def legacy_download(url: str, path: str, session: asf_search.ASFSession) -> None:
+    response = session.get(url, stream=True)
+    response.raise_for_status()
+    with open(path, 'wb') as f:
+        for chunk in response.iter_content(chunk_size=8192):
+            f.write(chunk)
+
+
+def timed(label: str, download) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        download(directory)
+        elapsed = time.perf_counter() - start
+    print(f'{label:<32} {PAYLOAD_MIB / elapsed:>10.1f} MiB/s')
+
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PayloadHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/payload.zip'
+    session = asf_search.ASFSession()
+
+    print(f'Downloading {PAYLOAD_MIB} MiB from {url}')
+    timed('iter_content, 8 KiB chunks', lambda directory: legacy_download(url, os.path.join(directory, 'payload.zip'), session))
+    for buffer_size in [64 * 1024, 1024 * 1024, 4 * 1024 * 1024, 16 * 1024 * 1024]:
+        timed(
+            f'download_url, {buffer_size // 1024} KiB buffer',
+            lambda directory: download_url(url, directory, session=session, buffer_size=buffer_size))
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
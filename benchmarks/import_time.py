@@ -0,0 +1,58 @@
+"""
+Measures how long `import asf_search` takes in a fresh interpreter, and lists any of the heavy
+dependencies that are only meant to be imported on first use but were imported anyway.
+Exits with an error if the median import time exceeds the given limit, so it can be run in CI.
+
+Usage:
+    python benchmarks/import_time.py [runs] [limit_in_ms]
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+
+
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+LIMIT_MS = float(sys.argv[2]) if len(sys.argv) > 2 else None
+
+DEFERRED_MODULES = ['numpy', 'shapely', 'dateutil', 'pytz', 'asyncio', 'multiprocessing']
+
+PROBE = (
+    'import json, sys, time\n'
+    'start = time.perf_counter()\n'
+    'import asf_search\n'
+    'elapsed = time.perf_counter() - start\n'
+    'print(json.dumps([elapsed * 1000, sorted(sys.modules)]))\n'
+)
+
+
+def measure() -> tuple:
+    output = subprocess.run([sys.executable, '-c', PROBE], check=True, capture_output=True, text=True).stdout
+    elapsed, modules = json.loads(output)
+    return elapsed, set(module.split('.')[0] for module in modules)
+
+
+def main():
+    timings = []
+    imported = set()
+    for _ in range(RUNS):
+        elapsed, modules = measure()
+        timings.append(elapsed)
+        imported |= modules
+
+    median = statistics.median(timings)
+    print(f'import asf_search: median {median:.1f} ms, min {min(timings):.1f} ms, max {max(timings):.1f} ms over {RUNS} runs')
+
+    eager = [module for module in DEFERRED_MODULES if module in imported]
+    if len(eager) > 0:
+        print(f'Imported eagerly: {", ".join(eager)}')
+
+    if LIMIT_MS is not None and median > LIMIT_MS:
+        sys.exit(f'Median import time {median:.1f} ms exceeds the {LIMIT_MS:.1f} ms limit')
+    if len(eager) > 0:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,8 @@ from setuptools import find_packages, setup
 
 requirements = [
     "requests",
-    "shapely",
+    "shapely>=2.0",
+    "numpy",
     "python-dateutil",
     "pytz",
     "importlib_metadata",
@@ -37,7 +38,7 @@ setup(
     package_dir={'asf_search': 'asf_search'},
     python_requires='>=3.6',
     install_requires=requirements,
-    extras_require={ "test": test_requirements },
+    extras_require={ "test": test_requirements, "stream": ["ijson>=3.1"], "async": ["aiohttp>=3.8"] },
     license='BSD',
     license_files=('LICENSE',),
     classifiers=[
@@ -1,5 +1,8 @@
 from asf_search.search.search import ASFProduct, ASFSearchResults
 from unittest.mock import patch
+from shapely.geometry import shape
+import copy
+import pytest
 
 def run_test_ASFProduct_Geo_Search(geographic_response):
     product = ASFProduct(geographic_response)
@@ -8,6 +11,33 @@ def run_test_ASFProduct_Geo_Search(geographic_response):
     assert(geojson['geometry'] == geographic_response['geometry'])
     assert(geojson['properties'] == geographic_response['properties'])
 
+def run_test_ASFProduct_cached_geometry(response):
+    product = ASFProduct(copy.deepcopy(response))
+
+    assert(not hasattr(product, '__dict__'))
+    with pytest.raises(AttributeError):
+        product.unknown_attribute = True
+    # caches hold no objects of their own until first used
+    assert(all(getattr(product, slot) is None for slot in ['_shape', '_shape_source', '_centroid', '_times']))
+
+    centroid = product.centroid()
+    assert(centroid.equals(shape(response['geometry']).centroid))
+    assert(product.centroid() is centroid)
+    assert(product.shape() is product.shape())
+
+    product.geometry['coordinates'] = [[[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]]
+    assert((product.centroid().x, product.centroid().y) == (1, 1))
+    product.geometry = {'type': 'Point', 'coordinates': [5, 6]}
+    assert((product.centroid().x, product.centroid().y) == (5, 6))
+
+    start_time = product.start_time()
+    assert(start_time.tzinfo is not None)
+    assert(product.start_time() is start_time)
+    assert(product.stop_time() >= start_time)
+
+    product.properties['startTime'] = '2020-01-01T00:00:00Z'
+    assert(product.start_time().year == 2020)
+
 def run_test_stack( reference, s1_baseline_stack):
     product = ASFProduct(reference)
     
@@ -1,5 +1,21 @@
-from asf_search.ASFSession import ASFSession
+from asf_search.ASFSession import ASFSession, get_shared_session
+from asf_search.constants import INTERNAL
+from asf_search.search import search
+from unittest.mock import patch
+import requests_mock
 
 def run_auth_with_creds(username: str, password: str):
     session = ASFSession()
     session.auth_with_creds(username=username, password=password)
+
+def test_shared_session_is_reused():
+    assert(get_shared_session() is get_shared_session())
+
+def test_search_uses_provided_session():
+    session = ASFSession(pool_maxsize=4)
+
+    with requests_mock.Mocker() as m:
+        m.post(f"https://{INTERNAL.SEARCH_API_HOST}{INTERNAL.SEARCH_PATH}", json={'features': []})
+        with patch.object(session, 'post', wraps=session.post) as mock_post:
+            search(platform='ALOS', session=session)
+            assert(mock_post.call_count == 1)
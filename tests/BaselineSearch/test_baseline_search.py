@@ -1,8 +1,19 @@
 from unittest.mock import patch
-from asf_search.exceptions import ASFBaselineError, ASFSearchError
+from asf_search.exceptions import ASFBaselineError, ASFSearchError, ASFSearchBatchError
+from asf_search.constants import INTERNAL
+import requests_mock
+import urllib.parse
 from asf_search.ASFSearchResults import ASFSearchResults
 from asf_search.search.search import ASFProduct
-from asf_search.search.baseline_search import calc_temporal_baselines, get_stack_params, stack_from_id, stack_from_product
+from asf_search.search.baseline_search import calc_temporal_baselines, calc_stack_baselines, get_stack_params, stack_from_id, stack_from_product, stacks_from_ids
+from asf_search.search.async_baseline_search import async_stack_from_id
+from asf_search.search.search import build_search_data
+from Search.test_search import StubAsyncClient
+import asyncio
+from asf_search.search.perpendicular_baseline import calc_perpendicular_baselines
+import copy
+import datetime
+import numpy as np
 import pytest
 
 def run_test_get_preprocessed_stack_params(product):
@@ -49,6 +60,13 @@ def run_test_calc_temporal_baselines(reference, stack):
     assert(len(stack) == stackLength)
     for secondary in stack:
         assert('temporalBaseline' in secondary.properties)
+        assert(secondary.properties['temporalBaseline'] == (secondary.start_time() - reference.start_time()).days)
+
+    mixed_formats = ASFSearchResults(
+        ASFProduct({'geometry': {}, 'properties': {'startTime': start_time}})
+        for start_time in ['2020-01-01T00:00:00Z', '2019-12-31T23:59:59.999999', '2020-01-03 12:00:00', '2020-01-02T03:00:00+05:00', 'Jan 5 2020 01:00'])
+    calc_temporal_baselines(mixed_formats[0], mixed_formats)
+    assert([secondary.properties['temporalBaseline'] for secondary in mixed_formats] == [0, -1, 2, 0, 4])
 
 def run_test_stack_from_product(reference, stack):
     reference = ASFProduct(reference)
@@ -80,3 +98,166 @@ def run_test_stack_from_id(stack_id: str, reference, stack):
                     for (idx, secondary) in enumerate(returned_stack):
                         if(idx > 0):
                             assert(secondary.properties['temporalBaseline'] >= stack[idx - 1]["properties"]['temporalBaseline'])
+
+def run_test_async_stack_from_id(stack_id: str, reference, stack):
+    def respond(form):
+        if 'product_list' in form:
+            return 200, {'features': [reference] if stack_id else []}
+        return 200, {'features': stack}
+
+    client = StubAsyncClient(respond)
+
+    if not stack_id:
+        with pytest.raises(ASFSearchError):
+            asyncio.run(async_stack_from_id(stack_id, client=client))
+        return
+
+    returned_stack = asyncio.run(async_stack_from_id(stack_id, client=client))
+    assert(len(returned_stack) == len(stack))
+    for (idx, secondary) in enumerate(returned_stack):
+        if(idx > 0):
+            assert(secondary.properties['temporalBaseline'] >= returned_stack[idx - 1].properties['temporalBaseline'])
+
+    (_, reference_form), (_, stack_form) = client.requests
+    assert(reference_form['product_list'] == stack_id)
+    assert(stack_form == dict((key, str(value)) for key, value in build_search_data(get_stack_params(ASFProduct(reference))).items()))
+
+def run_test_sentinel1_stacks_from_ids(stack):
+    from shapely import wkt
+    from shapely.geometry import shape, mapping
+    from shapely.affinity import translate
+
+    # a neighbouring frame of the same path, whose centroid none of the other footprints cover
+    neighbour = copy.deepcopy(stack[0])
+    neighbour['properties']['fileID'] = 'S1-neighbouring-frame'
+    neighbour['geometry'] = mapping(translate(shape(neighbour['geometry']), yoff=5))
+    stack = stack + [neighbour]
+
+    features_by_id = dict((feature['properties']['fileID'], feature) for feature in stack)
+    reference_ids = [feature['properties']['fileID'] for feature in stack]
+    received = []
+
+    def stack_response(request, context):
+        form = urllib.parse.parse_qs(request.body)
+        received.append(form)
+        if 'product_list' in form:
+            return {'features': [features_by_id[product_id] for product_id in form['product_list'][0].split(',') if product_id in features_by_id]}
+        aoi = wkt.loads(form['intersectsWith'][0])
+        return {'features': [feature for feature in stack if shape(feature['geometry']).intersects(aoi)]}
+
+    with requests_mock.Mocker() as m:
+        m.post(f"https://{INTERNAL.SEARCH_API_HOST}{INTERNAL.SEARCH_PATH}", json=stack_response)
+        stacks = stacks_from_ids(reference_ids)
+
+    assert(list(stacks.keys()) == reference_ids)
+    assert(len(received) == 2)
+    assert(wkt.loads(received[1]['intersectsWith'][0]).geom_type == 'MultiPoint')
+    for reference_id, reference_stack in stacks.items():
+        centroid = ASFProduct(features_by_id[reference_id]).centroid()
+        assert(sorted(product.properties['fileID'] for product in reference_stack) == sorted(
+            feature['properties']['fileID'] for feature in stack if shape(feature['geometry']).intersects(centroid)))
+    assert([product.properties['fileID'] for product in stacks[neighbour['properties']['fileID']]] == [neighbour['properties']['fileID']])
+    assert(len(stacks[reference_ids[0]]) == len(stack) - 1)
+
+def synthetic_orbit_product(template, acquisition: datetime.datetime, offset, timing: float = 0):
+    """
+    Copies a product, replacing its times and state vectors with those of a circular polar orbit
+    ascending 600 seconds before the acquisition, shifted in space by offset and in time by timing seconds
+    """
+    radius, rate = 7071000.0, 2 * np.pi / 5900
+
+    def state(seconds_since_node):
+        angle = rate * seconds_since_node
+        position = radius * np.array([np.cos(angle), 0, np.sin(angle)]) + offset
+        velocity = radius * rate * np.array([-np.sin(angle), 0, np.cos(angle)])
+        return ','.join(str(v) for v in position), ','.join(str(v) for v in velocity)
+
+    def iso(time):
+        return time.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+    product = copy.deepcopy(template)
+    center = acquisition + datetime.timedelta(seconds=timing)
+    node = acquisition - datetime.timedelta(seconds=600)
+    product['properties'].update({
+        'startTime': iso(center - datetime.timedelta(seconds=12)),
+        'stopTime': iso(center + datetime.timedelta(seconds=12)),
+        'ascendingNodeTime': iso(node),
+        'sv_t_pos_pre': iso(center - datetime.timedelta(seconds=5)),
+        'sv_t_pos_post': iso(center + datetime.timedelta(seconds=5)),
+        'centerLat': np.degrees(rate * 600),
+        'centerLon': 3.0
+    })
+    product['properties']['sv_pos_pre'], product['properties']['sv_vel_pre'] = state(600 + timing - 5)
+    product['properties']['sv_pos_post'], product['properties']['sv_vel_post'] = state(600 + timing + 5)
+    product['properties'].pop('insarBaseline', None)
+    return product
+
+def run_test_calc_perpendicular_baselines(template):
+    acquisition = datetime.datetime(2021, 1, 1, 12, 0, 0)
+    reference = ASFProduct(synthetic_orbit_product(template, acquisition, np.zeros(3)))
+
+    # unit vector perpendicular to both the reference's look direction and its velocity
+    latitude, longitude = np.radians(reference.properties['centerLat']), np.radians(3.0)
+    semi_major, eccentricity_squared = 6378137.0, 6.69437999014e-3
+    prime_vertical = semi_major / np.sqrt(1 - eccentricity_squared * np.sin(latitude)**2)
+    target = prime_vertical * np.array([np.cos(latitude) * np.cos(longitude), np.cos(latitude) * np.sin(longitude), (1 - eccentricity_squared) * np.sin(latitude)])
+    position = np.array([float(v) for v in reference.properties['sv_pos_pre'].split(',')])
+    velocity = np.array([float(v) for v in reference.properties['sv_vel_pre'].split(',')])
+    look = target - position
+    cross_track = np.cross(look, velocity)
+    cross_track /= np.linalg.norm(cross_track)
+    look /= np.linalg.norm(look)
+
+    expected = [0, 150, -80, 40]
+    stack = ASFSearchResults([copy.deepcopy(reference)])
+    for (idx, baseline) in enumerate(expected[1:]):
+        offset = baseline * cross_track + 500 * look * idx
+        stack.append(ASFProduct(synthetic_orbit_product(template, acquisition + datetime.timedelta(days=12 * (idx + 1)), offset, timing=2 * idx - 2)))
+    missing_vectors = copy.deepcopy(template)
+    missing_vectors['properties'].pop('insarBaseline', None)
+    stack.append(ASFProduct(missing_vectors))
+
+    calc_perpendicular_baselines(reference, stack)
+    assert([product.properties['perpendicularBaseline'] for product in stack] == expected + [None])
+
+    unusable_reference = ASFProduct(missing_vectors)
+    calc_stack_baselines(unusable_reference, stack)
+    assert(all(product.properties['perpendicularBaseline'] is None for product in stack))
+
+    alternative = calc_stack_baselines(unusable_reference, stack, strategy=lambda product: -product.start_time().timestamp())
+    assert(alternative.start_time() == max(product.start_time() for product in stack if 'sv_pos_pre' in product.properties))
+    assert(alternative.properties['perpendicularBaseline'] == 0 and alternative.properties['temporalBaseline'] == 0)
+    with_vectors = [product for product in stack if 'sv_pos_pre' in product.properties]
+    for (product, baseline) in zip(with_vectors, expected):
+        assert(abs(product.properties['perpendicularBaseline'] - (baseline - expected[-1])) <= 2)
+
+def run_test_stacks_from_ids(stack):
+    features_by_id = dict((feature['properties']['fileID'], feature) for feature in stack)
+    reference_ids = [stack[0]['properties']['fileID'], stack[5]['properties']['fileID'], stack[-1]['properties']['fileID']]
+    received = []
+
+    def stack_response(request, context):
+        form = urllib.parse.parse_qs(request.body)
+        received.append(form)
+        if 'product_list' in form:
+            return {'features': [features_by_id[product_id] for product_id in form['product_list'][0].split(',') if product_id in features_by_id]}
+        return {'features': [feature for feature in stack if feature['properties']['insarStackId'] == form['insarStackId'][0]]}
+
+    with requests_mock.Mocker() as m:
+        m.post(f"https://{INTERNAL.SEARCH_API_HOST}{INTERNAL.SEARCH_PATH}", json=stack_response)
+        stacks = stacks_from_ids(reference_ids)
+
+        assert(list(stacks.keys()) == reference_ids)
+        assert(len(received) == 2)
+        for reference_id, reference_stack in stacks.items():
+            assert(len(reference_stack) == len(stack))
+            reference = [product for product in reference_stack if product.properties['fileID'] == reference_id][0]
+            assert(reference.properties['temporalBaseline'] == 0)
+            assert([product.properties['temporalBaseline'] for product in reference_stack] == sorted(product.properties['temporalBaseline'] for product in reference_stack))
+
+        assert(stacks[reference_ids[0]][0].properties is not stacks[reference_ids[1]][0].properties)
+
+        with pytest.raises(ASFSearchBatchError) as error:
+            stacks_from_ids(reference_ids[:1] + ['missing-product'])
+        assert([reference_id for reference_id, _ in error.value.errors] == ['missing-product'])
+        assert(list(error.value.results.keys()) == reference_ids[:1])
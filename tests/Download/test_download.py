@@ -0,0 +1,356 @@
+from asf_search.download import download_urls, download_url, async_download_url, async_download_urls, DownloadReport
+from asf_search.download.download import _BandwidthLimiter
+from asf_search.exceptions import ASFDownloadError, ASFDownloadChecksumError, ASFDownloadBatchError
+from asf_search import ASFSession
+import asyncio
+import hashlib
+import pytest
+import requests
+import requests_mock
+import time
+
+
+def test_download_urls_report(tmp_path):
+    urls = [f'https://example.com/products/product_{idx}.zip' for idx in range(6)]
+
+    with requests_mock.Mocker() as m:
+        for idx, url in enumerate(urls[:-1]):
+            m.get(url, content=b'x' * (idx + 1) * 1000)
+        m.get(urls[-1], status_code=404)
+
+        report = download_urls(urls, path=str(tmp_path), processes=3, max_per_host=2, raise_on_error=False)
+
+    assert(isinstance(report, DownloadReport))
+    assert([result.url for result in report] == urls)
+    assert(len(report.succeeded) == 5)
+    assert(len(report.failed) == 1 and report.failed[0].url == urls[-1])
+    assert(report.bytes == sum((idx + 1) * 1000 for idx in range(5)))
+    for idx, result in enumerate(report.succeeded):
+        assert((tmp_path / f'product_{idx}.zip').stat().st_size == result.bytes)
+
+
+@pytest.mark.parametrize('processes', [1, 3])
+def test_download_urls_raises_after_all_downloads(tmp_path, processes):
+    urls = [f'https://example.com/products/product_{idx}.zip' for idx in range(3)]
+
+    with requests_mock.Mocker() as m:
+        m.get(urls[0], status_code=404)
+        for url in urls[1:]:
+            m.get(url, content=b'data')
+
+        with pytest.raises(ASFDownloadBatchError) as e:
+            download_urls(urls, path=str(tmp_path), processes=processes)
+
+    assert(isinstance(e.value, ASFDownloadError))
+    assert([result.url for result in e.value.report.failed] == urls[:1])
+    assert(len(e.value.report.succeeded) == 2)
+    assert((tmp_path / 'product_2.zip').read_bytes() == b'data')
+
+
+def test_download_urls_skips_existing(tmp_path):
+    (tmp_path / 'existing.zip').write_bytes(b'data')
+
+    report = download_urls(['https://example.com/existing.zip'], path=str(tmp_path))
+
+    assert(report[0].success and report[0].skipped)
+    assert(report[0].bytes == 0)
+
+
+def test_bandwidth_limiter():
+    limiter = _BandwidthLimiter(bytes_per_second=100000)
+
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.consume(10000)
+
+    assert(time.monotonic() - start >= 0.04 - 0.005)
+
+
+def test_download_url_resumes_partial(tmp_path):
+    url = 'https://example.com/products/large.zip'
+    content = bytes(range(256)) * 40
+    (tmp_path / 'large.zip.partial').write_bytes(content[:3000])
+
+    def ranged_response(request, context):
+        assert(request.headers['Range'] == 'bytes=3000-')
+        context.status_code = 206
+        context.headers['Content-Range'] = f'bytes 3000-{len(content) - 1}/{len(content)}'
+        return content[3000:]
+
+    with requests_mock.Mocker() as m:
+        m.get(url, content=ranged_response)
+        report = download_urls([url], path=str(tmp_path))
+
+    assert(report[0].success and report[0].bytes == len(content) - 3000)
+    assert((tmp_path / 'large.zip').read_bytes() == content)
+    assert(not (tmp_path / 'large.zip.partial').exists())
+
+
+def test_download_url_restarts_on_mismatched_range(tmp_path):
+    url = 'https://example.com/products/shifted.zip'
+    content = bytes(range(256)) * 40
+    (tmp_path / 'shifted.zip.partial').write_bytes(content[:3000])
+    received_ranges = []
+
+    def shifted_response(request, context):
+        received_ranges.append(request.headers.get('Range'))
+        if 'Range' not in request.headers:
+            return content
+        context.status_code = 206
+        context.headers['Content-Range'] = f'bytes 2000-{len(content) - 1}/{len(content)}'
+        return content[2000:]
+
+    with requests_mock.Mocker() as m:
+        m.get(url, content=shifted_response)
+        download_url(url, path=str(tmp_path), md5sum=hashlib.md5(content).hexdigest())
+
+    assert(received_ranges == ['bytes=3000-', None])
+    assert((tmp_path / 'shifted.zip').read_bytes() == content)
+
+
+def test_download_url_retries_interrupted_transfer(tmp_path):
+    url = 'https://example.com/products/flaky.zip'
+    content = b'y' * 5000
+
+    with requests_mock.Mocker() as m:
+        m.get(url, [
+            {'exc': requests.exceptions.ConnectionError},
+            {'content': content}])
+        download_url(url, path=str(tmp_path), expected_bytes=len(content))
+
+    assert((tmp_path / 'flaky.zip').read_bytes() == content)
+
+
+def test_download_url_size_mismatch(tmp_path):
+    url = 'https://example.com/products/short.zip'
+
+    with requests_mock.Mocker() as m:
+        m.get(url, content=b'z' * 100)
+        with pytest.raises(ASFDownloadError):
+            download_url(url, path=str(tmp_path), expected_bytes=200, retries=1)
+
+    assert(not (tmp_path / 'short.zip').exists())
+
+
+def test_download_url_parallel_ranges(tmp_path):
+    url = 'https://example.com/products/ranged.zip'
+    final_url = 'https://bucket.s3.amazonaws.com/ranged.zip?signature=abc'
+    content = bytes(range(256)) * 100
+    requested_ranges = []
+
+    def ranged_response(request, context):
+        assert('Authorization' not in request.headers)
+        start, end = [int(value) for value in request.headers['Range'][len('bytes='):].split('-')]
+        requested_ranges.append((start, end))
+        context.status_code = 206
+        context.headers['Content-Range'] = f'bytes {start}-{end}/{len(content)}'
+        return content[start:end + 1]
+
+    session = ASFSession().auth_with_token('token')
+    with requests_mock.Mocker() as m:
+        m.get(url, status_code=302, headers={'Location': final_url})
+        m.get(final_url, content=ranged_response)
+        download_url(url, path=str(tmp_path), session=session, chunks=4)
+
+    assert((tmp_path / 'ranged.zip').read_bytes() == content)
+    assert(len([r for r in requested_ranges if r != (0, 0)]) == 4)
+
+
+def test_download_url_ranges_unsupported(tmp_path):
+    url = 'https://example.com/products/sequential.zip'
+    content = b'w' * 4096
+
+    with requests_mock.Mocker() as m:
+        m.get(url, content=content)
+        download_url(url, path=str(tmp_path), chunks=4)
+
+        assert(m.call_count == 2)
+
+    assert((tmp_path / 'sequential.zip').read_bytes() == content)
+
+
+def test_download_url_buffer_size(tmp_path):
+    url = 'https://example.com/products/buffered.zip'
+    content = bytes(range(256)) * 7
+
+    session = ASFSession(download_buffer_size=13)
+    with requests_mock.Mocker() as m:
+        m.get(url, content=content)
+        download_url(url, path=str(tmp_path), session=session)
+        download_url(url, path=str(tmp_path), filename='buffered_2.zip', buffer_size=1000)
+
+    assert((tmp_path / 'buffered.zip').read_bytes() == content)
+    assert((tmp_path / 'buffered_2.zip').read_bytes() == content)
+
+
+def test_download_url_checksum_after_resume(tmp_path):
+    url = 'https://example.com/products/checked.zip'
+    content = bytes(range(256)) * 30
+    (tmp_path / 'checked.zip.partial').write_bytes(content[:1000])
+
+    def ranged_response(request, context):
+        context.status_code = 206
+        context.headers['Content-Range'] = f'bytes 1000-{len(content) - 1}/{len(content)}'
+        return content[1000:]
+
+    with requests_mock.Mocker() as m:
+        m.get(url, content=ranged_response)
+        download_url(url, path=str(tmp_path), md5sum=hashlib.md5(content).hexdigest(), buffer_size=100)
+
+    assert((tmp_path / 'checked.zip').read_bytes() == content)
+
+
+def test_download_url_checksum_mismatch(tmp_path):
+    url = 'https://example.com/products/corrupt.zip'
+
+    with requests_mock.Mocker() as m:
+        m.get(url, content=b'corrupt')
+        with pytest.raises(ASFDownloadChecksumError):
+            download_url(url, path=str(tmp_path), md5sum=hashlib.md5(b'expected').hexdigest())
+
+        assert(m.call_count == 2)
+
+    assert(not (tmp_path / 'corrupt.zip').exists())
+    assert(not (tmp_path / 'corrupt.zip.partial').exists())
+
+
+def serve_content(content: bytes, received_ranges: list, interrupt_first: bool = False):
+    """
+    aiohttp handler serving content with Range support, recording each request's Range header.
+    With interrupt_first, the first response ends after half of its body.
+    """
+    from aiohttp import web
+
+    async def handler(request):
+        received_ranges.append(request.headers.get('Range'))
+        start = int(request.headers['Range'][len('bytes='):].rstrip('-')) if 'Range' in request.headers else 0
+
+        response = web.StreamResponse(status=206 if start > 0 else 200)
+        response.content_length = len(content) - start
+        if start > 0:
+            response.headers['Content-Range'] = f'bytes {start}-{len(content) - 1}/{len(content)}'
+        await response.prepare(request)
+
+        if interrupt_first and len(received_ranges) == 1:
+            await response.write(content[start:len(content) // 2])
+            # give the client time to take the first half before the connection drops, as it would over a long transfer
+            await asyncio.sleep(0.1)
+            request.transport.close()
+            return response
+
+        await response.write(content[start:])
+        return response
+
+    return handler
+
+
+def run_with_server(routes: dict, download):
+    """
+    Serves routes from a local aiohttp server, and runs download(url, client) on a new event loop, where url builds URLs on the server
+    """
+    from aiohttp import web, ClientSession
+    from aiohttp.test_utils import TestServer
+
+    async def run():
+        app = web.Application()
+        for route, handler in routes.items():
+            app.router.add_get(route, handler)
+        async with TestServer(app) as server, ClientSession() as client:
+            return await download(lambda route: str(server.make_url(route)), client)
+
+    return asyncio.run(run())
+
+
+def test_async_download_url_resumes_interrupted_transfer(tmp_path):
+    content = bytes(range(256)) * 40
+    received_ranges = []
+
+    run_with_server(
+        {'/products/flaky.zip': serve_content(content, received_ranges, interrupt_first=True)},
+        lambda url, client: async_download_url(url('/products/flaky.zip'), path=str(tmp_path), client=client, md5sum=hashlib.md5(content).hexdigest()))
+
+    assert(received_ranges == [None, f'bytes={len(content) // 2}-'])
+    assert((tmp_path / 'flaky.zip').read_bytes() == content)
+    assert(not (tmp_path / 'flaky.zip.partial').exists())
+
+
+def test_async_download_url_resumes_partial(tmp_path):
+    content = bytes(range(256)) * 40
+    received_ranges = []
+    (tmp_path / 'large.zip.partial').write_bytes(content[:3000])
+
+    run_with_server(
+        {'/products/large.zip': serve_content(content, received_ranges)},
+        lambda url, client: async_download_url(url('/products/large.zip'), path=str(tmp_path), client=client, expected_bytes=len(content), buffer_size=100))
+
+    assert(received_ranges == ['bytes=3000-'])
+    assert((tmp_path / 'large.zip').read_bytes() == content)
+
+
+def test_async_download_url_restarts_on_mismatched_range(tmp_path):
+    from aiohttp import web
+
+    content = bytes(range(256)) * 40
+    received_ranges = []
+    (tmp_path / 'shifted.zip.partial').write_bytes(content[:3000])
+
+    async def shifted_handler(request):
+        received_ranges.append(request.headers.get('Range'))
+        if 'Range' not in request.headers:
+            return web.Response(body=content)
+        return web.Response(status=206, body=content[2000:], headers={'Content-Range': f'bytes 2000-{len(content) - 1}/{len(content)}'})
+
+    run_with_server(
+        {'/products/shifted.zip': shifted_handler},
+        lambda url, client: async_download_url(url('/products/shifted.zip'), path=str(tmp_path), client=client, md5sum=hashlib.md5(content).hexdigest()))
+
+    assert(received_ranges == ['bytes=3000-', None])
+    assert((tmp_path / 'shifted.zip').read_bytes() == content)
+
+
+def test_async_download_url_checksum_mismatch(tmp_path):
+    received_ranges = []
+
+    with pytest.raises(ASFDownloadChecksumError):
+        run_with_server(
+            {'/products/corrupt.zip': serve_content(b'corrupt', received_ranges)},
+            lambda url, client: async_download_url(url('/products/corrupt.zip'), path=str(tmp_path), client=client, md5sum=hashlib.md5(b'expected').hexdigest()))
+
+    assert(len(received_ranges) == 2)
+    assert(not (tmp_path / 'corrupt.zip').exists())
+    assert(not (tmp_path / 'corrupt.zip.partial').exists())
+
+
+def test_async_download_urls(tmp_path):
+    from aiohttp import web
+
+    async def not_found(request):
+        raise web.HTTPNotFound()
+
+    contents = [b'x' * (idx + 1) * 1000 for idx in range(4)]
+    routes = dict((f'/products/product_{idx}.zip', serve_content(content, [])) for idx, content in enumerate(contents))
+    routes['/products/missing.zip'] = not_found
+
+    report = run_with_server(
+        routes,
+        lambda url, client: async_download_urls([url(route) for route in routes], path=str(tmp_path), client=client, max_concurrency=2, raise_on_error=False))
+
+    assert(isinstance(report, DownloadReport))
+    assert([result.url.rpartition('/')[2] for result in report] == [route.rpartition('/')[2] for route in routes])
+    assert([result.bytes for result in report.succeeded] == [len(content) for content in contents])
+    assert(len(report.failed) == 1 and isinstance(report.failed[0].error, ASFDownloadError))
+    for idx, content in enumerate(contents):
+        assert((tmp_path / f'product_{idx}.zip').read_bytes() == content)
+    assert(not (tmp_path / 'missing.zip').exists())
+
+    with pytest.raises(ASFDownloadBatchError) as e:
+        run_with_server(
+            routes,
+            lambda url, client: async_download_urls([url(route) for route in routes], path=str(tmp_path), client=client))
+    assert(len(e.value.report.failed) == 1)
+    assert(all(result.skipped for result in e.value.report.succeeded))
+
+    with pytest.raises(ASFDownloadError):
+        run_with_server(
+            {'/products/missing.zip': not_found},
+            lambda url, client: async_download_url(url('/products/missing.zip'), path=str(tmp_path), client=client))
@@ -0,0 +1,22 @@
+from typing import List
+import json
+import subprocess
+import sys
+
+
+def run_test_deferred_imports(deferred_modules: List[str], attributes: List[str]):
+    probe = (
+        'import json, sys\n'
+        'import asf_search\n'
+        'imported = sorted(sys.modules)\n'
+        f'resolved = [getattr(asf_search, attribute) is not None for attribute in {attributes!r}]\n'
+        'print(json.dumps([imported, resolved]))\n'
+    )
+    output = subprocess.run([sys.executable, '-c', probe], check=True, capture_output=True, text=True).stdout
+    imported, resolved = json.loads(output)
+    imported = set(module.split('.')[0] for module in imported)
+
+    for module in deferred_modules:
+        assert module not in imported, f'importing asf_search imported {module}'
+
+    assert(all(resolved))
@@ -1,11 +1,30 @@
 from numbers import Number
 from asf_search.ASFProduct import ASFProduct
 from asf_search.constants import INTERNAL
-from asf_search.search import search
+from asf_search.search import search, geo_search, search_generator, product_search, granule_search, stack_from_id, SearchCache, ProductCache, incremental_search, WatermarkStore, SearchQuery, windowed_search_generator, plan_search, get_shared_coalescer
+from asf_search.search.async_search import async_search
+from asf_search.exceptions import ASFSearchBatchError, ASFSearch4xxError, ASFSearch5xxError
+import pytest
+from asf_search.search.feature_stream import iter_features, _FeatureStream as FeatureStream
 
 from asf_search.ASFSearchResults import ASFSearchResults
+from asf_search.ASFColumnarResults import ASFColumnarResults
+import numpy as np
+from shapely.geometry import shape, Point
+from shapely import wkt
 
 import requests_mock
+from unittest.mock import patch
+import urllib.parse
+import requests
+import tempfile
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import asyncio
+from dateutil.parser import parse
 
 def run_test_ASFSearchResults(search_resp):
     search_results = ASFSearchResults(map(ASFProduct, search_resp))
@@ -32,3 +51,600 @@ def run_test_search_http_error(search_parameters, status_code: Number, report: s
         m.register_uri('POST', f"https://{search_parameters['host']}{INTERNAL.SEARCH_PATH}", status_code=status_code, json={'error': {'report': report}})
         
         search(**search_parameters)
+
+def run_test_search_generator(search_parameters, answer, page_size):
+    ordered_answer = sorted(answer, key=lambda feature: feature['properties']['startTime'], reverse=True)
+
+    def paged_response(request, context):
+        form = urllib.parse.parse_qs(request.body)
+        features = ordered_answer
+        if 'end' in form:
+            end = form['end'][0].rstrip('Z')
+            features = [feature for feature in features if feature['properties']['startTime'].rstrip('Z') <= end]
+        return {'features': features[:int(form['maxResults'][0])]}
+
+    with requests_mock.Mocker() as m:
+        m.post(f"https://{search_parameters['host']}{INTERNAL.SEARCH_PATH}", json=paged_response)
+        pages = list(search_generator(**search_parameters, page_size=page_size))
+
+    for page in pages:
+        assert(len(page) <= page_size)
+
+    products = [product.geojson() for page in pages for product in page]
+    assert(products == ordered_answer)
+
+def run_test_iter_features(answer, chunk_size):
+    with requests_mock.Mocker() as m:
+        m.get("https://example.com/features", json={'type': 'FeatureCollection', 'features': answer})
+
+        with patch('asf_search.search.feature_stream.ijson', None):
+            features = list(iter_features(requests.get("https://example.com/features", stream=True), chunk_size=chunk_size))
+
+    assert(features == answer)
+
+    # a large feature with escapes split across chunks is decoded once, however small the chunks are
+    large_feature = {
+        'type': 'Feature',
+        'geometry': {'type': 'Polygon', 'coordinates': [[[i * 0.5, -i * 0.25] for i in range(2000)]]},
+        'properties': {'fileID': 'quote " backslash \\ slash / unicode \u00e9 \U0001f600 brackets ]}[{', 'bytes': 12345, 'md5sum': None},
+    }
+    body = json.dumps({'type': 'FeatureCollection', 'features': [large_feature, answer[0] if answer else {}], 'next': 1.5e3}).encode()
+
+    decode_calls = []
+    for size in [1, 3, len(body)]:
+        stream = FeatureStream([body[start:start + size] for start in range(0, len(body), size)])
+        raw_decode = stream._decoder.raw_decode
+        calls = []
+        stream._decoder.raw_decode = lambda *args, calls=calls, raw_decode=raw_decode: calls.append(args) or raw_decode(*args)
+        assert(list(stream.features()) == [large_feature, answer[0] if answer else {}])
+        decode_calls.append(len(calls))
+
+    assert(len(set(decode_calls)) == 1)
+
+def run_test_batched_product_search(answer, batch_size):
+    features_by_id = dict((feature['properties']['fileID'], feature) for feature in answer)
+    product_list = list(reversed(list(features_by_id.keys())))
+    product_list.append(product_list[0])
+
+    def batch_response(request, context):
+        form = urllib.parse.parse_qs(request.body)
+        requested = form['product_list'][0].split(',')
+        assert(len(requested) <= batch_size)
+        return {'features': [features_by_id[product_id] for product_id in sorted(requested)]}
+
+    with requests_mock.Mocker() as m:
+        m.post(f"https://{INTERNAL.SEARCH_API_HOST}{INTERNAL.SEARCH_PATH}", json=batch_response)
+        results = product_search(product_list, batch_size=batch_size)
+
+    assert([product.properties['fileID'] for product in results] == product_list[:-1])
+
+    failing_id = product_list[0]
+    def failing_batch_response(request, context):
+        form = urllib.parse.parse_qs(request.body)
+        if failing_id in form['product_list'][0].split(','):
+            context.status_code = 500
+            return {'error': {'report': 'Server Error'}}
+        return batch_response(request, context)
+
+    with requests_mock.Mocker() as m:
+        m.post(f"https://{INTERNAL.SEARCH_API_HOST}{INTERNAL.SEARCH_PATH}", json=failing_batch_response)
+        with pytest.raises(ASFSearchBatchError) as error:
+            product_search(product_list, batch_size=batch_size)
+
+    failed_batches = [batch for batch, _ in error.value.errors]
+    assert(failed_batches == [product_list[:batch_size], product_list[-batch_size:]])
+    expected_ids = [product_id for product_id in product_list[batch_size:-batch_size]]
+    assert([product.properties['fileID'] for product in error.value.results] == expected_ids)
+
+def run_test_search_cache(answer):
+    with tempfile.TemporaryDirectory() as cache_dir, requests_mock.Mocker() as m:
+        m.post(f"https://{INTERNAL.SEARCH_API_HOST}{INTERNAL.SEARCH_PATH}", json={'features': answer})
+        cache = SearchCache(cache_dir)
+
+        results = search(platform='ALOS', maxResults=250, cache=cache)
+        cached = search(platform=['ALOS'], maxResults=250, cache=cache)
+        assert(m.call_count == 1)
+        assert(cached.geojson() == results.geojson())
+        assert(cached.geojson()['features'] == answer)
+        assert((cache.hits, cache.misses) == (1, 1))
+
+        search(platform='ALOS', maxResults=100, cache=cache)
+        assert(m.call_count == 2)
+
+        reopened = SearchCache(cache_dir)
+        search(platform='ALOS', maxResults=250, cache=reopened)
+        assert(m.call_count == 2)
+        assert(reopened.stats()['entries'] == 2)
+
+        expired = SearchCache(cache_dir, ttl=-1)
+        search(platform='ALOS', maxResults=250, cache=expired)
+        assert(m.call_count == 3)
+        assert((expired.hits, expired.misses) == (0, 1))
+
+        bounded = SearchCache(cache_dir, max_bytes=1)
+        search(platform='ALOS', maxResults=50, cache=bounded)
+        assert(bounded.stats()['entries'] == 1)
+        assert(bounded.evictions == 2)
+
+        bounded.clear()
+        assert(bounded.stats()['bytes'] == 0)
+
+def run_test_product_cache(answer):
+    features_by_id = dict((feature['properties']['fileID'], feature) for feature in answer)
+    product_ids = list(features_by_id.keys())
+    requested = []
+
+    def product_response(request, context):
+        form = urllib.parse.parse_qs(request.body)
+        if 'product_list' in form:
+            ids = form['product_list'][0].split(',')
+            requested.append(ids)
+            return {'features': [features_by_id[product_id] for product_id in ids]}
+        if 'granule_list' in form:
+            names = form['granule_list'][0].split(',')
+            requested.append(names)
+            return {'features': [feature for feature in answer if feature['properties']['sceneName'] in names]}
+        requested.append('stack')
+        return {'features': answer}
+
+    with requests_mock.Mocker() as m:
+        m.post(f"https://{INTERNAL.SEARCH_API_HOST}{INTERNAL.SEARCH_PATH}", json=product_response)
+        cache = ProductCache()
+
+        results = product_search(product_ids[:5], product_cache=cache)
+        results[0].properties['fileID'] = 'modified'
+        results = product_search(product_ids[3:8], product_cache=cache)
+        assert(requested == [product_ids[:5], product_ids[5:8]])
+        assert([product.properties['fileID'] for product in results] == product_ids[3:8])
+        assert((cache.hits, cache.misses) == (2, 8))
+
+        scene_names = [features_by_id[product_id]['properties']['sceneName'] for product_id in product_ids[:2]]
+        granule_search(scene_names, product_cache=cache)
+        granule_search(scene_names, product_cache=cache)
+        assert(requested[2:] == [scene_names])
+
+        requested.clear()
+        stack = stack_from_id(product_ids[20], product_cache=cache)
+        assert(requested == [[product_ids[20]], 'stack'])
+        requested.clear()
+        stack_from_id(product_ids[21], product_cache=cache)
+        assert(requested == ['stack'])
+        assert(len(stack) == len(answer))
+        assert([product.geojson() for product in product_search(product_ids, product_cache=cache)] == answer)
+
+        bounded = ProductCache(maxsize=3)
+        product_search(product_ids[:5], product_cache=bounded)
+        assert(bounded.stats()['entries'] == 3)
+        assert(bounded.evictions == 2)
+
+        requested.clear()
+        expired = ProductCache(ttl=-1)
+        product_search(product_ids[:2], product_cache=expired)
+        product_search(product_ids[:2], product_cache=expired)
+        assert(requested == [product_ids[:2], product_ids[:2]])
+
+def run_test_incremental_search(answer):
+    archive = copy.deepcopy(answer)
+    requested_since = []
+
+    def processed_since(request, context):
+        form = urllib.parse.parse_qs(request.body)
+        since = form.get('processingDate', [None])[0]
+        requested_since.append(since)
+        return {'features': [feature for feature in archive if since is None or parse(feature['properties']['processingDate']) >= parse(since)]}
+
+    with tempfile.TemporaryDirectory() as state_dir, requests_mock.Mocker() as m:
+        m.post(f"https://{INTERNAL.SEARCH_API_HOST}{INTERNAL.SEARCH_PATH}", json=processed_since)
+        store = WatermarkStore(os.path.join(state_dir, 'watermarks.json'))
+        latest = max(feature['properties']['processingDate'] for feature in answer)
+
+        delta = incremental_search('alos', {'platform': 'ALOS'}, store=store)
+        assert(len(delta.new) == len(answer) and len(delta.updated) == 0)
+        assert(delta.watermark == latest)
+
+        delta = incremental_search('alos', {'platform': ['ALOS']}, store=WatermarkStore(store.path), lag=0)
+        assert(len(delta) == 0)
+        assert(requested_since[-1] == latest)
+
+        newest = next(feature for feature in archive if feature['properties']['processingDate'] == latest)
+        assert(len(store.get('alos')['seen']) == len(answer))
+
+        newest['properties']['processingDate'] = '2020-01-01T00:00:00Z'
+        archive[0]['properties']['processingDate'] = '2020-01-01T00:00:00Z'
+        archive.append(copy.deepcopy(archive[1]))
+        archive[-1]['properties']['fileID'] = 'new-product'
+        archive[-1]['properties']['processingDate'] = '2020-01-02T00:00:00Z'
+
+        delta = incremental_search('alos', {'platform': 'ALOS'}, store=store)
+        assert([product.properties['fileID'] for product in delta.new] == ['new-product'])
+        assert([product.properties['fileID'] for product in delta.updated] == [archive[0]['properties']['fileID'], newest['properties']['fileID']])
+        assert(delta.watermark == '2020-01-02T00:00:00Z')
+        assert(requested_since[-1] == '2013-10-09T19:17:33Z')
+
+        # beyond max_seen, the products returned longest ago are forgotten and come back as new when reprocessed
+        delta = incremental_search('alos', {'platform': 'ALOS'}, store=store, max_seen=2)
+        assert(len(delta) == 0)
+        assert(list(store.get('alos')['seen']) == [newest['properties']['fileID'], 'new-product'])
+
+        archive[0]['properties']['processingDate'] = '2020-01-03T00:00:00Z'
+        newest['properties']['processingDate'] = '2020-01-03T00:00:00Z'
+        delta = incremental_search('alos', {'platform': 'ALOS'}, store=store, max_seen=2)
+        assert([product.properties['fileID'] for product in delta.new] == [archive[0]['properties']['fileID']])
+        assert([product.properties['fileID'] for product in delta.updated] == [newest['properties']['fileID']])
+
+        with pytest.raises(ValueError):
+            incremental_search('alos', {'platform': 'SENTINEL-1'}, store=store)
+        with pytest.raises(ValueError):
+            incremental_search('alos-limited', {'platform': 'ALOS', 'maxResults': 5}, store=store)
+        assert(store.get('alos-limited') is None)
+
+        store.remove('alos')
+        assert(store.get('alos') is None)
+
+def run_test_tiled_search(answer):
+    footprints = [shape(feature['geometry']) for feature in answer]
+    requested = []
+
+    def intersecting(request, context):
+        tile = wkt.loads(urllib.parse.parse_qs(request.body)['intersectsWith'][0])
+        requested.append(tile)
+        if tile.contains(Point(-135.1, 57.1)) and 'processingLevel' in urllib.parse.parse_qs(request.body):
+            context.status_code = 500
+            return {'error': {'report': 'tile failed'}}
+        return {'features': [feature for feature, footprint in zip(answer, footprints) if footprint.intersects(tile.envelope)]}
+
+    with requests_mock.Mocker() as m:
+        m.post(f"https://{INTERNAL.SEARCH_API_HOST}{INTERNAL.SEARCH_PATH}", json=intersecting)
+        aoi = 'POLYGON((-137 56,-134.5 56,-134.5 57.5,-137 57.5,-137 56))'
+
+        results = search(intersectsWith=aoi, tile_size=0.5)
+        assert(len(requested) == 15)
+        assert(all(tile.area <= 0.25 for tile in requested))
+        assert(sorted(product.properties['fileID'] for product in results) == sorted(feature['properties']['fileID'] for feature in answer))
+        start_times = [product.properties['startTime'] for product in results]
+        assert(start_times == sorted(start_times, reverse=True))
+
+        assert(len(search(intersectsWith=aoi, tile_size=0.5, maxResults=5)) == 5)
+
+        # the mocked SearchAPI matches against each tile's bounding box, so only exact_intersection drops footprints outside the triangle itself
+        triangle = 'POLYGON((-138 56.9,-138 55,-136.2 55,-138 56.9))'
+        requested.clear()
+        assert(len(search(intersectsWith=triangle, simplify_tolerance=0.01)) > 0)
+        assert(len(requested) == 1)
+        assert(len(search(intersectsWith=triangle, simplify_tolerance=0.01, exact_intersection=True)) == 0)
+
+        with pytest.raises(ASFSearchBatchError) as error:
+            search(intersectsWith=aoi, tile_size=0.5, processingLevel='L1.0')
+        assert(len(error.value.errors) == 1)
+        assert(len(error.value.results) == len(answer))
+
+        requested.clear()
+        with pytest.raises(ValueError):
+            search(intersectsWith=aoi, tile_size=0.5, window_results=10)
+        with pytest.raises(ValueError):
+            geo_search(intersectsWith=triangle, simplify_tolerance=0.01, window_results=10)
+        assert(len(requested) == 0)
+
+def run_test_search_query(search_parameters, answer):
+    params = dict((k, v) for k, v in search_parameters.items() if k != 'host')
+    query = SearchQuery(host=search_parameters['host'], **params)
+
+    with requests_mock.Mocker() as m:
+        m.post(f"https://{search_parameters['host']}{INTERNAL.SEARCH_PATH}", json={'features': answer})
+
+        search(**search_parameters)
+        for _ in range(3):
+            results = query.run()
+            assert(results.geojson()['features'] == answer)
+        forms = [urllib.parse.parse_qs(request.body) for request in m.request_history]
+        assert(all(form == forms[0] for form in forms))
+
+    aoi = 'POINT(-135.7 56.8)'
+    derived = query.replace(intersectsWith=aoi, start=None, platform=['ALOS', 'SENTINEL-1'])
+    expected = SearchQuery(**dict(params, intersectsWith=aoi, start=None, platform=['ALOS', 'SENTINEL-1']))
+    assert(derived.data == expected.data)
+    assert('start' not in derived.data and 'start' not in derived.params)
+    assert(derived.host == query.host)
+    assert(query.data == SearchQuery(**params).data)
+
+    # campaign and its deprecated alias collectionName are the same form field, replacing either replaces both
+    campaign_query = SearchQuery(campaign='ABoVE')
+    assert(campaign_query.replace(collectionName='Haiti').params == SearchQuery(collectionName='Haiti').params)
+    assert(campaign_query.replace(collectionName='Haiti').data == SearchQuery(collectionName='Haiti').data)
+    assert(campaign_query.replace(collectionName=None).params == {} and campaign_query.replace(collectionName=None).data == SearchQuery().data)
+    assert(SearchQuery(collectionName='Haiti').replace(campaign='ABoVE').params == campaign_query.params)
+
+    with pytest.raises(TypeError):
+        SearchQuery(platfrom='ALOS')
+    with pytest.raises(TypeError):
+        query.replace(platfrom='ALOS')
+    with pytest.raises(ValueError):
+        SearchQuery(relativeOrbit=[(20, 10)])
+    with pytest.raises(ValueError):
+        query.replace(frame=(300, 200))
+
+def mock_time_range_search(answer, requested):
+    """
+    SearchAPI stand-in filtering features by start, end, season and intersectsWith, answering output=count requests with the count
+    """
+    footprints = [shape(feature['geometry']) for feature in answer]
+
+    def in_range(request, context):
+        form = dict((k, v[0]) for k, v in urllib.parse.parse_qs(request.body).items())
+        start, end = parse(form.get('start', '1970-01-01T00:00:00Z')), parse(form.get('end', '2100-01-01T00:00:00Z'))
+        season = [int(day) for day in urllib.parse.parse_qs(request.body).get('season', [])]
+        aoi = wkt.loads(form['intersectsWith']) if 'intersectsWith' in form else None
+        features = []
+        for feature, footprint in zip(answer, footprints):
+            start_time = parse(feature['properties']['startTime'])
+            day = start_time.timetuple().tm_yday
+            if start <= start_time <= end and (len(season) == 0 or season[0] <= day <= season[1]) and (aoi is None or footprint.intersects(aoi)):
+                features.append(feature)
+
+        requested.append((form['output'], start, end, len(features)))
+        if form['output'] == 'count':
+            return str(len(features))
+
+        features.sort(key=lambda feature: feature['properties']['startTime'], reverse=True)
+        return json.dumps({'features': features[:int(form.get('maxResults', len(features)))]})
+
+    return in_range
+
+def run_test_windowed_search(answer):
+    requested = []
+    in_range = mock_time_range_search(answer, requested)
+
+    def natural_language(request, context):
+        return {'date': {'original': request.qs['date'][0], 'parsed': '2011-12-31T00:00:00Z'}}
+
+    newest_first = sorted(answer, key=lambda feature: feature['properties']['startTime'], reverse=True)
+    with requests_mock.Mocker() as m:
+        m.post(f"https://{INTERNAL.SEARCH_API_HOST}{INTERNAL.SEARCH_PATH}", text=in_range)
+        m.get(f"https://{INTERNAL.SEARCH_API_HOST}{INTERNAL.DATE_PATH}", json=natural_language)
+
+        results = search(platform='ALOS', start='2006-01-01T00:00:00Z', end='last month', window_results=5)
+        assert(results.geojson()['features'] == newest_first)
+        searched = [window for window in requested if window[0] == 'geojson']
+        assert(len(searched) >= len(answer) / 5)
+        assert(all(found <= 5 for _, _, _, found in searched))
+        assert(all(found > 0 for _, _, _, found in searched))
+
+        results = search(platform='ALOS', start='2006-01-01T00:00:00Z', end='2011-12-31T00:00:00Z', window_results=5, maxResults=7)
+        assert(results.geojson()['features'] == newest_first[:7])
+
+        # every day of the season is searched, including the last, which is February 29th in leap years
+        requested.clear()
+        seasonal = [feature for feature in newest_first if parse(feature['properties']['startTime']).timetuple().tm_yday <= 60]
+        results = search(platform='ALOS', start='2006-01-01T00:00:00Z', end='2011-12-31T00:00:00Z', season=(1, 60), window_results=2)
+        assert(results.geojson()['features'] == seasonal)
+        assert(all(start.timetuple().tm_yday <= 60 for _, start, _, _ in requested if start.year > 2006))
+
+        query = SearchQuery(platform='ALOS', start='2006-01-01T00:00:00Z', end='2011-12-31T00:00:00Z', maxResults=10)
+        pages = list(windowed_search_generator(query, window_results=3, max_workers=2))
+        file_ids = [product.properties['fileID'] for page in pages for product in page]
+        assert(len(pages) > 1)
+        assert(len(file_ids) == 10 and len(set(file_ids)) == 10)
+
+        with pytest.raises(ValueError):
+            search(platform='ALOS', window_results=0)
+
+def run_test_search_plan(answer):
+    requested = []
+    newest_first = sorted(answer, key=lambda feature: feature['properties']['startTime'], reverse=True)
+    sizes = [int(feature['properties']['bytes']) for feature in newest_first]
+
+    with requests_mock.Mocker() as m:
+        m.post(f"https://{INTERNAL.SEARCH_API_HOST}{INTERNAL.SEARCH_PATH}", text=mock_time_range_search(answer, requested))
+        query = SearchQuery(platform='ALOS', start='2006-01-01T00:00:00Z', end='2011-12-31T00:00:00Z')
+        assert(query.count() == len(answer))
+
+        plan = plan_search(query, page_size=10, sample_size=5)
+        assert((plan.count, plan.pages, plan.sample_size) == (len(answer), 3, 5))
+        assert(plan.bytes_estimated)
+        assert(plan.bytes == round(len(answer) * sum(sizes[:5]) / 5))
+        assert(plan.windows == [] and plan.tiles == [])
+        assert(len([request for request in requested if request[0] == 'geojson']) == 1)
+
+        plan = plan_search(query, sample_size=100, window_results=5)
+        assert(not plan.bytes_estimated and plan.bytes == sum(sizes))
+        assert(sum(count for _, _, count in plan.windows) == len(answer))
+        assert(all(count <= 5 for _, _, count in plan.windows))
+        assert([start for start, _, _ in plan.windows] == sorted(start for start, _, _ in plan.windows))
+
+        aoi = 'POLYGON((-137 56,-134.5 56,-134.5 57.5,-137 57.5,-137 56))'
+        plan = plan_search(query.replace(intersectsWith=aoi, maxResults=7), tile_size=1, sample_size=0)
+        assert(plan.count == 7 and plan.bytes == 0)
+        assert(len(plan.tiles) == 6)
+        assert(sum(count for _, count in plan.tiles) > len(answer))
+
+def run_test_search_coalescing(answer, threads):
+    coalescer = get_shared_coalescer()
+    assert(not coalescer.enabled)
+    coalescer.enabled = True
+    try:
+        run_search_coalescing(coalescer, answer, threads)
+    finally:
+        coalescer.enabled = False
+
+def run_search_coalescing(coalescer, answer, threads):
+    before = coalescer.stats()
+    product_ids = [feature['properties']['fileID'] for feature in answer]
+
+    def respond_once_all_waiting(request, context):
+        # hold the leader's request until every other thread has joined it
+        deadline = time.monotonic() + 10
+        while coalescer.stats()['coalesced'] - before['coalesced'] < threads - 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        if 'platform' in urllib.parse.parse_qs(request.body):
+            context.status_code = 500
+            return json.dumps({'error': {'report': 'Server Error'}})
+        return json.dumps({'features': answer})
+
+    with requests_mock.Mocker() as m:
+        m.post(f"https://{INTERNAL.SEARCH_API_HOST}{INTERNAL.SEARCH_PATH}", text=respond_once_all_waiting)
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(lambda _: product_search(product_ids), range(threads)))
+
+        assert(m.call_count == 1)
+        for result in results:
+            assert(sorted(product.properties['fileID'] for product in result) == sorted(product_ids))
+        assert(len(set(id(result[0].properties) for result in results)) == threads)
+        results[0][0].properties['fileID'] = 'changed'
+        assert(all(result[0].properties['fileID'] != 'changed' for result in results[1:]))
+
+        stats = coalescer.stats()
+        assert(stats['requests'] - before['requests'] == 1)
+        assert(stats['coalesced'] - before['coalesced'] == threads - 1)
+        assert(stats['in_flight'] == 0)
+
+        before = coalescer.stats()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            failures = [executor.submit(search, platform='ALOS') for _ in range(threads)]
+        for failure in failures:
+            with pytest.raises(ASFSearch5xxError):
+                failure.result()
+        assert(m.call_count == 2)
+
+        # exceptions that are not Exceptions, such as SystemExit, still release the followers
+        before = coalescer.stats()
+        def exit_once_all_waiting():
+            deadline = time.monotonic() + 10
+            while coalescer.stats()['coalesced'] - before['coalesced'] < threads - 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            raise SystemExit(1)
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            exits = [executor.submit(coalescer.fetch, INTERNAL.SEARCH_API_HOST, {'platform': 'ALOS'}, None, exit_once_all_waiting) for _ in range(threads)]
+        for exit in exits:
+            with pytest.raises(SystemExit):
+                exit.result(timeout=10)
+        assert(coalescer.stats()['in_flight'] == 0)
+
+        coalescer.enabled = False
+        search(product_list=product_ids)
+        search(product_list=product_ids)
+        assert(m.call_count == 4)
+        assert(coalescer.stats()['requests'] == before['requests'] + 1)
+
+def run_test_ASFColumnarResults(search_resp):
+    results = ASFSearchResults(map(ASFProduct, search_resp)).columnar()
+
+    assert(isinstance(results, ASFColumnarResults))
+    assert(len(results) == len(search_resp))
+    assert(results.geojson()['features'] == search_resp)
+    assert(results[0].geojson() == search_resp[0])
+    results[0].properties['fileID'] = 'modified'
+    assert(results[0].properties['fileID'] == search_resp[0]['properties']['fileID'])
+
+    start_times = results.column('startTime')
+    assert(start_times.dtype == np.dtype('datetime64[ms]'))
+    assert(list(results.column('platform')) == [feature['properties']['platform'] for feature in search_resp])
+
+    ordered = results.sort('startTime', reverse=True)
+    assert([product.properties['fileID'] for product in ordered] == [
+        feature['properties']['fileID'] for feature in sorted(search_resp, key=lambda feature: feature['properties']['startTime'], reverse=True)])
+
+    later = results.filter(start_times >= start_times[len(results) // 2])
+    assert(len(later) == sum(1 for time in start_times if time >= start_times[len(results) // 2]))
+    assert(all(product.properties['startTime'] >= search_resp[len(results) // 2]['properties']['startTime'] for product in later))
+
+    scene = search_resp[0]['properties']['sceneName']
+    assert([product.geojson() for product in results.filter(sceneName=scene)] == [feature for feature in search_resp if feature['properties']['sceneName'] == scene])
+    assert(len(results.filter(platform=['NOT-A-PLATFORM'])) == 0)
+
+    groups = results.groupby('processingLevel')
+    assert(sum(len(group) for group in groups.values()) == len(results))
+    for level, group in groups.items():
+        assert(all(product.properties['processingLevel'] == level for product in group))
+
+    assert(results[1:3].to_results().geojson()['features'] == search_resp[1:3])
+
+def run_test_ASFSearchResults_spatial_index(search_resp):
+    results = ASFSearchResults(map(ASFProduct, search_resp))
+    footprints = [shape(feature['geometry']) for feature in search_resp]
+    areas = [footprints[0].centroid.buffer(0.01), footprints[-1].centroid.wkt, Point(0, 0).wkt]
+
+    parsed_areas = [area if not isinstance(area, str) else wkt.loads(area) for area in areas]
+
+    def brute_force(predicate):
+        return [feature for (feature, footprint) in zip(search_resp, footprints) if any(predicate(footprint, area) for area in parsed_areas)]
+
+    assert(results.intersects(areas).geojson()['features'] == brute_force(lambda footprint, area: footprint.intersects(area)))
+    assert(results.contains(areas).geojson()['features'] == brute_force(lambda footprint, area: footprint.contains(area)))
+
+    per_area = results.intersects(areas, per_geometry=True)
+    assert(len(per_area) == len(areas))
+    assert(len(per_area[2]) == 0)
+
+    nearest = results.nearest(areas[2])
+    distances = [footprint.distance(Point(0, 0)) for footprint in footprints]
+    assert(nearest[0].shape().distance(Point(0, 0)) == min(distances))
+
+    results.append(ASFProduct({'type': 'Feature', 'geometry': Point(0, 0).buffer(1).__geo_interface__, 'properties': {}}))
+    assert(len(results.intersects(areas[2])) == 1)
+
+class StubAsyncClient:
+    """
+    Stands in for the aiohttp.ClientSession taken by the async_* functions, answering each POST with respond(form),
+    which returns a status code and JSON body. Bodies are streamed back chunk_size bytes at a time.
+    """
+    def __init__(self, respond, chunk_size: int = 512):
+        self.respond = respond
+        self.chunk_size = chunk_size
+        self.requests = []
+        self.responses = []
+
+    def post(self, url: str, data: dict = None, headers: dict = None):
+        self.requests.append((url, data))
+        status, body = self.respond(data)
+        self.responses.append(_StubAsyncResponse(status, json.dumps(body).encode('utf-8'), self.chunk_size))
+        return self.responses[-1]
+
+class _StubAsyncResponse:
+    def __init__(self, status: int, body: bytes, chunk_size: int):
+        self.status = status
+        self.content = self
+        self._body = body
+        self._chunk_size = chunk_size
+        self.reads = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def read(self, size: int = -1) -> bytes:
+        self.reads += 1
+        size = len(self._body) if size < 0 else min(size, self._chunk_size)
+        chunk, self._body = self._body[:size], self._body[size:]
+        return chunk
+
+def run_test_async_search(answer):
+    def respond(form):
+        if form.get('platform') == 'SENTINEL-1':
+            return 500, {'error': {'report': 'Server Error'}}
+        if form.get('platform') == 'NOT-A-PLATFORM':
+            return 400, {'error': {'report': 'Validation Error'}}
+        return 200, {'features': answer[:int(form.get('maxResults', len(answer)))]}
+
+    client = StubAsyncClient(respond)
+    results = asyncio.run(async_search(platform='ALOS', maxResults=10, client=client))
+    assert(results.geojson()['features'] == answer[:10])
+    url, form = client.requests[-1]
+    assert(url == f'https://{INTERNAL.SEARCH_API_HOST}{INTERNAL.SEARCH_PATH}')
+    assert(form == {'platform': 'ALOS', 'maxResults': '10', 'output': 'geojson'})
+
+    # features are parsed as the response streams in, and from the whole body when ijson is not installed
+    results = asyncio.run(async_search(platform='ALOS', client=client))
+    assert(results.geojson()['features'] == answer)
+    assert(client.responses[-1].reads > len(answer))
+    with patch('asf_search.search.async_search.ijson', None):
+        results = asyncio.run(async_search(platform='ALOS', client=client))
+    assert(results.geojson()['features'] == answer)
+
+    with pytest.raises(ASFSearch5xxError):
+        asyncio.run(async_search(platform='SENTINEL-1', client=client))
+    with pytest.raises(ASFSearch4xxError):
+        asyncio.run(async_search(platform='NOT-A-PLATFORM', client=client))
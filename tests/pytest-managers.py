@@ -1,11 +1,12 @@
 from typing import List
 from asf_search.exceptions import ASFAuthenticationError, ASFSearch4xxError, ASFSearch5xxError
 
-from ASFProduct.test_ASFProduct import run_test_ASFProduct_Geo_Search, run_test_stack
+from ASFProduct.test_ASFProduct import run_test_ASFProduct_Geo_Search, run_test_stack, run_test_ASFProduct_cached_geometry
 from ASFSession.test_ASFSession import run_auth_with_creds
 from BaselineSearch.test_baseline_search import *
-from Search.test_search import run_test_ASFSearchResults, run_test_search, run_test_search_http_error
+from Search.test_search import run_test_ASFSearchResults, run_test_ASFColumnarResults, run_test_ASFSearchResults_spatial_index, run_test_search, run_test_search_http_error, run_test_search_generator, run_test_iter_features, run_test_batched_product_search, run_test_search_cache, run_test_product_cache, run_test_incremental_search, run_test_tiled_search, run_test_search_query, run_test_windowed_search, run_test_search_plan, run_test_search_coalescing, run_test_async_search
 from CMR.test_MissionList import run_test_get_project_names
+from Import.test_import import run_test_deferred_imports
 
 from pytest import raises
 from unittest.mock import patch
@@ -23,6 +24,15 @@ def test_ASFProduct(**args) -> None:
     geographic_response = get_resource(test_info["products"])
     run_test_ASFProduct_Geo_Search(geographic_response)
 
+def test_ASFProduct_Cached_Geometry(**args) -> None:
+    """
+    Tests ASFProduct's cached shape, centroid and start/stop times,
+    asserting they are reused between calls and recalculated once the product's geometry or properties change
+    """
+    test_info = args["test_info"]
+    response = get_resource(test_info["cached_product"])
+    run_test_ASFProduct_cached_geometry(response)
+
 def test_ASFProduct_Stack(**args) -> None:
     """
     Tests ASFProduct.stack() with reference and corresponding stack
@@ -100,6 +110,33 @@ def test_temporal_baseline(**args) -> None:
     stack = get_resource(test_info["stack"])
     run_test_calc_temporal_baselines(reference, stack)
     
+def test_perpendicular_baseline(**args) -> None:
+    """
+    Test asf_search.search.perpendicular_baseline.calc_perpendicular_baselines with synthetic state vectors,
+    asserting known cross-track orbit offsets are recovered, and that an alternative reference is picked with strategy
+    """
+    test_info = args["test_info"]
+    template = get_resource(test_info["perpendicular_template"])
+    run_test_calc_perpendicular_baselines(template)
+
+def test_stacks_from_ids(**args) -> None:
+    """
+    Test asf_search.search.baseline_search.stacks_from_ids, asserting references sharing stack parameters
+    are searched for once, and each gets its own stack with baselines calculated against it
+    """
+    test_info = args["test_info"]
+    stack = get_resource(test_info["shared_stack"])
+    run_test_stacks_from_ids(stack)
+
+def test_sentinel1_stacks_from_ids(**args) -> None:
+    """
+    Test asf_search.search.baseline_search.stacks_from_ids with Sentinel-1 references, asserting references differing only
+    in their centroid share one search, and each keeps the products intersecting its own centroid
+    """
+    test_info = args["test_info"]
+    stack = get_resource(test_info["shared_sentinel1_stack"])
+    run_test_sentinel1_stacks_from_ids(stack)
+
 def test_stack_from_product(**args) -> None:
     """
     Test asf_search.search.baseline_search.stack_from_product, asserting stack returned is ordered
@@ -113,7 +150,7 @@ def test_stack_from_product(**args) -> None:
 
 def test_stack_from_id(**args) -> None:
     """
-    Test asf_search.search.baseline_search.stack_from_id, asserting stack returned is ordered
+    Test asf_search.search.baseline_search.stack_from_id and its async variant, asserting stack returned is ordered
     by temporalBaseline value in ascending order
     """
     test_info = args["test_info"]
@@ -128,17 +165,22 @@ def test_stack_from_id(**args) -> None:
         stack = get_resource(stack_data)
 
     run_test_stack_from_id(stack_id, stack_reference, stack)
+    run_test_async_stack_from_id(stack_id, stack_reference, stack)
 
 # asf_search.ASFSearchResults Tests
 def test_ASFSearchResults(**args) -> None:
     """
     Test asf_search.ASFSearchResults, asserting initialized values, 
-    and geojson response returns object with type FeatureCollection
+    and geojson response returns object with type FeatureCollection.
+    Also converts the results to ASFColumnarResults, asserting filter, sort and groupby match the original products,
+    and queries the results' spatial index, asserting it matches comparing every footprint
     """
     test_info = args["test_info"]
     search_response = get_resource(test_info["response"])
 
     run_test_ASFSearchResults(search_response)
+    run_test_ASFColumnarResults(search_response)
+    run_test_ASFSearchResults_spatial_index(search_response)
 
 # asf_search.search Tests
 def test_ASFSearch_Search(**args) -> None:
@@ -167,6 +209,139 @@ def test_ASFSearch_Search_Error(**args) -> None:
         with raises(ASFSearch5xxError):
             run_test_search_http_error(parameters, error_code, report)
 
+def test_ASFSearch_Search_Generator(**args) -> None:
+    """
+    Test asf_search.search_generator, asserting every page respects the page size
+    and the pages together contain each expected product exactly once, in descending startTime order
+    """
+    test_info = args["test_info"]
+    parameters = get_resource(test_info["parameters"])
+    answer = get_resource(test_info["answer"])
+    page_size = test_info["page_size"]
+
+    run_test_search_generator(parameters, answer, page_size)
+
+def test_ASFSearch_Feature_Stream(**args) -> None:
+    """
+    Test asf_search.search.feature_stream.iter_features with the built-in json backend,
+    asserting features are decoded correctly regardless of how the response body is chunked
+    """
+    test_info = args["test_info"]
+    answer = get_resource(test_info["answer"])
+    chunk_size = test_info["chunk_size"]
+
+    run_test_iter_features(answer, chunk_size)
+
+def test_ASFSearch_Product_Search_Batches(**args) -> None:
+    """
+    Test asf_search.product_search with a product list longer than batch_size,
+    asserting merged results are deduplicated, ordered like the input, and that failed batches are reported
+    """
+    test_info = args["test_info"]
+    answer = get_resource(test_info["answer"])
+    batch_size = test_info["batch_size"]
+
+    run_test_batched_product_search(answer, batch_size)
+
+def test_ASFSearch_Search_Cache(**args) -> None:
+    """
+    Test asf_search.search with a SearchCache, asserting equivalent searches are served from disk,
+    and that expired and least recently used entries are dropped
+    """
+    test_info = args["test_info"]
+    answer = get_resource(test_info["search_cache_answer"])
+
+    run_test_search_cache(answer)
+
+def test_ASFSearch_Product_Cache(**args) -> None:
+    """
+    Test product_search, granule_search and stack_from_id with a ProductCache,
+    asserting only IDs missing from the cache are searched for, and that cached products are never modified through results
+    """
+    test_info = args["test_info"]
+    answer = get_resource(test_info["product_cache_answer"])
+
+    run_test_product_cache(answer)
+
+def test_ASFSearch_Incremental_Search(**args) -> None:
+    """
+    Test asf_search.incremental_search, asserting each run only searches from the saved processingDate watermark
+    and reports products as new or updated against earlier runs
+    """
+    test_info = args["test_info"]
+    answer = get_resource(test_info["incremental_answer"])
+
+    run_test_incremental_search(answer)
+
+def test_ASFSearch_Tiled_Search(**args) -> None:
+    """
+    Test asf_search.search with a tiled or simplified intersectsWith, asserting each tile is searched
+    and the merged results are deduplicated, ordered, and filtered to the original geometry when asked
+    """
+    test_info = args["test_info"]
+    answer = get_resource(test_info["tiled_search_answer"])
+
+    run_test_tiled_search(answer)
+
+def test_ASFSearch_Search_Query(**args) -> None:
+    """
+    Test asf_search.SearchQuery, asserting it sends the same form data as search() on every run,
+    and that derived queries match queries built from scratch with the same parameters
+    """
+    test_info = args["test_info"]
+    parameters = get_resource(test_info["query_parameters"])
+    answer = get_resource(test_info["answer"])
+
+    run_test_search_query(parameters, answer)
+
+def test_ASFSearch_Windowed_Search(**args) -> None:
+    """
+    Test asf_search.search with window_results and windowed_search_generator, asserting windows are sized from result counts,
+    respect the season, and merge to the same results as a single search
+    """
+    test_info = args["test_info"]
+    answer = get_resource(test_info["windowed_search_answer"])
+
+    run_test_windowed_search(answer)
+
+def test_ASFSearch_Search_Plan(**args) -> None:
+    """
+    Test asf_search.plan_search, asserting counts, pages, windows, tiles and download size match the mocked results
+    """
+    test_info = args["test_info"]
+    answer = get_resource(test_info["search_plan_answer"])
+
+    run_test_search_plan(answer)
+
+def test_ASFSearch_Search_Coalescing(**args) -> None:
+    """
+    Test identical searches made at once from several threads, asserting they share one request,
+    receive independent copies of its results or its error, and are counted in the coalescer's stats
+    """
+    test_info = args["test_info"]
+    answer = get_resource(test_info["coalescing_answer"])
+
+    run_test_search_coalescing(answer, test_info["threads"])
+
+def test_ASFSearch_Async_Search(**args) -> None:
+    """
+    Test asf_search.search.async_search against a stubbed aiohttp client, asserting the form data sent,
+    that features are parsed as the response streams in, and that SearchAPI errors are raised as with search()
+    """
+    test_info = args["test_info"]
+    answer = get_resource(test_info["async_answer"])
+
+    run_test_async_search(answer)
+
+def test_deferred_imports(**args) -> None:
+    """
+    Test that importing asf_search in a fresh interpreter does not import its heavy dependencies,
+    and that its public names still resolve
+    """
+    test_info = args["test_info"]
+
+    run_test_deferred_imports(test_info["deferred_modules"], test_info["attributes"])
+
 def test_get_platform_campaign_names(**args) -> None:
     test_info = args["test_info"]
     cmr_ummjson = get_resource(test_info["cmr_ummjson"])